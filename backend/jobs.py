@@ -0,0 +1,126 @@
+import datetime
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+# Job settings (override through .env)
+SCRAPE_WORKERS = int(os.getenv("SCRAPE_WORKERS", 2))
+JOB_HISTORY_LIMIT = int(os.getenv("JOB_HISTORY_LIMIT", 100))
+
+class ScrapeJob:
+    """A scrape submitted to the worker pool, with its progress, partial results and telemetry."""
+
+    def __init__(self, url: str, model: str, revisit: bool = False):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.model = model
+        self.revisit = revisit
+        self.status = "queued"
+        self.created_at = datetime.datetime.now()
+        self.started_at: datetime.datetime | None = None
+        self.finished_at: datetime.datetime | None = None
+        self.error: str | None = None
+        self.result: Dict | None = None
+        self.telemetry: Dict = {}
+        self.listings: Dict[str, List[Dict]] = {"ai": [], "manual": []}
+        self.future: Future | None = None
+        self._cancel_event = threading.Event()
+
+    def should_stop(self) -> bool:
+        """Return True once the job has been cancelled."""
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Ask the job to stop; queued jobs are cancelled before they start."""
+        self._cancel_event.set()
+        if self.status == "queued" and self.future and self.future.cancel():
+            self.status = "cancelled"
+            self.finished_at = datetime.datetime.now()
+
+    def add_listing(self, item: Dict):
+        """Record a scraped listing as a partial result."""
+        self.listings.setdefault(item.get("scraper_type", "manual"), []).append(item)
+
+    def to_dict(self, include_listings: bool = True) -> Dict:
+        """Serialize the job for the API."""
+        end = self.finished_at or datetime.datetime.now()
+        data = {
+            "job_id": self.id,
+            "url": self.url,
+            "used_ai_model": self.model,
+            "revisit": self.revisit,
+            "status": self.status,
+            "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "started_at": self.started_at.strftime("%Y-%m-%d %H:%M:%S") if self.started_at else None,
+            "finished_at": self.finished_at.strftime("%Y-%m-%d %H:%M:%S") if self.finished_at else None,
+            "elapsed_time": (end - self.started_at).total_seconds() if self.started_at else 0,
+            "progress": {
+                "ai_listings_processed": len(self.listings.get("ai", [])),
+                "manual_listings_processed": len(self.listings.get("manual", [])),
+            },
+            "telemetry": self.telemetry,
+            "error": self.error,
+        }
+        if include_listings:
+            data["ai_listings"] = list(self.listings.get("ai", []))
+            data["manual_listings"] = list(self.listings.get("manual", []))
+        return data
+
+executor = ThreadPoolExecutor(max_workers=SCRAPE_WORKERS, thread_name_prefix="scrape-job")
+jobs: "OrderedDict[str, ScrapeJob]" = OrderedDict()
+jobs_lock = threading.Lock()
+accepting_jobs = True
+
+def _run_job(job: ScrapeJob, runner: Callable[[ScrapeJob], Dict]):
+    if job.should_stop():
+        job.status = "cancelled"
+        job.finished_at = datetime.datetime.now()
+        return
+    job.status = "running"
+    job.started_at = datetime.datetime.now()
+    try:
+        job.result = runner(job)
+        job.status = "cancelled" if job.should_stop() else "succeeded"
+    except Exception as e:
+        print(f"Scrape job {job.id} failed: {e}")
+        job.error = str(e)
+        job.status = "failed"
+    finally:
+        job.finished_at = datetime.datetime.now()
+
+def submit_job(url: str, model: str, runner: Callable[[ScrapeJob], Dict], revisit: bool = False) -> ScrapeJob:
+    """Queue a scrape on the worker pool and return its job."""
+    if not accepting_jobs:
+        raise RuntimeError("Scraping stopped by user")
+    job = ScrapeJob(url, model, revisit)
+    with jobs_lock:
+        jobs[job.id] = job
+        # Forget the oldest finished jobs beyond the history limit
+        for old_id in [job_id for job_id, old in jobs.items() if old.finished_at][:max(0, len(jobs) - JOB_HISTORY_LIMIT)]:
+            del jobs[old_id]
+    job.future = executor.submit(_run_job, job, runner)
+    return job
+
+def get_job(job_id: str) -> ScrapeJob | None:
+    """Return a job by id, or None if it is unknown."""
+    with jobs_lock:
+        return jobs.get(job_id)
+
+def cancel_job(job_id: str) -> ScrapeJob | None:
+    """Cancel a job by id, returning it, or None if it is unknown."""
+    job = get_job(job_id)
+    if job:
+        job.cancel()
+    return job
+
+def cancel_all_jobs():
+    """Cancel every queued or running job and stop accepting new ones."""
+    global accepting_jobs
+    accepting_jobs = False
+    with jobs_lock:
+        pending = list(jobs.values())
+    for job in pending:
+        job.cancel()
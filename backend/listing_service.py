@@ -1,4 +1,5 @@
 import requests
+from typing import List
 
 def send_to_api(item: dict):
     """Send a scraped listing to the API for storage in the database, updating only scraper-specific fields if it already exists."""
@@ -12,15 +13,25 @@ def send_to_api(item: dict):
             "address": item["address"],
             "url": item["url"],
         }
+        # Optional details never clear values stored by the other scraper
+        for key in ["rooms", "latitude", "longitude"]:
+            if item.get(key) is not None:
+                base_payload[key] = item[key]
         
         # Prepare scraper-specific payload
         scraper_type = item.get("scraper_type")
         update_payload = base_payload.copy()
+        # Page validators are stored per scraper, so each one notices changed pages on its own
+        if scraper_type in ("ai", "manual"):
+            for key in ["etag", "last_modified", "content_hash"]:
+                if item.get(key) is not None:
+                    update_payload[f"{scraper_type}_{key}"] = item[key]
         if scraper_type == "ai":
             update_payload.update({
                 "ai_elapsed_time": item["elapsed_time"],
                 "ai_selector_time": item.get("selector_time"),
                 "ai_memory_usage": item["memory_usage"],
+                "ai_model": item.get("model"),
             })
         elif scraper_type == "manual":
             update_payload.update({
@@ -54,4 +65,9 @@ def send_to_api(item: dict):
         else:
             print(f"Failed to send ({item['url']}): {response.status_code} - {response.text}")
     except requests.RequestException as e:
-        print(f"Error sending {item['url']}: {e}")
\ No newline at end of file
+        print(f"Error sending {item['url']}: {e}")
+
+def send_batch_to_api(items: List[dict]):
+    """Send a batch of scraped listings to the API one listing at a time."""
+    for item in items:
+        send_to_api(item)
@@ -1,13 +1,19 @@
 import signal
 import uvicorn
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import List, Dict, Literal
+import csv
 import datetime
+import io
 from dotenv import load_dotenv
 import os
 import asyncio
+import json
 import re
 
 load_dotenv()
@@ -15,12 +21,26 @@ load_dotenv()
 print(f"OPENAI_API_KEY loaded: {os.getenv('OPENAI_API_KEY') is not None}")
 print(f"GROQ_API_KEY loaded: {os.getenv('GROQ_API_KEY') is not None}")
 
-from db.models import Listing
-from db.database import SessionLocal, engine, Base
-from pydantic import BaseModel
+from db.models import Listing, ListingTelemetry, ScrapeRun
+from db.database import LISTINGS_VERSION, RUNS_VERSION, SessionLocal, notify_write, sync_schema, write_listeners
+from db.repository import ALL_TELEMETRY_COLUMNS, upsert_listings, upsert_listing_rows
+from db.crawl_jobs import crawl_status, enqueue_crawl
+from db.run_history import flush_run_history, query_runs, record_listing_telemetry, record_run, run_to_dict
+from db.stats import (
+    PHASE_METRICS, observations_from_row, overall_stats, record_listing_changes, record_observations, rollup_breakdown,
+)
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
-from scrapers.wolf import scrape_wolf, get_manual_processed_count, reset_manual_processed_count
-from scrapers.ai_scraper import scrape_ai_listings, get_ai_processed_count, reset_ai_processed_count
+from backend.response_cache import cached_response, get_response_cache_stats, invalidate_responses
+from backend.jobs import ScrapeJob, submit_job, get_job, cancel_job, cancel_all_jobs
+from scrapers.wolf import get_manual_processed_count, reset_manual_processed_count
+from scrapers.ai_scraper import get_ai_processed_count, reset_ai_processed_count
+from scrapers.combined import scrape_combined
+from scrapers.llm_client import get_llm_stats
+from scrapers.pipeline import shutdown_parse_pool
+from scrapers.selector_cache import get_selector_cache_stats
+from scrapers.selector_inference import get_selector_inference_stats
+from scrapers.telemetry_sink import flush_telemetry
 
 app = FastAPI()
 
@@ -32,7 +52,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-Base.metadata.create_all(bind=engine)
+sync_schema()
+write_listeners.append(invalidate_responses)
+
+LISTINGS_PAGE_SIZE = int(os.getenv("LISTINGS_PAGE_SIZE", 100))
+LISTINGS_MAX_PAGE_SIZE = int(os.getenv("LISTINGS_MAX_PAGE_SIZE", 1000))
+LISTINGS_STREAM_BATCH_SIZE = 1000
+SCRAPING_HISTORY_SIZE = int(os.getenv("SCRAPING_HISTORY_SIZE", 20))
 
 class ListingBase(BaseModel):
     title: str
@@ -40,11 +66,21 @@ class ListingBase(BaseModel):
     area: int | None = None
     address: str
     url: str
+    rooms: int | None = None
+    latitude: float | None = None
+    longitude: float | None = None
     ai_elapsed_time: float | None = None
     ai_selector_time: float | None = None
     ai_memory_usage: float | None = None
+    ai_model: str | None = None
     manual_elapsed_time: float | None = None
     manual_memory_usage: float | None = None
+    ai_etag: str | None = None
+    ai_last_modified: str | None = None
+    ai_content_hash: str | None = None
+    manual_etag: str | None = None
+    manual_last_modified: str | None = None
+    manual_content_hash: str | None = None
 
 class ListingCreate(BaseModel):
     title: str
@@ -52,11 +88,21 @@ class ListingCreate(BaseModel):
     area: int | None = None
     address: str
     url: str
+    rooms: int | None = None
+    latitude: float | None = None
+    longitude: float | None = None
     ai_elapsed_time: float | None = None
     ai_selector_time: float | None = None
     ai_memory_usage: float | None = None
+    ai_model: str | None = None
     manual_elapsed_time: float | None = None
     manual_memory_usage: float | None = None
+    ai_etag: str | None = None
+    ai_last_modified: str | None = None
+    ai_content_hash: str | None = None
+    manual_etag: str | None = None
+    manual_last_modified: str | None = None
+    manual_content_hash: str | None = None
 
 class ListingRead(ListingBase):
     id: int
@@ -64,6 +110,8 @@ class ListingRead(ListingBase):
     class Config:
         from_attributes = True  # Updated for Pydantic V2
 
+listings_adapter = TypeAdapter(List[ListingRead])
+
 def get_db() -> Session:
     db = SessionLocal()
     try:
@@ -71,25 +119,116 @@ def get_db() -> Session:
     finally:
         db.close()
 
-should_stop = False
-scraping_history = []
 last_used_model = "gpt-4o-mini"
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Property Listings API"}
 
-@app.get("/listings", response_model=List[ListingRead])
-def get_listings(url: str | None = None, db: Session = Depends(get_db)):
+def listing_filters(
+    url: str | None = None,
+    min_rent: int | None = None,
+    max_rent: int | None = None,
+    min_area: int | None = None,
+    max_area: int | None = None,
+    address: str | None = None,
+    scraper: str | None = None,
+) -> list:
+    """Build SQL conditions for the listing filters that were given."""
+    conditions = []
     if url:
-        return db.query(Listing).filter(Listing.url == url).all()
-    return db.query(Listing).all()
+        conditions.append(Listing.url == url)
+    if min_rent is not None:
+        conditions.append(Listing.rent >= min_rent)
+    if max_rent is not None:
+        conditions.append(Listing.rent <= max_rent)
+    if min_area is not None:
+        conditions.append(Listing.area >= min_area)
+    if max_area is not None:
+        conditions.append(Listing.area <= max_area)
+    if address:
+        conditions.append(Listing.address.ilike(f"%{address}%"))
+    if scraper == "ai":
+        conditions.append(or_(Listing.ai_elapsed_time.isnot(None), Listing.ai_memory_usage.isnot(None)))
+    elif scraper == "manual":
+        conditions.append(or_(Listing.manual_elapsed_time.isnot(None), Listing.manual_memory_usage.isnot(None)))
+    return conditions
+
+def stream_listings(conditions: list, after_id: int | None, limit: int | None, fmt: str):
+    """Yield listings as NDJSON or CSV chunks from a server-side cursor."""
+    columns = list(Listing.__table__.columns)
+    query = select(*columns).where(*conditions).order_by(Listing.id)
+    if after_id is not None:
+        query = query.where(Listing.id > after_id)
+    if limit is not None:
+        query = query.limit(limit)
+
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(stream_results=True, yield_per=LISTINGS_STREAM_BATCH_SIZE))
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow([column.name for column in columns])
+            for rows in result.partitions():
+                writer.writerows(rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield "".join(json.dumps(dict(row._mapping)) + "\n" for row in rows)
+    finally:
+        db.close()
+
+@app.get("/listings", response_model=List[ListingRead])
+def get_listings(
+    request: Request,
+    url: str | None = None,
+    min_rent: int | None = None,
+    max_rent: int | None = None,
+    min_area: int | None = None,
+    max_area: int | None = None,
+    address: str | None = None,
+    scraper: Literal["ai", "manual"] | None = None,
+    after_id: int | None = None,
+    limit: int | None = Query(None, ge=1),
+    fmt: Literal["json", "ndjson", "csv"] = Query("json", alias="format"),
+    db: Session = Depends(get_db),
+):
+    conditions = listing_filters(url, min_rent, max_rent, min_area, max_area, address, scraper)
+
+    if fmt == "ndjson":
+        return StreamingResponse(stream_listings(conditions, after_id, limit, fmt), media_type="application/x-ndjson")
+    if fmt == "csv":
+        return StreamingResponse(
+            stream_listings(conditions, after_id, limit, fmt),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=listings.csv"},
+        )
+
+    # Keyset pagination: pass the X-Next-After-Id header back as after_id to get the next page
+    limit = min(limit or LISTINGS_PAGE_SIZE, LISTINGS_MAX_PAGE_SIZE)
+
+    def build():
+        query = db.query(Listing).filter(*conditions)
+        if after_id is not None:
+            query = query.filter(Listing.id > after_id)
+        listings = query.order_by(Listing.id).limit(limit).all()
+        headers = {"X-Next-After-Id": str(listings[-1].id)} if len(listings) == limit else {}
+        return listings_adapter.dump_json(listings_adapter.validate_python(listings, from_attributes=True)), headers
+
+    return cached_response(request, build)
 
 @app.post("/listings", response_model=ListingRead)
 def create_listing(listing: ListingCreate, db: Session = Depends(get_db)):
     db_listing = Listing(**listing.dict())
     db.add(db_listing)
+    record_observations(db, observations_from_row(listing.dict()))
+    record_listing_changes(db, [(None, listing.dict())])
     db.commit()
+    notify_write()
     db.refresh(db_listing)
     return db_listing
 
@@ -98,6 +237,7 @@ def update_listing(listing_id: int, listing: ListingCreate, db: Session = Depend
     db_listing = db.query(Listing).filter(Listing.id == listing_id).first()
     if not db_listing:
         raise HTTPException(status_code=404, detail="Listing not found")
+    previous = {column: getattr(db_listing, column) for column in ALL_TELEMETRY_COLUMNS}
     for key, value in listing.dict().items():
         if key == "rent" and value and isinstance(value, str):
             value = int("".join(filter(str.isdigit, value)))
@@ -113,82 +253,293 @@ def update_listing(listing_id: int, listing: ListingCreate, db: Session = Depend
                     print(f"Failed to convert area '{value}' to integer in update_listing")
                     value = None
         setattr(db_listing, key, value)
+    current = {column: getattr(db_listing, column) for column in ALL_TELEMETRY_COLUMNS}
+    record_observations(db, observations_from_row(current, previous))
+    record_listing_changes(db, [(previous, current)])
     db.commit()
+    notify_write()
     db.refresh(db_listing)
     return db_listing
 
-@app.get("/scrape")
-async def scrape_endpoint(url: str = "https://wolfnieruchomosci.gratka.pl/nieruchomosci/mieszkania", model: str = "gpt-4o-mini"):
-    global should_stop, scraping_history, last_used_model
-    if should_stop:
-        return {"status": "error", "message": "Scraping stopped by user"}
+async def read_listing_payloads(request: Request) -> List:
+    """Read a JSON array or an NDJSON stream of listings; undecodable NDJSON lines become ValueErrors."""
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" not in content_type and "jsonlines" not in content_type:
+        try:
+            payloads = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(payloads, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        return payloads
+
+    payloads = []
+    buffer = b""
+
+    def parse_line(line: bytes):
+        if not line.strip():
+            return
+        try:
+            payloads.append(json.loads(line))
+        except ValueError as e:
+            payloads.append(ValueError(f"Invalid JSON: {e}"))
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            parse_line(line)
+    parse_line(buffer)
+    return payloads
+
+@app.post("/listings/bulk")
+async def bulk_upsert_listings(request: Request):
+    payloads = await read_listing_payloads(request)
+
+    results = []
+    rows = []
+    for index, payload in enumerate(payloads):
+        try:
+            if isinstance(payload, Exception):
+                raise payload
+            if not isinstance(payload, dict):
+                raise ValueError("Listing must be a JSON object")
+            row = ListingCreate(**payload).dict()
+        except (ValidationError, ValueError) as e:
+            results.append({"index": index, "url": payload.get("url") if isinstance(payload, dict) else None, "status": "error", "detail": str(e)})
+            continue
+        rows.append(row)
+        results.append({"index": index, "url": row["url"], "status": None})
 
-    valid_models = ["gpt-4o", "gpt-4o-mini", "gpt-3.5-turbo", "groq"]
-    model_to_use = model if model in valid_models else "gpt-4o-mini"
-    last_used_model = model_to_use
-    
     try:
-        ai_listings = await asyncio.to_thread(scrape_ai_listings, url, model=model_to_use)
-        manual_listings = scrape_wolf(url)
-        
-        combined_listings = ai_listings + [l for l in manual_listings if l.get("url") not in [a["url"] for a in ai_listings]]
-        
-        attempt_stats = {
-            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "url": url,
-            "used_ai_model": model_to_use,
-            "ai_listings_processed": len(ai_listings),
-            "manual_listings_processed": len(manual_listings),
-            "total_listings_processed": len(combined_listings),
-            "ai_average_scraper_time": sum(l["elapsed_time"] for l in ai_listings) / len(ai_listings) if ai_listings else 0,
-            "ai_average_selector_time": sum(l["selector_time"] for l in ai_listings) / len(ai_listings) if ai_listings else 0,
-            "ai_average_memory_usage_mb": sum(l["memory_usage"] for l in ai_listings) / len(ai_listings) if ai_listings else 0,
-            "manual_average_scraper_time": sum(l["elapsed_time"] for l in manual_listings) / len(manual_listings) if manual_listings else 0,
-            "manual_average_memory_usage_mb": sum(l["memory_usage"] for l in manual_listings) / len(manual_listings) if manual_listings else 0
-        }
-        
-        scraping_history.append(attempt_stats)
-        
-        return {
-            "status": "success",
-            "ai_listings": ai_listings,
-            "manual_listings": manual_listings,
-            "combined_listings": combined_listings,
-            "used_ai_model": model_to_use
-        }
+        statuses = await asyncio.to_thread(upsert_listing_rows, rows) if rows else {}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Bulk upsert failed: {str(e)}")
+
+    # Repeated URLs within one request are merged into one row, reported as updated after its first occurrence
+    seen = set()
+    for result in results:
+        if result["status"] is None:
+            url = result["url"]
+            result["status"] = "updated" if url in seen else statuses[url]
+            seen.add(url)
+
+    return {
+        "created": sum(1 for r in results if r["status"] == "created"),
+        "updated": sum(1 for r in results if r["status"] == "updated"),
+        "errors": sum(1 for r in results if r["status"] == "error"),
+        "items": results,
+    }
+
+def average(listings: List[Dict], key: str) -> float:
+    """Average a telemetry value over the listings that measured it (memory may be sampled)."""
+    values = [listing[key] for listing in listings if listing.get(key) is not None]
+    return sum(values) / len(values) if values else 0
+
+def resolve_model(model: str) -> str:
+    """Return the requested AI model, or the default if it is not supported."""
+    valid_models = ["gpt-4o", "gpt-4o-mini", "gpt-3.5-turbo", "groq", "mock"]
+    return model if model in valid_models else "gpt-4o-mini"
+
+def record_job_listing(job: ScrapeJob, item: Dict):
+    """Track a scraped listing on the job and in the run history."""
+    job.add_listing(item)
+    record_listing_telemetry(job.id, item)
+
+def run_scrape_job(job: ScrapeJob) -> Dict:
+    """Run the AI and manual scrapers for a job concurrently on a worker thread."""
+    record_run({
+        "job_id": job.id,
+        "url": job.url,
+        "used_ai_model": job.model,
+        "status": "running",
+        "started_at": datetime.datetime.now(),
+    })
+    on_item = lambda item: record_job_listing(job, item)
+    try:
+        # Write straight to the database instead of calling back into this API over HTTP
+        result = scrape_combined(
+            job.url,
+            model=job.model,
+            should_stop=job.should_stop,
+            on_item=on_item,
+            persist=upsert_listings,
+            revisit=job.revisit,
+        )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
+        record_run({"job_id": job.id, "status": "failed", "error": str(e), "finished_at": datetime.datetime.now()})
+        raise
+
+    ai_listings = result["ai_listings"]
+    manual_listings = result["manual_listings"]
+    combined_listings = result["combined_listings"]
+
+    attempt_stats = {
+        "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "url": job.url,
+        "used_ai_model": job.model,
+        "ai_listings_processed": len(ai_listings),
+        "manual_listings_processed": len(manual_listings),
+        "total_listings_processed": len(combined_listings),
+        "ai_average_scraper_time": average(ai_listings, "elapsed_time"),
+        "ai_average_selector_time": average(ai_listings, "selector_time"),
+        "ai_average_memory_usage_mb": average(ai_listings, "memory_usage"),
+        "manual_average_scraper_time": average(manual_listings, "elapsed_time"),
+        "manual_average_memory_usage_mb": average(manual_listings, "memory_usage")
+    }
+
+    job.telemetry = attempt_stats
+    record_run({
+        **{key: value for key, value in attempt_stats.items() if key != "timestamp"},
+        "job_id": job.id,
+        "status": "cancelled" if job.should_stop() else "succeeded",
+        "finished_at": datetime.datetime.now(),
+    })
+
+    return {
+        "status": "success",
+        "ai_listings": ai_listings,
+        "manual_listings": manual_listings,
+        "combined_listings": combined_listings,
+        "used_ai_model": job.model
+    }
+
+@app.post("/scrape")
+def submit_scrape(
+    url: str = "https://wolfnieruchomosci.gratka.pl/nieruchomosci/mieszkania",
+    model: str = "gpt-4o-mini",
+    revisit: bool = False,
+):
+    global last_used_model
+    last_used_model = resolve_model(model)
+    try:
+        job = submit_job(url, last_used_model, run_scrape_job, revisit=revisit)
+    except RuntimeError as e:
+        return {"status": "error", "message": str(e)}
+    return {"status": "queued", "job_id": job.id}
+
+@app.get("/scrape")
+async def scrape_endpoint(
+    url: str = "https://wolfnieruchomosci.gratka.pl/nieruchomosci/mieszkania",
+    model: str = "gpt-4o-mini",
+    revisit: bool = False,
+):
+    global last_used_model
+    last_used_model = resolve_model(model)
+    try:
+        job = submit_job(url, last_used_model, run_scrape_job, revisit=revisit)
+    except RuntimeError as e:
+        return {"status": "error", "message": str(e)}
+
+    try:
+        # Shielded so a client disconnecting cancels only this request, not the job's future
+        await asyncio.shield(asyncio.wrap_future(job.future))
+    except asyncio.CancelledError:
+        if not job.future.cancelled():
+            raise
+        # The job was cancelled before it started, e.g. by the executor shutting down
+        if job.finished_at is None:
+            job.status = "cancelled"
+            job.finished_at = datetime.datetime.now()
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Scraping failed: {job.error}")
+    if job.status == "cancelled":
+        return {"status": "error", "message": "Scraping stopped by user"}
+    return job.result
+
+@app.post("/crawl")
+def submit_crawl(
+    url: str = "https://wolfnieruchomosci.gratka.pl/nieruchomosci/mieszkania",
+    model: str = "gpt-4o-mini",
+    revisit: bool = False,
+):
+    """Queue a crawl for the distributed workers (python -m scrapers.worker) instead of this process."""
+    return {"status": "queued", "crawl_id": enqueue_crawl(url, resolve_model(model), revisit)}
+
+@app.get("/crawl/{crawl_id}")
+def get_crawl_status(crawl_id: str):
+    status = crawl_status(crawl_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Crawl not found")
+    return status
+
+@app.get("/jobs/{job_id}")
+def get_job_status(job_id: str, include_listings: bool = True):
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict(include_listings=include_listings)
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job_endpoint(job_id: str):
+    job = cancel_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict(include_listings=False)
 
 @app.get("/stats")
-def get_stats(db: Session = Depends(get_db)):
-    listings = db.query(Listing).all()
-    
-    ai_listings = [l for l in listings if l.ai_elapsed_time is not None or l.ai_memory_usage is not None]
-    manual_listings = [l for l in listings if l.manual_elapsed_time is not None or l.manual_memory_usage is not None]
-    
-    overall_stats = {
-        "total_listings_processed": len(listings),
-        "ai_total_processed": len(ai_listings),
-        "manual_total_processed": len(manual_listings),
-        "combined_average_time": (
-            sum(l.ai_elapsed_time for l in ai_listings if l.ai_elapsed_time) +
-            sum(l.manual_elapsed_time for l in manual_listings if l.manual_elapsed_time)
-        ) / (len(ai_listings) + len(manual_listings)) if (ai_listings or manual_listings) else 0,
-        "combined_average_memory": (
-            sum(l.ai_memory_usage for l in ai_listings if l.ai_memory_usage) +
-            sum(l.manual_memory_usage for l in manual_listings if l.manual_memory_usage)
-        ) / (len(ai_listings) + len(manual_listings)) if (ai_listings or manual_listings) else 0
+def get_stats(request: Request, db: Session = Depends(get_db)):
+    def build():
+        stats = {
+            "scraping_history": [run_to_dict(run) for run in query_runs(db, limit=SCRAPING_HISTORY_SIZE)],
+            "overall_stats": overall_stats(db),
+            "scraper_breakdown": rollup_breakdown(db),
+        }
+        return json.dumps(jsonable_encoder(stats)).encode("utf-8"), {}
+
+    return cached_response(request, build, versions=(LISTINGS_VERSION, RUNS_VERSION))
+
+@app.get("/stats/counters")
+def get_stats_counters():
+    """In-process counters; they change without database writes, so they are never cached."""
+    return {
+        "selector_cache": get_selector_cache_stats(),
+        "selector_inference": get_selector_inference_stats(),
+        "llm": get_llm_stats(),
+        "response_cache": get_response_cache_stats(),
     }
-    
+
+@app.get("/stats/runs")
+def get_runs(
+    response: Response,
+    start: datetime.datetime | None = None,
+    end: datetime.datetime | None = None,
+    status: Literal["running", "succeeded", "failed", "cancelled"] | None = None,
+    before_id: int | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    # Newest first; pass the X-Next-Before-Id header back as before_id to get older runs
+    runs = query_runs(db, start=start, end=end, status=status, before_id=before_id, limit=limit)
+    if len(runs) == limit:
+        response.headers["X-Next-Before-Id"] = str(runs[-1].id)
+    return [run_to_dict(run) for run in runs]
+
+@app.get("/stats/runs/{job_id}")
+def get_run(job_id: str, db: Session = Depends(get_db)):
+    run = db.query(ScrapeRun).filter(ScrapeRun.job_id == job_id).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    telemetry = db.query(ListingTelemetry).filter(ListingTelemetry.job_id == job_id).order_by(ListingTelemetry.id)
     return {
-        "scraping_history": scraping_history,
-        "overall_stats": overall_stats
+        **run_to_dict(run),
+        "listings": [
+            {
+                "url": row.url,
+                "scraper_type": row.scraper_type,
+                "model": row.model,
+                "elapsed_time": row.elapsed_time,
+                "selector_time": row.selector_time,
+                "memory_usage": row.memory_usage,
+                **{metric: getattr(row, metric) for metric in PHASE_METRICS},
+            }
+            for row in telemetry
+        ],
     }
 
 def signal_handler(sig, frame):
-    global should_stop
     print("\nReceived Ctrl+C, shutting down gracefully...")
-    should_stop = True
+    cancel_all_jobs()
 
 class LifespanManager:
     async def __aenter__(self):
@@ -201,8 +552,10 @@ class LifespanManager:
         pass
 
 async def shutdown():
-    global should_stop
-    should_stop = True
+    cancel_all_jobs()
+    await asyncio.to_thread(flush_run_history)
+    shutdown_parse_pool()
+    flush_telemetry()
     print("Shutting down server...")
 
 app.add_event_handler("startup", lambda: None)
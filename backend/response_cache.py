@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple
+
+from fastapi import Request, Response
+
+from db.database import LISTINGS_VERSION, get_write_versions
+
+try:
+    import redis
+except ImportError:  # redis is optional, the in-process backend is always available
+    redis = None
+
+# Response cache settings (override through .env)
+RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "1") == "1"
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")  # "memory" or "redis"
+RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 60))  # Seconds an entry is kept
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 512))
+
+# (ETag, body, extra headers)
+CachedResponse = Tuple[str, bytes, Dict[str, str]]
+
+class MemoryBackend:
+    """In-process LRU of serialized responses."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def clear(self, name: str):
+        """Drop the entries keyed by the given write version."""
+        with self.lock:
+            for key in [key for key in self.entries if f"{name}=" in key.split(":", 1)[0]]:
+                del self.entries[key]
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: CachedResponse, ttl: int):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+class RedisBackend:
+    """Responses in Redis, shared by every API process.
+
+    Any client with the redis-py get/set interface works, e.g. fakeredis in tests.
+    """
+
+    def __init__(self, client=None, url: str = RESPONSE_CACHE_REDIS_URL):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the redis package")
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def clear(self, name: str):
+        # Entries of older write versions are never hit again and expire through their TTL
+        pass
+
+    def get(self, key: str) -> CachedResponse | None:
+        data = self.client.get(f"response_cache:{key}")
+        if data is None:
+            return None
+        header, body = data.split(b"\n", 1)
+        etag, headers = json.loads(header)
+        return etag, body, headers
+
+    def set(self, key: str, value: CachedResponse, ttl: int):
+        etag, body, headers = value
+        self.client.set(f"response_cache:{key}", json.dumps([etag, headers]).encode() + b"\n" + body, ex=ttl)
+
+backend: MemoryBackend | RedisBackend | None = None
+cache_hits = 0
+cache_misses = 0
+not_modified = 0
+
+def get_backend() -> MemoryBackend | RedisBackend:
+    global backend
+    if backend is None:
+        backend = RedisBackend() if RESPONSE_CACHE_BACKEND == "redis" else MemoryBackend()
+    return backend
+
+def set_backend(new_backend: MemoryBackend | RedisBackend):
+    """Swap the cache backend, e.g. for a Redis stand-in."""
+    global backend
+    backend = new_backend
+
+def invalidate_responses(name: str):
+    """Drop cached responses after a write in this process; they are keyed by the older write version."""
+    try:
+        get_backend().clear(name)
+    except Exception as e:
+        print(f"Failed to invalidate the response cache: {e}")
+
+def _respond(request: Request, cached: CachedResponse, media_type: str) -> Response:
+    global not_modified
+    etag, body, headers = cached
+    headers = {**headers, "ETag": etag, "Cache-Control": "no-cache"}
+    if etag in (value.strip() for value in request.headers.get("if-none-match", "").split(",")):
+        not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+def cached_response(
+    request: Request,
+    build: Callable[[], Tuple[bytes, Dict[str, str]]],
+    ttl: int = RESPONSE_CACHE_TTL,
+    media_type: str = "application/json",
+    versions: Tuple[str, ...] = (LISTINGS_VERSION,),
+) -> Response:
+    """Serve a response from the cache, or `build` its (body, headers) and cache it under the current write versions.
+
+    `versions` names the data the response is built from. Write versions are kept in the database, so writes by any
+    process, including workers, invalidate it. Clients that send back the ETag get a 304 while the body is unchanged.
+    """
+    global cache_hits, cache_misses
+    if not RESPONSE_CACHE:
+        body, headers = build()
+        return _respond(request, (f'"{hashlib.sha1(body).hexdigest()}"', body, headers), media_type)
+
+    cache = get_backend()
+    try:
+        current = get_write_versions(versions)
+        key = ",".join(f"{name}={version}" for name, version in current.items())
+        key = f"{key}:{request.url.path}?{sorted(request.query_params.multi_items())}"
+        cached = cache.get(key)
+    except Exception as e:
+        print(f"Response cache lookup failed: {e}")
+        key, cached = None, None
+    if cached is not None:
+        cache_hits += 1
+        return _respond(request, cached, media_type)
+
+    cache_misses += 1
+    body, headers = build()
+    cached = (f'"{hashlib.sha1(body).hexdigest()}"', body, headers)
+    if key is not None:
+        try:
+            cache.set(key, cached, ttl)
+        except Exception as e:
+            print(f"Failed to store response for {request.url.path}: {e}")
+    return _respond(request, cached, media_type)
+
+def get_response_cache_stats() -> Dict[str, int | float | str]:
+    """Return hit, miss and 304 counters of the response cache."""
+    lookups = cache_hits + cache_misses
+    return {
+        "backend": RESPONSE_CACHE_BACKEND if RESPONSE_CACHE else "off",
+        "hits": cache_hits,
+        "misses": cache_misses,
+        "not_modified": not_modified,
+        "hit_rate": cache_hits / lookups if lookups else 0.0,
+    }
@@ -0,0 +1,174 @@
+import datetime
+import json
+import os
+import uuid
+from typing import Dict, List
+
+from sqlalchemy import and_, func, or_
+
+from db.database import SessionLocal, WriteSessionLocal
+from db.models import CrawlJob
+
+# Job queue settings (override through .env)
+CRAWL_JOB_MAX_ATTEMPTS = int(os.getenv("CRAWL_JOB_MAX_ATTEMPTS", 3))
+CRAWL_JOB_RETRY_DELAY = float(os.getenv("CRAWL_JOB_RETRY_DELAY", 30))  # Seconds, doubled after every failed attempt
+
+INDEX = "index"
+LISTINGS = "listings"
+
+def job_to_dict(job: CrawlJob) -> Dict:
+    return {
+        "id": job.id,
+        "crawl_id": job.crawl_id,
+        "seed": job.seed,
+        "kind": job.kind,
+        "urls": json.loads(job.urls),
+        "model": job.model,
+        "revisit": bool(job.revisit),
+        "attempts": job.attempts,
+    }
+
+def enqueue_crawl(seed: str, model: str = "gpt-4o-mini", revisit: bool = False) -> str:
+    """Queue the first index page of a distributed crawl and return its crawl_id."""
+    crawl_id = uuid.uuid4().hex
+    enqueue_jobs({"crawl_id": crawl_id, "seed": seed, "model": model, "revisit": revisit}, INDEX, [[seed]])
+    return crawl_id
+
+def enqueue_jobs(crawl: Dict, kind: str, batches: List[List[str]], attempts: int = 0, delay: float = 0):
+    """Queue one job of `kind` per URL batch for the crawl of `crawl` (a leased job or enqueue_crawl's values)."""
+    if not batches:
+        return
+    now = datetime.datetime.now()
+    db = WriteSessionLocal()
+    try:
+        db.add_all([
+            CrawlJob(
+                crawl_id=crawl["crawl_id"],
+                seed=crawl["seed"],
+                kind=kind,
+                urls=json.dumps(urls),
+                model=crawl["model"],
+                revisit=int(bool(crawl["revisit"])),
+                attempts=attempts,
+                available_at=now + datetime.timedelta(seconds=delay),
+                created_at=now,
+            )
+            for urls in batches
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+def lease_job(worker_id: str, lease_seconds: float) -> Dict | None:
+    """Atomically lease the oldest available job, including jobs whose lease ran out, or return None.
+
+    PostgreSQL skips rows other workers have locked (FOR UPDATE SKIP LOCKED); on SQLite the write
+    transaction is taken up front, so only one worker selects and updates at a time.
+    """
+    now = datetime.datetime.now()
+    db = WriteSessionLocal()
+    try:
+        # Jobs abandoned by a dead worker on their last attempt are given up
+        db.query(CrawlJob).filter(
+            CrawlJob.status == "leased", CrawlJob.lease_expires_at < now, CrawlJob.attempts >= CRAWL_JOB_MAX_ATTEMPTS
+        ).update({"status": "failed", "error": "Lease expired", "finished_at": now}, synchronize_session=False)
+
+        job = db.query(CrawlJob).filter(or_(
+            and_(CrawlJob.status == "queued", CrawlJob.available_at <= now),
+            and_(CrawlJob.status == "leased", CrawlJob.lease_expires_at < now),
+        )).order_by(CrawlJob.id).limit(1).with_for_update(skip_locked=True).first()
+        if job is None:
+            db.commit()
+            return None
+        job.status = "leased"
+        job.lease_owner = worker_id
+        job.lease_expires_at = now + datetime.timedelta(seconds=lease_seconds)
+        job.heartbeat_at = now
+        job.attempts = (job.attempts or 0) + 1
+        leased = job_to_dict(job)
+        db.commit()
+        return leased
+    finally:
+        db.close()
+
+def _update_leased(job_id: int, worker_id: str, values: Dict) -> bool:
+    """Update a job only while `worker_id` still holds its lease."""
+    db = WriteSessionLocal()
+    try:
+        updated = db.query(CrawlJob).filter(
+            CrawlJob.id == job_id, CrawlJob.lease_owner == worker_id, CrawlJob.status == "leased"
+        ).update(values, synchronize_session=False)
+        db.commit()
+        return bool(updated)
+    finally:
+        db.close()
+
+def heartbeat(job_id: int, worker_id: str, lease_seconds: float) -> bool:
+    """Extend a lease; returns False once another worker has taken the job over."""
+    now = datetime.datetime.now()
+    return _update_leased(job_id, worker_id, {
+        "heartbeat_at": now, "lease_expires_at": now + datetime.timedelta(seconds=lease_seconds)
+    })
+
+def complete_job(job_id: int, worker_id: str, listings_scraped: int = 0) -> bool:
+    return _update_leased(job_id, worker_id, {
+        "status": "done", "listings_scraped": listings_scraped, "finished_at": datetime.datetime.now(), "error": None
+    })
+
+def fail_job(job: Dict, worker_id: str, error: str) -> bool:
+    """Queue a failed job again after a backoff, or mark it failed once it ran out of attempts."""
+    if job["attempts"] >= CRAWL_JOB_MAX_ATTEMPTS:
+        return _update_leased(job["id"], worker_id, {
+            "status": "failed", "error": error, "finished_at": datetime.datetime.now()
+        })
+    delay = CRAWL_JOB_RETRY_DELAY * 2 ** (job["attempts"] - 1)
+    return _update_leased(job["id"], worker_id, {
+        "status": "queued",
+        "error": error,
+        "lease_owner": None,
+        "lease_expires_at": None,
+        "available_at": datetime.datetime.now() + datetime.timedelta(seconds=delay),
+    })
+
+def release_job(job: Dict, worker_id: str) -> bool:
+    """Hand a job back to the queue untouched, e.g. when the worker shuts down."""
+    return _update_leased(job["id"], worker_id, {
+        "status": "queued", "attempts": job["attempts"] - 1, "lease_owner": None, "lease_expires_at": None
+    })
+
+def count_jobs(crawl_id: str, kind: str) -> int:
+    db = SessionLocal()
+    try:
+        return db.query(CrawlJob).filter(CrawlJob.crawl_id == crawl_id, CrawlJob.kind == kind).count()
+    finally:
+        db.close()
+
+def active_jobs() -> int:
+    """Return the number of queued or leased jobs across all crawls."""
+    db = SessionLocal()
+    try:
+        return db.query(CrawlJob).filter(CrawlJob.status.in_(["queued", "leased"])).count()
+    finally:
+        db.close()
+
+def crawl_status(crawl_id: str) -> Dict | None:
+    """Summarize a distributed crawl: job counts per kind and status, and listings scraped so far."""
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            CrawlJob.kind, CrawlJob.status, func.count(CrawlJob.id), func.coalesce(func.sum(CrawlJob.listings_scraped), 0)
+        ).filter(CrawlJob.crawl_id == crawl_id).group_by(CrawlJob.kind, CrawlJob.status).all()
+    finally:
+        db.close()
+    if not rows:
+        return None
+    jobs: Dict[str, Dict[str, int]] = {}
+    for kind, status, count, _ in rows:
+        jobs.setdefault(kind, {})[status] = count
+    active = sum(count for _, status, count, _ in rows if status in ("queued", "leased"))
+    return {
+        "crawl_id": crawl_id,
+        "status": "running" if active else "finished",
+        "jobs": jobs,
+        "listings_scraped": sum(scraped for *_, scraped in rows),
+    }
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float
+import datetime
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, UniqueConstraint
 from db.database import Base
 
 class Listing(Base):
@@ -7,13 +8,187 @@ class Listing(Base):
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String, unique=True, index=True)
     title = Column(String, nullable=True)
-    rent = Column(Integer, nullable=True)
-    area = Column(Integer, nullable=True)
+    rent = Column(Integer, nullable=True, index=True)
+    area = Column(Integer, nullable=True, index=True)
     address = Column(String, nullable=True)
+    # Details decoded from the page's Nuxt payload
+    rooms = Column(Integer, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     # AI scraper telemetry
-    ai_elapsed_time = Column(Float, nullable=True)
+    ai_elapsed_time = Column(Float, nullable=True, index=True)
     ai_selector_time = Column(Float, nullable=True)
     ai_memory_usage = Column(Float, nullable=True)
+    ai_model = Column(String, nullable=True)
     # Manual scraper telemetry
-    manual_elapsed_time = Column(Float, nullable=True)
-    manual_memory_usage = Column(Float, nullable=True)
\ No newline at end of file
+    manual_elapsed_time = Column(Float, nullable=True, index=True)
+    manual_memory_usage = Column(Float, nullable=True)
+    # Page validators used to skip unchanged pages on revisits, kept per scraper so that one scraper
+    # storing a new version of the page never makes the other skip it
+    ai_etag = Column(String, nullable=True)
+    ai_last_modified = Column(String, nullable=True)
+    ai_content_hash = Column(String, nullable=True)
+    manual_etag = Column(String, nullable=True)
+    manual_last_modified = Column(String, nullable=True)
+    manual_content_hash = Column(String, nullable=True)
+
+class SelectorCache(Base):
+    __tablename__ = "selector_cache"
+    __table_args__ = (UniqueConstraint("domain", "fingerprint", name="uq_selector_cache_domain_fingerprint"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    domain = Column(String, index=True)
+    fingerprint = Column(String)
+    # JSON-encoded mapping of field name -> CSS selector
+    selectors = Column(String)
+    model = Column(String, nullable=True)
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.datetime.now)
+    last_used_at = Column(DateTime, default=datetime.datetime.now, index=True)
+
+class FrontierEntry(Base):
+    __tablename__ = "crawl_frontier"
+    __table_args__ = (UniqueConstraint("seed", "scraper_type", "url", name="uq_crawl_frontier_seed_scraper_url"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Listings page the crawl started from
+    seed = Column(String, index=True)
+    scraper_type = Column(String)
+    url = Column(String)
+    # "index" for paginated listings pages, "listing" for individual listings
+    kind = Column(String)
+    # "pending", "in_progress" (claimed by a running crawl), "done" or "failed"
+    status = Column(String, default="pending", index=True)
+    priority = Column(Integer, default=0)
+    attempts = Column(Integer, default=0)
+    discovered_at = Column(DateTime, default=datetime.datetime.now)
+    processed_at = Column(DateTime, nullable=True)
+    # Crawl holding an in_progress URL; others may claim it once the lease ran out
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+
+class StatsRollup(Base):
+    __tablename__ = "stats_rollup"
+    __table_args__ = (UniqueConstraint("scraper_type", "model", name="uq_stats_rollup_scraper_model"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    scraper_type = Column(String)
+    # AI model name, or "" for the manual scraper
+    model = Column(String, default="")
+    samples = Column(Integer, default=0)
+    elapsed_time_sum = Column(Float, default=0)
+    selector_time_sum = Column(Float, default=0)
+    memory_usage_sum = Column(Float, default=0)
+    # Phase timing sums, from the listing telemetry of scrape jobs
+    fetch_time_sum = Column(Float, default=0)
+    parse_time_sum = Column(Float, default=0)
+    llm_time_sum = Column(Float, default=0)
+    persist_time_sum = Column(Float, default=0)
+    updated_at = Column(DateTime, default=datetime.datetime.now)
+
+class StatsHistogram(Base):
+    __tablename__ = "stats_histogram"
+    __table_args__ = (
+        UniqueConstraint("scraper_type", "model", "metric", "bucket", name="uq_stats_histogram_bucket"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    scraper_type = Column(String)
+    model = Column(String, default="")
+    # "elapsed_time", "selector_time" or "memory_usage"
+    metric = Column(String)
+    # Log-scale bucket index, see db.stats.bucket_for
+    bucket = Column(Integer)
+    count = Column(Integer, default=0)
+
+class StatsTotal(Base):
+    __tablename__ = "stats_totals"
+
+    # "listings", "ai_listings", "manual_listings", "elapsed_time_sum" or "memory_usage_sum"
+    name = Column(String, primary_key=True)
+    value = Column(Float, default=0)
+
+class WriteVersion(Base):
+    __tablename__ = "write_versions"
+
+    # Bumped after every write of data the API serves, by any process sharing the database
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class ScrapeRun(Base):
+    __tablename__ = "scrape_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String, unique=True, index=True)
+    url = Column(String)
+    used_ai_model = Column(String, nullable=True)
+    # "running", "succeeded", "failed" or "cancelled"
+    status = Column(String, index=True)
+    error = Column(String, nullable=True)
+    started_at = Column(DateTime, default=datetime.datetime.now, index=True)
+    finished_at = Column(DateTime, nullable=True)
+    ai_listings_processed = Column(Integer, default=0)
+    manual_listings_processed = Column(Integer, default=0)
+    total_listings_processed = Column(Integer, default=0)
+    ai_average_scraper_time = Column(Float, default=0)
+    ai_average_selector_time = Column(Float, default=0)
+    ai_average_memory_usage_mb = Column(Float, default=0)
+    manual_average_scraper_time = Column(Float, default=0)
+    manual_average_memory_usage_mb = Column(Float, default=0)
+
+class ListingTelemetry(Base):
+    __tablename__ = "listing_telemetry"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String, ForeignKey("scrape_runs.job_id"), index=True)
+    url = Column(String)
+    scraper_type = Column(String)
+    model = Column(String, nullable=True)
+    elapsed_time = Column(Float, nullable=True)
+    selector_time = Column(Float, nullable=True)
+    memory_usage = Column(Float, nullable=True)
+    # Phase timings in seconds
+    fetch_time = Column(Float, nullable=True)
+    parse_time = Column(Float, nullable=True)
+    llm_time = Column(Float, nullable=True)
+    persist_time = Column(Float, nullable=True)
+    recorded_at = Column(DateTime, default=datetime.datetime.now)
+
+class ArchivedPage(Base):
+    __tablename__ = "page_archive"
+    __table_args__ = (Index("ix_page_archive_url_fetched_at", "url", "fetched_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String)
+    # sha256 of the raw body; names the compressed file in the archive directory
+    content_hash = Column(String, index=True)
+    encoding = Column(String, nullable=True)
+    scraper_type = Column(String)
+    fetched_at = Column(DateTime, default=datetime.datetime.now, index=True)
+
+class CrawlJob(Base):
+    __tablename__ = "crawl_jobs"
+    __table_args__ = (Index("ix_crawl_jobs_status_available_at", "status", "available_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Groups the index and listing jobs of one distributed crawl
+    crawl_id = Column(String, index=True)
+    seed = Column(String)
+    # "index" for a paginated listings page, "listings" for a batch of listing pages
+    kind = Column(String)
+    # JSON-encoded list of URLs
+    urls = Column(String)
+    model = Column(String)
+    revisit = Column(Integer, default=0)
+    # "queued", "leased", "done" or "failed"
+    status = Column(String, default="queued")
+    attempts = Column(Integer, default=0)
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    # Retries are not leased again before this time
+    available_at = Column(DateTime, default=datetime.datetime.now)
+    created_at = Column(DateTime, default=datetime.datetime.now)
+    finished_at = Column(DateTime, nullable=True)
+    listings_scraped = Column(Integer, default=0)
+    error = Column(String, nullable=True)
@@ -0,0 +1,196 @@
+from typing import Dict, List
+
+from sqlalchemy import Insert, func
+from sqlalchemy.orm import Session
+
+from db.database import WriteSessionLocal, dialect_insert, notify_write
+from db.models import Listing
+from db.stats import observation, observations_from_row, record_listing_changes, record_observations
+
+UPSERT_CHUNK_SIZE = 500
+
+COMMON_COLUMNS = ["title", "rent", "area", "address"]
+
+# Details only some scrapers provide are only replaced when a new value is given
+DETAIL_COLUMNS = ["rooms", "latitude", "longitude"]
+
+# Listing column -> scraped item key, per scraper type
+TELEMETRY_COLUMNS = {
+    "ai": {
+        "ai_elapsed_time": "elapsed_time",
+        "ai_selector_time": "selector_time",
+        "ai_memory_usage": "memory_usage",
+        "ai_model": "model",
+    },
+    "manual": {
+        "manual_elapsed_time": "elapsed_time",
+        "manual_memory_usage": "memory_usage",
+    },
+}
+
+ALL_TELEMETRY_COLUMNS = [column for columns in TELEMETRY_COLUMNS.values() for column in columns]
+
+# Listing column -> page validator key, per scraper type; also only replaced when a new value is given
+VALIDATOR_COLUMNS = {
+    scraper_type: {f"{scraper_type}_{key}": key for key in ["etag", "last_modified", "content_hash"]}
+    for scraper_type in TELEMETRY_COLUMNS
+}
+
+ALL_VALIDATOR_COLUMNS = [column for columns in VALIDATOR_COLUMNS.values() for column in columns]
+
+def stored_telemetry(db: Session, urls: List[str]) -> Dict[str, Dict]:
+    """Return the stored telemetry columns of the given URLs that already exist."""
+    table = Listing.__table__
+    stored = {}
+    for start in range(0, len(urls), UPSERT_CHUNK_SIZE):
+        chunk = urls[start:start + UPSERT_CHUNK_SIZE]
+        query = db.query(Listing.url, *[table.c[column] for column in ALL_TELEMETRY_COLUMNS]).filter(Listing.url.in_(chunk))
+        stored.update({row.url: row._asdict() for row in query})
+    return stored
+
+def listing_row(item: Dict) -> Dict:
+    """Map a scraped item to listings columns, keeping only its own scraper's telemetry and page validators."""
+    row = {
+        "url": item["url"],
+        "title": item.get("title") or "Not Available",
+        "rent": item.get("rent") or 0,
+        "area": item.get("area"),
+        "address": item.get("address") or "Not Available",
+    }
+    for column, key in TELEMETRY_COLUMNS.get(item.get("scraper_type"), {}).items():
+        row[column] = item.get(key)
+    for column, key in VALIDATOR_COLUMNS.get(item.get("scraper_type"), {}).items():
+        row[column] = item.get(key)
+    for column in DETAIL_COLUMNS:
+        row[column] = item.get(column)
+    return row
+
+# Upsert statements per (dialect, scraper type), built once and executed with a list of rows
+upsert_statements: Dict[tuple, Insert] = {}
+
+def upsert_statement(db: Session, scraper_type: str | None = None, merge_telemetry: bool = False) -> Insert:
+    """Return the listings upsert for a scraper type, or for full API rows with `merge_telemetry`.
+
+    The statement has no inline values, so it compiles once and each batch is sent as one executemany
+    of the same prepared statement.
+    """
+    key = (db.get_bind().dialect.name, scraper_type, merge_telemetry)
+    if key not in upsert_statements:
+        table = Listing.__table__
+        stmt = dialect_insert(db)(table)
+        if merge_telemetry:
+            set_ = {column: stmt.excluded[column] for column in COMMON_COLUMNS}
+            for column in ALL_TELEMETRY_COLUMNS + DETAIL_COLUMNS + ALL_VALIDATOR_COLUMNS:
+                set_[column] = func.coalesce(stmt.excluded[column], table.c[column])
+        else:
+            set_ = {
+                column: func.coalesce(table.c[column], stmt.excluded[column]) if scraper_type == "ai" else stmt.excluded[column]
+                for column in COMMON_COLUMNS
+            }
+            for column in TELEMETRY_COLUMNS.get(scraper_type, {}):
+                set_[column] = stmt.excluded[column]
+            for column in DETAIL_COLUMNS + list(VALIDATOR_COLUMNS.get(scraper_type, {})):
+                set_[column] = func.coalesce(stmt.excluded[column], table.c[column])
+        upsert_statements[key] = stmt.on_conflict_do_update(index_elements=["url"], set_=set_)
+    return upsert_statements[key]
+
+def upsert_rows(db: Session, rows: List[Dict], scraper_type: str | None = None):
+    """Insert or update listings rows by URL without committing.
+
+    Rows from the manual scraper (or with no scraper type) overwrite the common columns, while AI rows
+    only fill common columns that are still empty. Telemetry of the other scraper is never touched.
+    """
+    if not rows:
+        return
+    stmt = upsert_statement(db, scraper_type)
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        db.execute(stmt, rows[start:start + UPSERT_CHUNK_SIZE])
+
+def upsert_listings(items: List[Dict]) -> int:
+    """Upsert a batch of scraped listings by URL in a single transaction."""
+    by_scraper: Dict[str | None, Dict[str, Dict]] = {}
+    for item in items:
+        if not item.get("url"):
+            continue
+        # Later items for the same URL win within a batch
+        by_scraper.setdefault(item.get("scraper_type"), {})[item["url"]] = listing_row(item)
+
+    db = WriteSessionLocal()
+    try:
+        for scraper_type, rows in by_scraper.items():
+            previous = stored_telemetry(db, list(rows))
+            upsert_rows(db, list(rows.values()), scraper_type)
+            record_listing_changes(db, [(previous.get(url), {**previous.get(url, {}), **row}) for url, row in rows.items()])
+        record_observations(db, [
+            observation(
+                item["scraper_type"],
+                item.get("model"),
+                item.get("elapsed_time"),
+                item.get("selector_time"),
+                item.get("memory_usage"),
+            )
+            for item in items
+            if item.get("url") and item.get("scraper_type") in TELEMETRY_COLUMNS
+        ])
+        db.commit()
+        notify_write()
+    except Exception as e:
+        print(f"Failed to upsert {len(items)} listings: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return sum(len(rows) for rows in by_scraper.values())
+
+def merge_rows(rows: List[Dict]) -> Dict[str, Dict]:
+    """Merge listings rows by URL; later values win, but a missing (None) value never clears an earlier one.
+
+    An AI row and a manual row for the same page, as a worker sends them, thus keep both scrapers' telemetry.
+    """
+    merged: Dict[str, Dict] = {}
+    for row in rows:
+        if row["url"] in merged:
+            merged[row["url"]].update({column: value for column, value in row.items() if value is not None})
+        else:
+            merged[row["url"]] = dict(row)
+    return merged
+
+def upsert_listing_rows(rows: List[Dict]) -> Dict[str, str]:
+    """Upsert full listings rows (as accepted by the API) by URL in a single transaction.
+
+    Rows for the same URL are merged first. Common columns are overwritten, while each telemetry column
+    keeps its stored value unless the row provides a new one, so AI and manual telemetry never overwrite
+    each other. Returns "created" or "updated" per URL.
+    """
+    rows_by_url = merge_rows(rows)
+    urls = list(rows_by_url)
+    statuses = {}
+
+    db = WriteSessionLocal()
+    try:
+        for start in range(0, len(urls), UPSERT_CHUNK_SIZE):
+            chunk = urls[start:start + UPSERT_CHUNK_SIZE]
+            existing = stored_telemetry(db, chunk)
+            statuses.update({url: "updated" if url in existing else "created" for url in chunk})
+            record_observations(db, [
+                sample for url in chunk for sample in observations_from_row(rows_by_url[url], existing.get(url))
+            ])
+            record_listing_changes(db, [
+                (existing.get(url), {
+                    column: rows_by_url[url].get(column) if rows_by_url[url].get(column) is not None
+                    else existing.get(url, {}).get(column)
+                    for column in ALL_TELEMETRY_COLUMNS
+                })
+                for url in chunk
+            ])
+
+            db.execute(upsert_statement(db, merge_telemetry=True), [rows_by_url[url] for url in chunk])
+        db.commit()
+        notify_write()
+    except Exception as e:
+        print(f"Failed to upsert {len(rows)} listings: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return statuses
@@ -0,0 +1,141 @@
+import datetime
+import os
+import queue
+import threading
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from db.database import RUNS_VERSION, SessionLocal, dialect_insert, notify_write
+from db.models import ListingTelemetry, ScrapeRun
+from db.stats import PHASE_METRICS, record_phase_observations
+
+# Writer settings (override through .env)
+RUN_HISTORY_FLUSH_SIZE = int(os.getenv("RUN_HISTORY_FLUSH_SIZE", 200))
+RUN_HISTORY_FLUSH_INTERVAL = float(os.getenv("RUN_HISTORY_FLUSH_INTERVAL", 1.0))
+
+RUN_COLUMNS = [column.name for column in ScrapeRun.__table__.columns if column.name != "id"]
+
+write_queue: "queue.Queue[tuple]" = queue.Queue()
+writer_thread: threading.Thread | None = None
+writer_lock = threading.Lock()
+
+def _ensure_writer():
+    global writer_thread
+    with writer_lock:
+        if writer_thread is None or not writer_thread.is_alive():
+            writer_thread = threading.Thread(target=_writer_loop, name="run-history-writer", daemon=True)
+            writer_thread.start()
+
+def record_run(run: Dict):
+    """Queue a scrape run insert or update, keyed by its job_id."""
+    _ensure_writer()
+    write_queue.put(("run", run))
+
+def record_listing_telemetry(job_id: str, item: Dict):
+    """Queue the telemetry of one scraped listing for a run."""
+    _ensure_writer()
+    write_queue.put(("telemetry", {
+        "job_id": job_id,
+        "url": item.get("url"),
+        "scraper_type": item.get("scraper_type"),
+        "model": item.get("model"),
+        "elapsed_time": item.get("elapsed_time"),
+        "selector_time": item.get("selector_time"),
+        "memory_usage": item.get("memory_usage"),
+        **{metric: item.get(metric) for metric in PHASE_METRICS},
+        "recorded_at": datetime.datetime.now(),
+    }))
+
+def flush_run_history():
+    """Block until every queued write has been committed."""
+    if writer_thread is not None:
+        write_queue.join()
+
+def _write_batch(db: Session, batch: List[tuple]):
+    runs: Dict[str, Dict] = {}
+    telemetry = []
+    for kind, data in batch:
+        if kind == "run":
+            # Later updates of the same run win
+            runs.setdefault(data["job_id"], {}).update(data)
+        else:
+            telemetry.append(data)
+
+    insert = dialect_insert(db)
+    for run in runs.values():
+        stmt = insert(ScrapeRun.__table__).values(run)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["job_id"],
+            set_={column: stmt.excluded[column] for column in run if column in RUN_COLUMNS and column != "job_id"},
+        ))
+    if telemetry:
+        db.execute(ListingTelemetry.__table__.insert(), telemetry)
+        record_phase_observations(db, telemetry)
+
+def _writer_loop():
+    while True:
+        batch = [write_queue.get()]
+        deadline = datetime.datetime.now() + datetime.timedelta(seconds=RUN_HISTORY_FLUSH_INTERVAL)
+        while len(batch) < RUN_HISTORY_FLUSH_SIZE:
+            timeout = (deadline - datetime.datetime.now()).total_seconds()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(write_queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        db = SessionLocal()
+        try:
+            _write_batch(db, batch)
+            db.commit()
+            notify_write(RUNS_VERSION)
+        except Exception as e:
+            print(f"Failed to write {len(batch)} run history records: {e}")
+            db.rollback()
+        finally:
+            db.close()
+            for _ in batch:
+                write_queue.task_done()
+
+def run_to_dict(run: ScrapeRun) -> Dict:
+    """Serialize a scrape run in the shape of the former in-memory history entries."""
+    return {
+        "id": run.id,
+        "job_id": run.job_id,
+        "timestamp": run.started_at.strftime("%Y-%m-%d %H:%M:%S") if run.started_at else None,
+        "finished_at": run.finished_at.strftime("%Y-%m-%d %H:%M:%S") if run.finished_at else None,
+        "status": run.status,
+        "error": run.error,
+        "url": run.url,
+        "used_ai_model": run.used_ai_model,
+        "ai_listings_processed": run.ai_listings_processed,
+        "manual_listings_processed": run.manual_listings_processed,
+        "total_listings_processed": run.total_listings_processed,
+        "ai_average_scraper_time": run.ai_average_scraper_time,
+        "ai_average_selector_time": run.ai_average_selector_time,
+        "ai_average_memory_usage_mb": run.ai_average_memory_usage_mb,
+        "manual_average_scraper_time": run.manual_average_scraper_time,
+        "manual_average_memory_usage_mb": run.manual_average_memory_usage_mb,
+    }
+
+def query_runs(
+    db: Session,
+    start: datetime.datetime | None = None,
+    end: datetime.datetime | None = None,
+    status: str | None = None,
+    before_id: int | None = None,
+    limit: int = 50,
+) -> List[ScrapeRun]:
+    """Return runs newest first, filtered by start time range and status, after the `before_id` cursor."""
+    query = db.query(ScrapeRun)
+    if start is not None:
+        query = query.filter(ScrapeRun.started_at >= start)
+    if end is not None:
+        query = query.filter(ScrapeRun.started_at < end)
+    if status:
+        query = query.filter(ScrapeRun.status == status)
+    if before_id is not None:
+        query = query.filter(ScrapeRun.id < before_id)
+    return query.order_by(ScrapeRun.id.desc()).limit(limit).all()
@@ -0,0 +1,261 @@
+import datetime
+import math
+from typing import Dict, List
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Session
+
+from db.database import dialect_insert
+from db.models import Listing, StatsHistogram, StatsRollup, StatsTotal
+
+# Histogram buckets grow by 10%, so percentiles are accurate to within ~5%
+HISTOGRAM_BASE = 1.1
+HISTOGRAM_MIN_VALUE = 1e-6
+METRICS = ["elapsed_time", "selector_time", "memory_usage"]
+PHASE_METRICS = ["fetch_time", "parse_time", "llm_time", "persist_time"]
+PERCENTILES = [50, 95, 99]
+
+# Listing columns that the listing-level totals depend on
+TOTALS_COLUMNS = ["ai_elapsed_time", "ai_memory_usage", "manual_elapsed_time", "manual_memory_usage"]
+TOTALS = ["listings", "ai_listings", "manual_listings", "elapsed_time_sum", "memory_usage_sum"]
+
+def bucket_for(value: float) -> int:
+    """Return the log-scale histogram bucket of a value."""
+    return math.floor(math.log(max(value, HISTOGRAM_MIN_VALUE), HISTOGRAM_BASE))
+
+def bucket_value(bucket: int) -> float:
+    """Return the representative (geometric middle) value of a bucket."""
+    return HISTOGRAM_BASE ** (bucket + 0.5)
+
+def observation(
+    scraper_type: str,
+    model: str | None,
+    elapsed_time: float | None,
+    selector_time: float | None = None,
+    memory_usage: float | None = None,
+) -> Dict:
+    """Build a single telemetry sample for the rollups."""
+    return {
+        "scraper_type": scraper_type,
+        "model": model or "",
+        "elapsed_time": elapsed_time,
+        "selector_time": selector_time,
+        "memory_usage": memory_usage,
+    }
+
+def observations_from_row(row: Dict, previous: Dict | None = None) -> List[Dict]:
+    """Turn the ai_*/manual_* columns of a listings row into samples, skipping values already stored."""
+    observations = []
+    for scraper_type in ["ai", "manual"]:
+        values = {metric: row.get(f"{scraper_type}_{metric}") for metric in METRICS}
+        if values["elapsed_time"] is None and values["memory_usage"] is None:
+            continue
+        if previous and all(previous.get(f"{scraper_type}_{metric}") == value for metric, value in values.items()):
+            continue
+        model = row.get("ai_model") if scraper_type == "ai" else ""
+        observations.append(observation(scraper_type, model, **values))
+    return observations
+
+def record_observations(db: Session, observations: List[Dict]):
+    """Add samples to the rollup and histogram tables without committing."""
+    if not observations:
+        return
+    rollups: Dict[tuple, Dict] = {}
+    buckets: Dict[tuple, int] = {}
+    for sample in observations:
+        key = (sample["scraper_type"], sample["model"])
+        rollup = rollups.setdefault(key, {
+            "scraper_type": key[0],
+            "model": key[1],
+            "samples": 0,
+            "elapsed_time_sum": 0.0,
+            "selector_time_sum": 0.0,
+            "memory_usage_sum": 0.0,
+            "updated_at": datetime.datetime.now(),
+        })
+        rollup["samples"] += 1
+        for metric in METRICS:
+            value = sample.get(metric)
+            if value is None:
+                continue
+            rollup[f"{metric}_sum"] += value
+            bucket_key = key + (metric, bucket_for(value))
+            buckets[bucket_key] = buckets.get(bucket_key, 0) + 1
+
+    insert = dialect_insert(db)
+    table = StatsRollup.__table__
+    stmt = insert(table).values(list(rollups.values()))
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["scraper_type", "model"],
+        set_={
+            "samples": table.c.samples + stmt.excluded.samples,
+            "elapsed_time_sum": table.c.elapsed_time_sum + stmt.excluded.elapsed_time_sum,
+            "selector_time_sum": table.c.selector_time_sum + stmt.excluded.selector_time_sum,
+            "memory_usage_sum": table.c.memory_usage_sum + stmt.excluded.memory_usage_sum,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    ))
+
+    _record_buckets(db, buckets)
+
+def _record_buckets(db: Session, buckets: Dict[tuple, int]):
+    if not buckets:
+        return
+    insert = dialect_insert(db)
+    table = StatsHistogram.__table__
+    stmt = insert(table).values([
+        {"scraper_type": scraper_type, "model": model, "metric": metric, "bucket": bucket, "count": count}
+        for (scraper_type, model, metric, bucket), count in buckets.items()
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["scraper_type", "model", "metric", "bucket"],
+        set_={"count": table.c.count + stmt.excluded.count},
+    ))
+
+def record_phase_observations(db: Session, samples: List[Dict]):
+    """Add per-listing phase timings to the rollup and histogram tables without committing."""
+    rollups: Dict[tuple, Dict] = {}
+    buckets: Dict[tuple, int] = {}
+    for sample in samples:
+        if not sample.get("scraper_type"):
+            continue
+        key = (sample["scraper_type"], sample.get("model") or "")
+        for metric in PHASE_METRICS:
+            value = sample.get(metric)
+            if value is None:
+                continue
+            rollup = rollups.setdefault(key, {
+                "scraper_type": key[0],
+                "model": key[1],
+                "samples": 0,
+                "elapsed_time_sum": 0.0,
+                "selector_time_sum": 0.0,
+                "memory_usage_sum": 0.0,
+                **{f"{phase}_sum": 0.0 for phase in PHASE_METRICS},
+                "updated_at": datetime.datetime.now(),
+            })
+            rollup[f"{metric}_sum"] += value
+            bucket_key = key + (metric, bucket_for(value))
+            buckets[bucket_key] = buckets.get(bucket_key, 0) + 1
+    if not rollups:
+        return
+
+    insert = dialect_insert(db)
+    table = StatsRollup.__table__
+    stmt = insert(table).values(list(rollups.values()))
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["scraper_type", "model"],
+        set_={
+            f"{metric}_sum": func.coalesce(table.c[f"{metric}_sum"], 0) + stmt.excluded[f"{metric}_sum"]
+            for metric in PHASE_METRICS
+        },
+    ))
+    _record_buckets(db, buckets)
+
+def _percentiles(histogram: List[tuple]) -> Dict[str, float]:
+    total = sum(count for _, count in histogram)
+    result = {}
+    for percentile in PERCENTILES:
+        target = percentile / 100 * total
+        cumulative = 0
+        for bucket, count in histogram:
+            cumulative += count
+            if cumulative >= target:
+                result[f"p{percentile}"] = bucket_value(bucket)
+                break
+    return result
+
+def rollup_breakdown(db: Session) -> List[Dict]:
+    """Return averages and p50/p95/p99 per scraper type and AI model, read from the rollup tables."""
+    histograms: Dict[tuple, List[tuple]] = {}
+    for row in db.query(StatsHistogram).order_by(StatsHistogram.bucket):
+        histograms.setdefault((row.scraper_type, row.model, row.metric), []).append((row.bucket, row.count))
+
+    breakdown = []
+    for rollup in db.query(StatsRollup).order_by(StatsRollup.scraper_type, StatsRollup.model):
+        entry = {
+            "scraper_type": rollup.scraper_type,
+            "model": rollup.model or None,
+            "samples": rollup.samples,
+        }
+        for metric in METRICS:
+            histogram = histograms.get((rollup.scraper_type, rollup.model, metric))
+            if not histogram:
+                continue
+            count = sum(c for _, c in histogram)
+            entry[metric] = {"average": getattr(rollup, f"{metric}_sum") / count, **_percentiles(histogram)}
+        phases = {}
+        for metric in PHASE_METRICS:
+            histogram = histograms.get((rollup.scraper_type, rollup.model, metric))
+            if histogram:
+                count = sum(c for _, c in histogram)
+                phases[metric] = {"average": (getattr(rollup, f"{metric}_sum") or 0) / count, **_percentiles(histogram)}
+        if phases:
+            entry["phases"] = phases
+        breakdown.append(entry)
+    return breakdown
+
+def _listing_totals(values: Dict | None) -> Dict[str, float]:
+    if values is None:
+        return dict.fromkeys(TOTALS, 0)
+    return {
+        "listings": 1,
+        "ai_listings": int(values.get("ai_elapsed_time") is not None or values.get("ai_memory_usage") is not None),
+        "manual_listings": int(values.get("manual_elapsed_time") is not None or values.get("manual_memory_usage") is not None),
+        "elapsed_time_sum": (values.get("ai_elapsed_time") or 0) + (values.get("manual_elapsed_time") or 0),
+        "memory_usage_sum": (values.get("ai_memory_usage") or 0) + (values.get("manual_memory_usage") or 0),
+    }
+
+def record_listing_changes(db: Session, changes: List[tuple]):
+    """Apply (previous values or None, new values) listing changes to the totals without committing."""
+    delta = dict.fromkeys(TOTALS, 0)
+    for previous, current in changes:
+        before, after = _listing_totals(previous), _listing_totals(current)
+        for name in TOTALS:
+            delta[name] += after[name] - before[name]
+    if not any(delta.values()):
+        return
+    insert = dialect_insert(db)
+    table = StatsTotal.__table__
+    stmt = insert(table).values([{"name": name, "value": value} for name, value in delta.items()])
+    db.execute(stmt.on_conflict_do_update(index_elements=["name"], set_={"value": table.c.value + stmt.excluded.value}))
+
+def compute_listing_totals(db: Session) -> Dict[str, float]:
+    """Compute the listing-level totals from the listings table in a single SQL query."""
+    is_ai = or_(Listing.ai_elapsed_time.isnot(None), Listing.ai_memory_usage.isnot(None))
+    is_manual = or_(Listing.manual_elapsed_time.isnot(None), Listing.manual_memory_usage.isnot(None))
+    row = db.query(
+        func.count(Listing.id),
+        func.count(case((is_ai, 1))),
+        func.count(case((is_manual, 1))),
+        func.coalesce(func.sum(Listing.ai_elapsed_time), 0) + func.coalesce(func.sum(Listing.manual_elapsed_time), 0),
+        func.coalesce(func.sum(Listing.ai_memory_usage), 0) + func.coalesce(func.sum(Listing.manual_memory_usage), 0),
+    ).one()
+    return dict(zip(TOTALS, row))
+
+def ensure_listing_totals(db: Session):
+    """Seed the totals table from the listings table if it has never been filled.
+
+    Runs before any writer records deltas (see sync_schema); concurrent seeders leave the first seed in place.
+    """
+    if db.query(StatsTotal).count():
+        return
+    totals = [{"name": name, "value": value} for name, value in compute_listing_totals(db).items()]
+    db.execute(dialect_insert(db)(StatsTotal).values(totals).on_conflict_do_nothing(index_elements=["name"]))
+    db.commit()
+
+def overall_stats(db: Session) -> Dict[str, int | float]:
+    """Return listing-level totals and averages from the incrementally maintained totals table."""
+    totals = {row.name: row.value for row in db.query(StatsTotal)}
+    if not totals:
+        totals = compute_listing_totals(db)
+    ai_total = int(totals.get("ai_listings", 0))
+    manual_total = int(totals.get("manual_listings", 0))
+    scraped = ai_total + manual_total
+    return {
+        "total_listings_processed": int(totals.get("listings", 0)),
+        "ai_total_processed": ai_total,
+        "manual_total_processed": manual_total,
+        "combined_average_time": totals.get("elapsed_time_sum", 0) / scraped if scraped else 0,
+        "combined_average_memory": totals.get("memory_usage_sum", 0) / scraped if scraped else 0,
+    }
@@ -1,41 +1,53 @@
+import asyncio
 import time
-import tracemalloc
+import httpx
 import requests
 from bs4 import BeautifulSoup
-import csv
 import os
 import re
-from openai import OpenAI
-from groq import Groq
-from typing import Dict, List
-
-# Initialize clients with error handling and fallback
-try:
-    openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-except Exception as e:
-    print(f"Failed to initialize OpenAI client: {e}")
-    openai_client = None
-
-try:
-    groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-except Exception as e:
-    print(f"Failed to initialize Groq client: {e}")
-    groq_client = None
+from urllib.parse import urljoin, urlparse
+from typing import Callable, Dict, List, Tuple
+
+from backend.listing_service import send_batch_to_api
+from scrapers.fetcher import AsyncFetcher, fetch_page
+from scrapers.frontier import CRAWL_MAX_PAGES, CrawlFrontier, crawl
+from scrapers.html_minimizer import AI_PROMPT_TOKEN_BUDGET, estimate_tokens, reduce_html
+from scrapers.llm_client import LLM_CONCURRENCY, complete_sync
+from scrapers.selector_cache import (
+    page_fingerprint, get_cached_selectors, store_selectors, invalidate_selectors, selectors_are_valid,
+)
+from scrapers.selector_inference import (
+    HEURISTIC_MIN_CONFIDENCE, HEURISTIC_SELECTORS, infer_selectors, learn_selectors, record_inference,
+)
+from scrapers.telemetry import Measurement
+from scrapers.telemetry_sink import record_telemetry
 
 # Counter for processed listings
 ai_processed_count = 0
 
-def clean_rent(rent: str) -> int:
-    """Clean the rent string and convert to integer."""
+# Maximum listings scraped per AI run, 0 for no limit (override through .env)
+AI_MAX_LISTINGS = int(os.getenv("AI_MAX_LISTINGS", 0)) or None
+
+# Uncached pages whose selectors are inferred in one AI call, 1 to infer them page by page (override through .env)
+AI_BATCH_SIZE = int(os.getenv("AI_BATCH_SIZE", 1))
+AI_BATCH_WAIT = float(os.getenv("AI_BATCH_WAIT", 1.0))  # Seconds to wait for a batch to fill up
+
+# Listings processed at once, by default enough to keep every LLM client slot busy (override through .env)
+AI_PARSE_CONCURRENCY = int(os.getenv("AI_PARSE_CONCURRENCY", LLM_CONCURRENCY))
+
+def clean_rent(rent: str) -> int | None:
+    """Clean the rent string and convert to integer, or None if it holds no number."""
     if not rent or rent == "Not Available":
-        return 0
-    return int("".join(filter(str.isdigit, rent)))
+        return None
+    digits = "".join(filter(str.isdigit, rent))
+    return int(digits) if digits else None
 
 def clean_area(area: str) -> int | None:
     """Clean the area string and convert to integer, handling special characters."""
     if not area or area == "Not Available":
         return None
-    cleaned_area = re.sub(r'[^\d.]', '', area)
+    # Polish pages write decimals with a comma, e.g. "85,5 m²"
+    cleaned_area = re.sub(r'[^\d.]', '', area.replace(",", "."))
     try:
         return int(float(cleaned_area))
     except ValueError:
@@ -51,168 +63,410 @@ def parse_selectors_from_ai(ai_response: str) -> Dict[str, str]:
             selectors[field.strip()] = selector.strip()
     return selectors
 
-def save_to_csv(data: Dict[str, float | str]):
-    """Save scraping stats to CSV."""
-    with open("scraper_stats.csv", mode="a", newline="") as file:
-        writer = csv.DictWriter(file, fieldnames=["url", "elapsed_time", "selector_time", "memory_usage", "scraper_type"])
-        if file.tell() == 0:
-            writer.writeheader()
-        writer.writerow(data)
-
 def send_to_api(data: Dict[str, str | float | int | None]):
     """Send extracted data to the API for database storage."""
     requests.post("http://127.0.0.1:8001/listings", json={
         "title": data.get("title", "Not Available"),
-        "rent": data.get("rent", 0),
+        "rent": data.get("rent") or 0,
         "area": data.get("area", None),
         "address": data.get("address", "Not Available"),
         "url": data.get("url", ""),
         "ai_elapsed_time": data.get("elapsed_time", None),
         "ai_selector_time": data.get("selector_time", None),
         "ai_memory_usage": data.get("memory_usage", None),
+        "ai_model": data.get("model", None),
         "manual_elapsed_time": None,
         "manual_memory_usage": None
     })
 
-def scrape_with_ai(url: str, model: str = "gpt-4o-mini") -> Dict[str, str | float | int | None]:
-    """Scrape a single listing page using AI-generated selectors."""
-    global ai_processed_count
-    tracemalloc.start()
-    start_time = time.time()
+def complete_prompt(prompt: str, model: str = "gpt-4o-mini") -> str:
+    """Send a prompt to the configured AI model and return its answer.
 
+    Calls go through the shared LLM client, which applies provider limits, retries and failover.
+    """
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        possible_containers = soup.find_all(["article", "section", "div"], limit=10)
-        selected_container = None
-        for container in possible_containers:
-            text = container.get_text(separator=" ", strip=True).lower()
-            if any(keyword in text for keyword in ["rent", "area", "address", "m²", "price"]):
-                selected_container = container
-                break
-
-        if selected_container:
-            print("✅ Found a likely container.")
-            html_to_send = selected_container.prettify()[:1000]  # Truncate to 1000 characters
-        else:
-            print("⚠️ No good container found. Using full page fallback.")
-            html_to_send = soup.prettify()[:1000]  # Truncate to 1000 characters
-
-        selector_start_time = time.time()
-        print(f"Using model: {model} for API call")
-        prompt = (
-            "You are a scraping expert. Given the following HTML snippet, extract the best CSS selectors for:\n"
-            "- title\n- rent\n- area\n- address\n"
-            "Only output the field names and selectors like this:\n"
-            "title: .title-class\nrent: .rent-class\narea: .area-class\naddress: .address-class\n\n"
-            f"HTML:\n{html_to_send}"
-        )
+        ai_response = complete_sync(prompt, model)
+    except Exception as e:
+        print(f"Error during AI model call: {e}")
+        raise RuntimeError(f"Failed to get AI response: {str(e)}")
+
+    if ai_response is None:
+        raise RuntimeError("AI response was not generated.")
+    return ai_response
 
-        ai_response = None
+def request_selectors(html_to_send: str, model: str = "gpt-4o-mini") -> Dict[str, str]:
+    """Ask the configured AI model for CSS selectors matching the given HTML snippet."""
+    print(f"Using model: {model} for API call")
+    prompt = (
+        "You are a scraping expert. Given the following HTML snippet, extract the best CSS selectors for:\n"
+        "- title\n- rent\n- area\n- address\n"
+        "Only output the field names and selectors like this:\n"
+        "title: .title-class\nrent: .rent-class\narea: .area-class\naddress: .address-class\n\n"
+        f"HTML:\n{html_to_send}"
+    )
+    selectors = parse_selectors_from_ai(complete_prompt(prompt, model))
+    print("Generated Selectors:", selectors)
+    return selectors
+
+def request_batch_selectors(fragments: List[str], model: str = "gpt-4o-mini") -> Dict[str, str]:
+    """Ask the configured AI model for one set of CSS selectors that fits several pages of the same template."""
+    print(f"Using model: {model} for a batch API call over {len(fragments)} pages")
+    pages = "\n\n".join(f"HTML of page {number}:\n{fragment}" for number, fragment in enumerate(fragments, 1))
+    prompt = (
+        f"You are a scraping expert. The following {len(fragments)} HTML snippets come from listing pages built "
+        "from the same template. Give CSS selectors that work on every page for:\n"
+        "- title\n- rent\n- area\n- address\n"
+        "Prefer class and id selectors shared by all pages over positions or page-specific text. "
+        "Only output the field names and selectors like this:\n"
+        "title: .title-class\nrent: .rent-class\narea: .area-class\naddress: .address-class\n\n"
+        f"{pages}"
+    )
+    selectors = parse_selectors_from_ai(complete_prompt(prompt, model))
+    print("Generated batch selectors:", selectors)
+    return selectors
+
+def extract_with_selectors(soup, selectors: Dict[str, str]) -> Dict[str, str]:
+    """Extract the raw text of each field using the given CSS selectors."""
+    extracted = {}
+    for field in ["title", "rent", "area", "address"]:
+        selector = selectors.get(field, "")
         try:
-            if model == "groq":
-                if groq_client is None:
-                    print("Falling back to gpt-4o-mini due to Groq client failure.")
-                    model = "gpt-4o-mini"
-                else:
-                    groq_response = groq_client.chat.completions.create(
-                        model="llama3-70b-8192",
-                        messages=[{"role": "user", "content": prompt}],
-                        temperature=0.2
-                    )
-                    ai_response = groq_response.choices[0].message.content
-            if model != "groq" or ai_response is None:
-                if openai_client is None:
-                    raise ValueError("OpenAI client is not initialized. Check OPENAI_API_KEY.")
-                openai_response = openai_client.chat.completions.create(
-                    model=model,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.2
-                )
-                ai_response = openai_response.choices[0].message.content
-        except Exception as e:
-            print(f"Error during AI model call: {e}")
-            raise RuntimeError(f"Failed to get AI response: {str(e)}")
+            element = soup.select_one(selector) if selector else None
+        except Exception:
+            element = None
+        extracted[field] = element.get_text(strip=True) if element else "Not Available"
+    return extracted
 
-        if ai_response is None:
-            raise RuntimeError("AI response was not generated.")
+def infer_page_selectors(soup, domain: str) -> Tuple[Dict[str, str] | None, Dict[str, str] | None]:
+    """Try heuristic selectors on a page; return them and their extracted fields, or Nones if a model call is needed."""
+    selectors, confidence = infer_selectors(soup, domain)
+    extracted = extract_with_selectors(soup, selectors)
+    used = confidence >= HEURISTIC_MIN_CONFIDENCE and selectors_are_valid(extracted)
+    record_inference(used)
+    if not used:
+        print(f"Heuristic selectors for {domain} have low confidence ({confidence:.2f}), asking the model.")
+        return None, None
+    return selectors, extracted
 
-        selector_time = time.time() - selector_start_time
+def finish_listing(
+    url: str,
+    extracted: Dict[str, str],
+    model: str,
+    selector_source: str,
+    telemetry: Dict[str, float | None],
+    selector_time: float,
+) -> Dict[str, str | float | int | None]:
+    """Clean extracted fields, attach telemetry and record the listing in the telemetry file and counter."""
+    global ai_processed_count
+    extracted["rent"] = clean_rent(extracted.get("rent", ""))
+    extracted["area"] = clean_area(extracted.get("area", ""))
 
-        selectors = parse_selectors_from_ai(ai_response)
-        print("Generated Selectors:", selectors)
+    extracted["url"] = url
+    extracted.update(telemetry)
+    extracted["selector_time"] = selector_time
+    extracted["scraper_type"] = "ai"
+    extracted["model"] = model
+    extracted["selector_source"] = selector_source
+    print("Extracted listing:", extracted)
 
-        extraction_soup = selected_container if selected_container else soup
-        extracted = {}
-        for field in ["title", "rent", "area", "address"]:
-            selector = selectors.get(field, "")
-            element = extraction_soup.select_one(selector)
-            extracted[field] = element.get_text(strip=True) if element else "Not Available"
+    record_telemetry(extracted)
 
-        extracted["rent"] = clean_rent(extracted.get("rent", ""))
-        extracted["area"] = clean_area(extracted.get("area", ""))
+    ai_processed_count += 1
+    return extracted
 
-        elapsed_time = time.time() - start_time
-        current, peak = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
+def scrape_with_ai(
+    url: str,
+    model: str = "gpt-4o-mini",
+    html: str | None = None,
+    fetch_time: float = 0.0,
+    send: bool = True,
+) -> Dict[str, str | float | int | None]:
+    """Scrape a single listing page using AI-generated selectors, fetching it unless its HTML is given."""
+    measurement = Measurement()
+    try:
+        if html is None:
+            with measurement.phase("fetch"):
+                response = fetch_page(url)
+            html = response.text
+        else:
+            measurement.add("fetch", fetch_time)
+        soup = BeautifulSoup(html, "html.parser")
+
+        # Selectors are matched against (and cached for) the whole page template
+        domain = urlparse(url).netloc
+        fingerprint = page_fingerprint(soup)
+
+        selector_start_time = time.perf_counter()
+        selector_source = "cache"
+        selectors = get_cached_selectors(domain, fingerprint)
+        extracted = extract_with_selectors(soup, selectors) if selectors else None
+        if selectors and not selectors_are_valid(extracted):
+            print(f"Cached selectors for {domain} no longer match, invalidating.")
+            invalidate_selectors(domain, fingerprint)
+            selectors = None
 
-        extracted["url"] = url
-        extracted["elapsed_time"] = elapsed_time
-        extracted["selector_time"] = selector_time
-        extracted["memory_usage"] = peak / 1024 / 1024
-        extracted["scraper_type"] = "ai"
-        print("Extracted listing:", extracted)
+        if not selectors and HEURISTIC_SELECTORS:
+            selectors, extracted = infer_page_selectors(soup, domain)
+            selector_source = "heuristic"
 
-        csv_data = {
-            "url": url,
-            "elapsed_time": elapsed_time,
-            "selector_time": selector_time,
-            "memory_usage": peak / 1024 / 1024,
-            "scraper_type": "ai"
-        }
-        save_to_csv(csv_data)
+        if not selectors:
+            selector_source = "ai"
+            # Send the model a minimized fragment that holds the listing fields, within the token budget
+            fragment_element, html_to_send = reduce_html(soup, AI_PROMPT_TOKEN_BUDGET)
+            print(f"Reduced page to a <{fragment_element.name}> fragment of ~{estimate_tokens(html_to_send)} tokens.")
+            with measurement.phase("llm"):
+                selectors = request_selectors(html_to_send, model)
+            extracted = extract_with_selectors(soup, selectors)
+            if selectors_are_valid(extracted):
+                store_selectors(domain, fingerprint, selectors, model)
+                learn_selectors(domain, selectors)
 
-        ai_processed_count += 1
+        selector_time = time.perf_counter() - selector_start_time
+        telemetry = measurement.finish(remainder="parse")
 
-        send_to_api(extracted)
+        extracted = finish_listing(url, extracted, model, selector_source, telemetry, selector_time)
+
+        if send:
+            send_to_api(extracted)
 
         return extracted
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Error fetching {url}: {e}")
-        tracemalloc.stop()
-        raise
-    except Exception as e:
-        print(f"Error processing {url}: {e}")
-        tracemalloc.stop()
         raise
+    finally:
+        measurement.finish()
+
+def scrape_batch_with_ai(
+    pages: List[Tuple[str, str, float]],
+    model: str = "gpt-4o-mini",
+) -> List[Dict[str, str | float | int | None] | Exception]:
+    """Scrape several (url, html, fetch_time) listing pages, inferring selectors for uncached ones in one AI call.
+
+    The batch selectors are validated locally on every page and only used where they extract the required
+    fields; the remaining pages fall back to single-page inference. Time is shared out evenly between the
+    pages and memory usage is that of the whole batch. Failed pages are returned as exceptions.
+    """
+    results: List = [None] * len(pages)
+    soups: Dict[int, BeautifulSoup] = {}
+    templates: Dict[int, Tuple[str, str]] = {}
+    extracted: Dict[int, Dict[str, str]] = {}
+    sources: Dict[int, str] = {}
+
+    measurement = Measurement()
+    try:
+        misses = []
+        for index, (url, html, _) in enumerate(pages):
+            try:
+                soups[index] = BeautifulSoup(html, "html.parser")
+                domain, fingerprint = templates[index] = urlparse(url).netloc, page_fingerprint(soups[index])
+                selectors = get_cached_selectors(domain, fingerprint)
+                if selectors:
+                    extracted[index] = extract_with_selectors(soups[index], selectors)
+                    if selectors_are_valid(extracted[index]):
+                        sources[index] = "cache"
+                        continue
+                    print(f"Cached selectors for {domain} no longer match, invalidating.")
+                    invalidate_selectors(domain, fingerprint)
+                if HEURISTIC_SELECTORS:
+                    selectors, extracted[index] = infer_page_selectors(soups[index], domain)
+                    if selectors:
+                        sources[index] = "heuristic"
+                        continue
+                misses.append(index)
+            except Exception as e:
+                # Raised to the caller, which logs it
+                results[index] = e
+
+        selector_start_time = time.perf_counter()
+        fragments = {index: reduce_html(soups[index], AI_PROMPT_TOKEN_BUDGET)[1] for index in misses}
+        if len(misses) > 1:
+            try:
+                with measurement.phase("llm"):
+                    selectors = request_batch_selectors([fragments[index] for index in misses], model)
+            except RuntimeError as e:
+                print(f"Batch selector inference failed, falling back to single pages: {e}")
+                selectors = {}
+            validated = {index: extract_with_selectors(soups[index], selectors) for index in misses}
+            accepted = [index for index in misses if selectors_are_valid(validated[index])]
+            print(f"Batch selectors matched {len(accepted)} of {len(misses)} pages.")
+            for index in accepted:
+                extracted[index] = validated[index]
+                sources[index] = "ai_batch"
+            # Only cache the selectors for templates they matched on every page of
+            for template in {templates[index] for index in accepted}:
+                if all(index in accepted for index in misses if templates[index] == template):
+                    store_selectors(*template, selectors, model)
+                    learn_selectors(template[0], selectors)
+
+        for index in misses:
+            if index in sources:
+                continue
+            try:
+                # An earlier page of the batch may have cached selectors for this template
+                selectors = get_cached_selectors(*templates[index])
+                if selectors:
+                    extracted[index] = extract_with_selectors(soups[index], selectors)
+                    if selectors_are_valid(extracted[index]):
+                        sources[index] = "cache"
+                        continue
+                with measurement.phase("llm"):
+                    selectors = request_selectors(fragments[index], model)
+                extracted[index] = extract_with_selectors(soups[index], selectors)
+                sources[index] = "ai"
+                if selectors_are_valid(extracted[index]):
+                    store_selectors(*templates[index], selectors, model)
+                    learn_selectors(templates[index][0], selectors)
+            except Exception as e:
+                results[index] = e
+        selector_time = time.perf_counter() - selector_start_time
+        telemetry = measurement.finish(remainder="parse")
+    finally:
+        measurement.finish()
+
+    for index, (url, _, fetch_time) in enumerate(pages):
+        if results[index] is None:
+            # Each page gets an even share of the batch's phases, plus its own fetch
+            shares = {
+                key: value / len(pages) if value is not None else None
+                for key, value in telemetry.items() if key != "memory_usage"
+            }
+            shares["elapsed_time"] += fetch_time
+            shares["fetch_time"] = fetch_time
+            shares["memory_usage"] = telemetry["memory_usage"]
+            results[index] = finish_listing(url, extracted[index], model, sources[index], shares, selector_time / len(pages))
+    return results
+
+def extract_listing_links(soup: BeautifulSoup, page_url: str) -> List[str]:
+    """Extract absolute listing URLs from a listings page."""
+    listing_links = soup.find_all("a", href=re.compile(r"/mieszkanie-[^/]+/ob/\d+"))
+    print(f"Found {len(listing_links)} listing links.")
+    return [urljoin(page_url, link["href"]) for link in listing_links]
+
+async def scrape_ai_listings_async(
+    url: str,
+    model: str = "gpt-4o-mini",
+    fetcher: AsyncFetcher | None = None,
+    should_stop: Callable[[], bool] | None = None,
+    max_pages: int = CRAWL_MAX_PAGES,
+    max_listings: int | None = AI_MAX_LISTINGS,
+    on_item: Callable[[Dict], None] | None = None,
+    persist: Callable[[List[Dict]], None] = send_batch_to_api,
+    revisit: bool = False,
+    batch_size: int = AI_BATCH_SIZE,
+) -> List[Dict[str, str | float | int | None]]:
+    """Crawl the listings page and its pagination, scraping listings not yet stored using AI.
+
+    With `revisit`, stored listings are fetched again (conditionally) and re-scraped if they changed.
+    With a `batch_size` above 1, selectors for up to that many uncached pages are inferred in one AI call.
+    """
+    if fetcher is None:
+        async with AsyncFetcher() as fetcher:
+            return await scrape_ai_listings_async(
+                url, model, fetcher, should_stop, max_pages, max_listings, on_item, persist, revisit, batch_size
+            )
+
+    loop = asyncio.get_running_loop()
+    batch: List[Tuple[str, httpx.Response, asyncio.Future]] = []
+    flush_timer: asyncio.TimerHandle | None = None
+    flush_tasks = set()
+
+    async def flush_batch():
+        nonlocal batch, flush_timer
+        if flush_timer:
+            flush_timer.cancel()
+            flush_timer = None
+        pages, batch = batch, []
+        if not pages:
+            return
+        try:
+            results = await asyncio.to_thread(
+                scrape_batch_with_ai,
+                [(page_url, response.text, response.elapsed.total_seconds()) for page_url, response, _ in pages],
+                model,
+            )
+        except Exception as e:
+            results = [e] * len(pages)
+        for (_, _, future), result in zip(pages, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def schedule_flush():
+        task = asyncio.create_task(flush_batch())
+        flush_tasks.add(task)
+        task.add_done_callback(flush_tasks.discard)
+
+    async def process_listing(listing_url: str, listing_response: httpx.Response) -> Dict[str, str | float | int | None]:
+        nonlocal flush_timer
+        print(f"Scraping AI listing: {listing_url}")
+        if batch_size > 1:
+            # Wait for the batch to fill up, or for AI_BATCH_WAIT seconds at the end of the crawl
+            future = loop.create_future()
+            batch.append((listing_url, listing_response, future))
+            if len(batch) >= batch_size:
+                schedule_flush()
+            elif flush_timer is None:
+                flush_timer = loop.call_later(AI_BATCH_WAIT, schedule_flush)
+            return await future
+        return await asyncio.to_thread(
+            scrape_with_ai,
+            listing_url,
+            model=model,
+            html=listing_response.text,
+            fetch_time=listing_response.elapsed.total_seconds(),
+            send=False,
+        )
 
-def scrape_ai_listings(url: str, model: str = "gpt-4o-mini") -> List[Dict[str, str | float | int | None]]:
-    """Scrape multiple listings from a given URL using AI."""
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        listing_links = soup.find_all("a", href=re.compile(r"/mieszkanie-[^/]+/ob/\d+"))
-        print(f"Found {len(listing_links)} listing links.")
-        listing_urls = [link["href"] for link in listing_links][:5]
-        listings = []
-        for listing_url in listing_urls:
-            if not listing_url.startswith("http"):
-                listing_url = "https://wolfnieruchomosci.gratka.pl" + listing_url
-            print(f"Scraping AI listing: {listing_url}")
-            listing = scrape_with_ai(listing_url, model=model)
-            listings.append(listing)
-        return listings
-    except requests.RequestException as e:
+        frontier = CrawlFrontier(url, "ai", revisit_known=revisit)
+        return await crawl(
+            frontier,
+            fetcher,
+            extract_listing_links,
+            process_listing,
+            should_stop=should_stop,
+            max_pages=max_pages,
+            max_listings=max_listings,
+            on_item=on_item,
+            persist=persist,
+            # At least a full batch of AI listings must be in flight for it to fill up
+            parse_concurrency=max(AI_PARSE_CONCURRENCY, batch_size, 1),
+        )
+    except httpx.HTTPError as e:
         print(f"Error fetching {url}: {e}")
         raise
     except Exception as e:
         print(f"Error in scrape_ai_listings: {e}")
         raise
 
+def scrape_ai_listings(
+    url: str,
+    model: str = "gpt-4o-mini",
+    should_stop: Callable[[], bool] | None = None,
+    max_pages: int = CRAWL_MAX_PAGES,
+    max_listings: int | None = AI_MAX_LISTINGS,
+    on_item: Callable[[Dict], None] | None = None,
+    persist: Callable[[List[Dict]], None] = send_batch_to_api,
+    revisit: bool = False,
+    batch_size: int = AI_BATCH_SIZE,
+) -> List[Dict[str, str | float | int | None]]:
+    """Scrape multiple listings from a given URL using AI."""
+    return asyncio.run(scrape_ai_listings_async(
+        url,
+        model=model,
+        should_stop=should_stop,
+        max_pages=max_pages,
+        max_listings=max_listings,
+        on_item=on_item,
+        persist=persist,
+        revisit=revisit,
+        batch_size=batch_size,
+    ))
+
 def get_ai_processed_count() -> int:
     """Return the total number of AI-processed listings."""
     return ai_processed_count
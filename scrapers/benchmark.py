@@ -0,0 +1,252 @@
+import argparse
+import datetime
+import http.server
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+# Listing pages per generated index page
+INDEX_PAGE_SIZE = 24
+RSS_SAMPLE_INTERVAL = 0.05
+PHASE_KEYS = ["elapsed_time", "fetch_time", "parse_time", "llm_time", "persist_time"]
+SCENARIOS = ["manual", "ai", "endpoint"]
+
+LISTING_PATH = re.compile(r"/mieszkanie-krakow/ob/(\d+)")
+
+def make_handler(pages: List[bytes], listings: int, served: Dict[str, int], latency: float = 0.0):
+    """Build a request handler serving generated index pages and the saved listing pages, counting requests in `served`."""
+
+    class FixtureHandler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            served["requests"] += 1
+            time.sleep(latency)
+            match = LISTING_PATH.search(self.path)
+            if match and int(match.group(1)) < listings:
+                body = pages[int(match.group(1)) % len(pages)]
+            elif self.path.startswith("/mieszkania"):
+                body = self.index_page().encode("utf-8")
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def index_page(self) -> str:
+            page = int(re.search(r"page=(\d+)", self.path).group(1)) if "page=" in self.path else 1
+            first = (page - 1) * INDEX_PAGE_SIZE
+            # Links match both the manual scraper's teaser selector and the AI scraper's URL pattern
+            teasers = "".join(
+                f'<div class="listing__teaserWrapper"><a class="teaserLinkSeo" href="/mieszkanie-krakow/ob/{i}">{i}</a></div>'
+                for i in range(first, min(first + INDEX_PAGE_SIZE, listings))
+            )
+            next_link = f'<link rel="next" href="/mieszkania?page={page + 1}">' if first + INDEX_PAGE_SIZE < listings else ""
+            return f"<html><head>{next_link}</head><body>{teasers}</body></html>"
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+class RssSampler:
+    """Track the peak resident memory of this process while a scenario runs."""
+
+    def __init__(self, current_rss: Callable[[], int | None]):
+        self.current_rss = current_rss
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.current_rss() or 0)
+            self._stop.wait(RSS_SAMPLE_INTERVAL)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current_rss() or 0)
+
+def percentile(values: List[float], fraction: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+def summarize(items: List[Dict], elapsed: float, peak_rss: int, llm_calls: int, requests: int) -> Dict:
+    """Reduce a scenario's scraped items to throughput, per-phase latency, memory and LLM usage.
+
+    Throughput counts distinct listing pages, since the endpoint scenario returns an item per scraper for each page.
+    """
+    pages = len({item.get("url") for item in items})
+    phases = {}
+    for key in PHASE_KEYS:
+        values = [item[key] for item in items if item.get(key) is not None]
+        if values:
+            phases[key] = {"p50": percentile(values, 0.5), "p95": percentile(values, 0.95), "mean": sum(values) / len(values)}
+    return {
+        "listings": len(items),
+        "pages": pages,
+        "wall_time": elapsed,
+        "pages_per_sec": pages / elapsed if elapsed else 0,
+        "phases": phases,
+        "peak_rss_mb": peak_rss / 1024 / 1024,
+        "llm_calls": llm_calls,
+        "llm_calls_per_page": llm_calls / pages if pages else 0,
+        "http_requests": requests,
+    }
+
+def run_benchmark(paths: List[str], listings: int, scenarios: List[str], model: str, page_latency: float = 0.0) -> Dict:
+    """Serve the pages locally and run each scenario end to end against a fresh database."""
+    # Imported here so the database, archive and telemetry files land in the working directory chosen by main()
+    from fastapi.testclient import TestClient
+
+    from backend.main import app
+    from db.database import Base, engine
+    from db.repository import upsert_listings
+    from db.run_history import flush_run_history
+    from scrapers.ai_scraper import scrape_ai_listings
+    from scrapers.llm_client import get_llm_stats
+    from scrapers.pipeline import shutdown_parse_pool
+    from scrapers.selector_inference import learned_selectors
+    from scrapers.telemetry import current_rss
+    from scrapers.telemetry_sink import flush_telemetry
+    from scrapers.wolf import scrape_wolf
+
+    pages = []
+    for path in paths:
+        with open(path, "rb") as file:
+            pages.append(file.read())
+    served = {"requests": 0}
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), make_handler(pages, listings, served, page_latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    seed = f"http://127.0.0.1:{server.server_port}/mieszkania"
+
+    def llm_calls() -> int:
+        return int(sum(stats["calls"] + stats["failures"] for stats in get_llm_stats().values()))
+
+    def run_manual() -> List[Dict]:
+        return scrape_wolf(seed, persist=upsert_listings)
+
+    def run_ai() -> List[Dict]:
+        return scrape_ai_listings(seed, model=model, persist=upsert_listings, max_listings=None)
+
+    def run_endpoint() -> List[Dict]:
+        response = TestClient(app).get("/scrape", params={"url": seed, "model": model})
+        response.raise_for_status()
+        result = response.json()
+        return result["ai_listings"] + result["manual_listings"]
+
+    runners = {"manual": run_manual, "ai": run_ai, "endpoint": run_endpoint}
+    results = {}
+    try:
+        for name in scenarios:
+            # Every scenario starts cold: empty tables and no learned selectors
+            Base.metadata.drop_all(bind=engine)
+            Base.metadata.create_all(bind=engine)
+            learned_selectors.clear()
+            calls_before = llm_calls()
+            served["requests"] = 0
+            with RssSampler(current_rss) as sampler:
+                start_time = time.perf_counter()
+                items = runners[name]()
+                elapsed = time.perf_counter() - start_time
+            results[name] = summarize(items, elapsed, sampler.peak, llm_calls() - calls_before, served["requests"])
+            # Background writes belong to the scenario that queued them
+            flush_run_history()
+            flush_telemetry()
+            print(f"{name}: {results[name]['listings']} listings from {results[name]['pages']} pages, {results[name]['pages_per_sec']:.1f} pages/s, {served['requests']} requests")
+    finally:
+        server.shutdown()
+        shutdown_parse_pool()
+        engine.dispose()
+    return results
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(previous: Dict, current: Dict):
+    """Print the change in throughput and p50 latency against an earlier result file."""
+    for name, result in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        speed = result["pages_per_sec"] / before["pages_per_sec"] - 1 if before["pages_per_sec"] else 0
+        print(f"{name}: {speed:+.1%} pages/s vs {previous.get('commit') or 'previous run'}")
+        for phase, stats in result["phases"].items():
+            old = before.get("phases", {}).get(phase)
+            if old and old["p50"]:
+                print(f"  {phase} p50: {stats['p50'] / old['p50'] - 1:+.1%}")
+
+if __name__ == "__main__":
+    # Usage: python -m scrapers.benchmark saved_pages/*.html --listings 200 --output bench.json
+    parser = argparse.ArgumentParser(description="Benchmark both scrapers against a local fixture server.")
+    parser.add_argument("pages", nargs="+", help="Saved listing pages to serve")
+    parser.add_argument("--listings", type=int, default=100, help="Listings on the generated index pages")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Scenarios to run (default: all)")
+    parser.add_argument("--page-latency", type=float, default=0.0, help="Simulated network latency per page in seconds")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Mock LLM latency in seconds")
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0, help="Share of mock LLM calls answered with 429")
+    parser.add_argument("--no-heuristics", action="store_true", help="Always ask the (mock) LLM for selectors")
+    parser.add_argument("--database-url", default="sqlite:///./scraped_data.db", help="Database to benchmark against; its tables are dropped (default: SQLite in a scratch directory)")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    paths = [os.path.abspath(path) for path in args.pages]
+    output = os.path.abspath(args.output) if args.output else None
+    previous_path = os.path.abspath(args.compare) if args.compare else None
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["MOCK_LLM_LATENCY"] = str(args.llm_latency)
+    os.environ["MOCK_LLM_FAILURE_RATE"] = str(args.llm_failure_rate)
+    if args.no_heuristics:
+        os.environ["HEURISTIC_SELECTORS"] = "0"
+    commit = git_commit()
+
+    # Run in a scratch directory so the benchmark never touches the real database
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        scenarios = run_benchmark(paths, args.listings, args.scenario or SCENARIOS, "mock", args.page_latency)
+
+    report = {
+        "commit": commit,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "pages": len(paths),
+            "listings": args.listings,
+            "page_latency": args.page_latency,
+            "database": args.database_url.split(":", 1)[0],
+            "llm_latency": args.llm_latency,
+            "llm_failure_rate": args.llm_failure_rate,
+            "heuristic_selectors": not args.no_heuristics,
+        },
+        "scenarios": scenarios,
+    }
+    print(json.dumps(report, indent=2))
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    if previous_path:
+        with open(previous_path, encoding="utf-8") as file:
+            compare(json.load(file), report)
+    sys.exit(0)
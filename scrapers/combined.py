@@ -0,0 +1,66 @@
+import asyncio
+import threading
+from typing import Callable, Dict, List
+
+from backend.listing_service import send_batch_to_api
+from scrapers.ai_scraper import scrape_ai_listings_async
+from scrapers.fetcher import SharedFetcher
+from scrapers.frontier import CRAWL_MAX_PAGES
+from scrapers.wolf import scrape_wolf_async
+
+def merge_listings(ai_listings: List[Dict], manual_listings: List[Dict]) -> List[Dict]:
+    """Merge both scrapers' listings by URL; the AI listing wins when both scraped a page."""
+    merged = {listing.get("url"): listing for listing in ai_listings}
+    for listing in manual_listings:
+        merged.setdefault(listing.get("url"), listing)
+    return list(merged.values())
+
+async def scrape_combined_async(
+    url: str,
+    model: str = "gpt-4o-mini",
+    should_stop: Callable[[], bool] | None = None,
+    max_pages: int = CRAWL_MAX_PAGES,
+    on_item: Callable[[Dict], None] | None = None,
+    persist: Callable[[List[Dict]], None] = send_batch_to_api,
+    revisit: bool = False,
+) -> Dict[str, List[Dict]]:
+    """Run the AI and manual scrapers concurrently over one shared fetcher.
+
+    Each index and listing page is downloaded once and handed to both extractors. Both crawls keep
+    their own frontier, so either can be resumed on its own.
+    """
+    # Both crawls write the same listings rows; one batch at a time keeps SQLite from locking up
+    persist_lock = threading.Lock()
+
+    def persist_batch(items: List[Dict]):
+        with persist_lock:
+            persist(items)
+
+    async with SharedFetcher(consumers=2) as fetcher:
+        ai_listings, manual_listings = await asyncio.gather(
+            scrape_ai_listings_async(
+                url, model, fetcher, should_stop, max_pages, on_item=on_item, persist=persist_batch, revisit=revisit
+            ),
+            scrape_wolf_async(url, fetcher, should_stop, max_pages, on_item, persist_batch, revisit),
+        )
+        print(f"Combined scrape of {url} shared {fetcher.shared_hits} page fetches.")
+
+    return {
+        "ai_listings": ai_listings,
+        "manual_listings": manual_listings,
+        "combined_listings": merge_listings(ai_listings, manual_listings),
+    }
+
+def scrape_combined(
+    url: str,
+    model: str = "gpt-4o-mini",
+    should_stop: Callable[[], bool] | None = None,
+    max_pages: int = CRAWL_MAX_PAGES,
+    on_item: Callable[[Dict], None] | None = None,
+    persist: Callable[[List[Dict]], None] = send_batch_to_api,
+    revisit: bool = False,
+) -> Dict[str, List[Dict]]:
+    """Scrape a listings page with both scrapers at once, fetching every page only once."""
+    return asyncio.run(scrape_combined_async(
+        url, model=model, should_stop=should_stop, max_pages=max_pages, on_item=on_item, persist=persist, revisit=revisit
+    ))
@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import os
+import weakref
+from typing import Dict, List
+from urllib.parse import urlparse
+
+import httpx
+
+# Fetch settings (override through .env)
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", 20))
+FETCH_PER_HOST_CONCURRENCY = int(os.getenv("FETCH_PER_HOST_CONCURRENCY", 8))
+FETCH_RATE_LIMIT = float(os.getenv("FETCH_RATE_LIMIT", 0))  # Requests per second per host, 0 disables limiting
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", 10))
+FETCH_RETRIES = int(os.getenv("FETCH_RETRIES", 2))  # Extra attempts after a connection error or a retryable status
+FETCH_RETRY_BACKOFF = float(os.getenv("FETCH_RETRY_BACKOFF", 0.5))  # Seconds before the first retry, doubled after each
+
+# Statuses worth retrying: rate limited or a temporarily unavailable server
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; PRO2-scraping/1.0)"}
+
+class AsyncFetcher:
+    """Pooled keep-alive HTTP client with global and per-host concurrency and rate limits."""
+
+    def __init__(
+        self,
+        concurrency: int = FETCH_CONCURRENCY,
+        per_host_concurrency: int = FETCH_PER_HOST_CONCURRENCY,
+        rate_limit: float = FETCH_RATE_LIMIT,
+        timeout: float = FETCH_TIMEOUT,
+        retries: int = FETCH_RETRIES,
+        retry_backoff: float = FETCH_RETRY_BACKOFF,
+    ):
+        self.concurrency = concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.rate_limit = rate_limit
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.client: httpx.AsyncClient | None = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_slot: Dict[str, float] = {}
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.client.aclose()
+        self.client = None
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return self._host_semaphores[host]
+
+    async def _wait_for_slot(self, host: str):
+        """Space out requests to a host so they never exceed the configured rate."""
+        if not self.rate_limit:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + 1 / self.rate_limit
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def fetch(self, url: str, headers: Dict[str, str] | None = None) -> httpx.Response:
+        """Fetch a single URL, raising httpx.HTTPError on network or status errors (304 is returned as is).
+
+        Connection errors and RETRY_STATUSES are retried with exponential backoff, without holding a slot.
+        """
+        host = urlparse(url).netloc
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore, self._host_semaphore(host):
+                    await self._wait_for_slot(host)
+                    response = await self.client.get(url, headers=headers)
+                    if response.status_code != 304:
+                        response.raise_for_status()
+                    return response
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                retryable = isinstance(e, httpx.TransportError) or e.response.status_code in RETRY_STATUSES
+                if not retryable or attempt == self.retries:
+                    raise
+            await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    def claim_archive(self, response: httpx.Response) -> bool:
+        """Return True if the caller should archive this response; every download is archived once."""
+        return True
+
+    async def fetch_all(
+        self, urls: List[str], headers: Dict[str, Dict[str, str]] | None = None
+    ) -> List[httpx.Response | Exception]:
+        """Fetch many URLs concurrently, with optional per-URL headers; failures are returned in place."""
+        headers = headers or {}
+        return await asyncio.gather(*(self.fetch(url, headers.get(url)) for url in urls), return_exceptions=True)
+
+class SharedFetcher(AsyncFetcher):
+    """Fetcher shared by several crawls of the same site, downloading each URL only once.
+
+    Concurrent and later requests for the same URL and headers get the same response. A response is
+    dropped once `consumers` callers have taken it, so memory stays bounded when every crawl reaches
+    every page; the rest is released when the fetcher closes.
+    """
+
+    def __init__(self, consumers: int = 2, **kwargs):
+        super().__init__(**kwargs)
+        self.consumers = consumers
+        self._shared: Dict[tuple, asyncio.Future] = {}
+        self._takers: Dict[tuple, int] = {}
+        self._archived: "weakref.WeakSet[httpx.Response]" = weakref.WeakSet()
+        self.shared_hits = 0
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self._shared.clear()
+        self._takers.clear()
+        await super().__aexit__(exc_type, exc_value, traceback)
+
+    def _forget_failure(self, key: tuple, future: asyncio.Future):
+        # Failed fetches are not shared, so a retry downloads the page again
+        if (future.cancelled() or future.exception()) and self._shared.get(key) is future:
+            self._shared.pop(key, None)
+            self._takers.pop(key, None)
+
+    def claim_archive(self, response: httpx.Response) -> bool:
+        # Only the first crawl to take a shared response archives it
+        if response in self._archived:
+            return False
+        self._archived.add(response)
+        return True
+
+    async def fetch(self, url: str, headers: Dict[str, str] | None = None) -> httpx.Response:
+        key = (url, tuple(sorted((headers or {}).items())))
+        future = self._shared.get(key)
+        if future is None:
+            future = self._shared[key] = asyncio.ensure_future(super().fetch(url, headers))
+            future.add_done_callback(lambda done: self._forget_failure(key, done))
+        else:
+            self.shared_hits += 1
+        self._takers[key] = self._takers.get(key, 0) + 1
+        if self._takers[key] >= self.consumers:
+            self._shared.pop(key, None)
+            self._takers.pop(key, None)
+        # Shielded so one crawl being cancelled does not cancel the download for the other
+        return await asyncio.shield(future)
+
+def content_hash(content: bytes) -> str:
+    """Hash a page body to detect unchanged pages that lack HTTP validators."""
+    return hashlib.sha256(content).hexdigest()
+
+def page_validators(response: httpx.Response) -> Dict[str, str | None]:
+    """Return the validators of a fetched page, to be stored with its listing."""
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "content_hash": content_hash(response.content),
+    }
+
+def conditional_headers(validators: Dict[str, str | None]) -> Dict[str, str]:
+    """Build If-None-Match/If-Modified-Since headers from stored validators."""
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+def fetch_page(url: str) -> httpx.Response:
+    """Synchronously fetch a single page through the shared fetch layer."""
+    async def run():
+        async with AsyncFetcher() as fetcher:
+            return await fetcher.fetch(url)
+    return asyncio.run(run())
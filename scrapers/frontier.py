@@ -0,0 +1,427 @@
+import asyncio
+import datetime
+import os
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple
+from urllib.parse import parse_qs, urljoin, urlparse
+
+import httpx
+from bs4 import BeautifulSoup
+from sqlalchemy import and_, or_
+
+from db.database import SessionLocal, WriteSessionLocal
+from db.models import FrontierEntry, Listing
+from db.repository import VALIDATOR_COLUMNS
+from scrapers.fetcher import AsyncFetcher, conditional_headers, page_validators
+from scrapers.page_archive import PAGE_ARCHIVE, archive_pages
+from scrapers.pipeline import PARSE_WORKERS, PIPELINE_FLUSH_INTERVAL, PIPELINE_QUEUE_SIZE
+
+# Crawl settings (override through .env)
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", 100))
+CRAWL_BATCH_SIZE = int(os.getenv("CRAWL_BATCH_SIZE", 50))
+CRAWL_MAX_ATTEMPTS = int(os.getenv("CRAWL_MAX_ATTEMPTS", 3))
+CRAWL_LEASE_SECONDS = float(os.getenv("CRAWL_LEASE_SECONDS", 300))  # Until another crawl may take over claimed URLs
+
+INDEX = "index"
+LISTING = "listing"
+
+# Lower values are crawled first
+PRIORITY_INDEX = 0
+PRIORITY_NEW = 1
+PRIORITY_KNOWN = 2
+
+class CrawlFrontier:
+    """Persistent queue of index and listing URLs for one seed page and scraper.
+
+    Crawls of the same seed share the queue: each URL is claimed by one crawl at a time, under a lease
+    that a crashed crawl's URLs are reclaimed after.
+    """
+
+    def __init__(self, seed: str, scraper_type: str, revisit_known: bool = False, lease_seconds: float = CRAWL_LEASE_SECONDS):
+        self.seed = seed
+        self.scraper_type = scraper_type
+        self.revisit_known = revisit_known
+        self.lease_seconds = lease_seconds
+        self.owner = uuid.uuid4().hex
+
+    def _query(self, db):
+        return db.query(FrontierEntry).filter(
+            FrontierEntry.seed == self.seed,
+            FrontierEntry.scraper_type == self.scraper_type,
+        )
+
+    def _unfinished(self, db):
+        return self._query(db).filter(FrontierEntry.status.in_(["pending", "in_progress"]))
+
+    def _claimed(self, db):
+        return self._query(db).filter(FrontierEntry.status == "in_progress", FrontierEntry.lease_owner == self.owner)
+
+    def start(self) -> bool:
+        """Resume an interrupted crawl, join a running one, or start a new one from the seed. Returns True unless new."""
+        db = WriteSessionLocal()
+        try:
+            pending = self._unfinished(db).count()
+            if pending:
+                print(f"Resuming crawl of {self.seed} ({self.scraper_type}) with {pending} pending URLs.")
+                return True
+            self._query(db).delete(synchronize_session=False)
+            db.add(FrontierEntry(
+                seed=self.seed,
+                scraper_type=self.scraper_type,
+                url=self.seed,
+                kind=INDEX,
+                priority=PRIORITY_INDEX,
+            ))
+            db.commit()
+            return False
+        finally:
+            db.close()
+
+    def _known_urls(self, db, urls: List[str]) -> set:
+        """Return the URLs this scraper has already stored in the listings table."""
+        telemetry = Listing.ai_elapsed_time if self.scraper_type == "ai" else Listing.manual_elapsed_time
+        rows = db.query(Listing.url).filter(Listing.url.in_(urls), telemetry.isnot(None)).all()
+        return {row.url for row in rows}
+
+    def validators(self, urls: List[str]) -> Dict[str, Dict]:
+        """Return the page validators this scraper stored for the listings it has already processed."""
+        telemetry = Listing.ai_elapsed_time if self.scraper_type == "ai" else Listing.manual_elapsed_time
+        table = Listing.__table__
+        columns = VALIDATOR_COLUMNS.get(self.scraper_type, {})
+        db = SessionLocal()
+        try:
+            rows = db.query(Listing.url, *[table.c[column] for column in columns]).filter(
+                Listing.url.in_(urls), telemetry.isnot(None)
+            )
+            return {row.url: {key: getattr(row, column) for column, key in columns.items()} for row in rows}
+        finally:
+            db.close()
+
+    def add_index_page(self, url: str, max_pages: int = CRAWL_MAX_PAGES) -> bool:
+        """Queue a pagination page unless it was already seen or the page limit is reached."""
+        db = WriteSessionLocal()
+        try:
+            query = self._query(db).filter(FrontierEntry.kind == INDEX)
+            if query.filter(FrontierEntry.url == url).first() or query.count() >= max_pages:
+                return False
+            db.add(FrontierEntry(
+                seed=self.seed,
+                scraper_type=self.scraper_type,
+                url=url,
+                kind=INDEX,
+                priority=PRIORITY_INDEX,
+            ))
+            db.commit()
+            return True
+        finally:
+            db.close()
+
+    def add_listings(self, urls: List[str]) -> int:
+        """Queue listing URLs, skipping duplicates and (unless revisiting) already stored listings."""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return 0
+        db = WriteSessionLocal()
+        try:
+            queued = {row.url for row in self._query(db).with_entities(FrontierEntry.url).filter(FrontierEntry.url.in_(urls))}
+            known = self._known_urls(db, urls)
+            added = 0
+            for url in urls:
+                if url in queued or (url in known and not self.revisit_known):
+                    continue
+                db.add(FrontierEntry(
+                    seed=self.seed,
+                    scraper_type=self.scraper_type,
+                    url=url,
+                    kind=LISTING,
+                    priority=PRIORITY_KNOWN if url in known else PRIORITY_NEW,
+                ))
+                added += 1
+            db.commit()
+            return added
+        finally:
+            db.close()
+
+    def next_batch(self, limit: int = CRAWL_BATCH_SIZE, exclude: Iterable[str] = ()) -> List[Tuple[str, str]]:
+        """Claim up to `limit` (kind, url) pairs, index pages and unseen listings first, and extend the lease of earlier claims.
+
+        Pending URLs and URLs whose lease ran out are claimed; URLs in `exclude` (e.g. still being processed) are skipped.
+        PostgreSQL skips rows other crawls have locked (FOR UPDATE SKIP LOCKED); on SQLite the write transaction is taken
+        up front, so only one crawl claims at a time.
+        """
+        now = datetime.datetime.now()
+        lease = {"lease_owner": self.owner, "lease_expires_at": now + datetime.timedelta(seconds=self.lease_seconds)}
+        db = WriteSessionLocal()
+        try:
+            self._claimed(db).update(lease, synchronize_session=False)
+            query = self._query(db).filter(or_(
+                FrontierEntry.status == "pending",
+                and_(FrontierEntry.status == "in_progress", FrontierEntry.lease_expires_at < now),
+            ))
+            if exclude:
+                query = query.filter(FrontierEntry.url.notin_(list(exclude)))
+            rows = query.order_by(
+                FrontierEntry.priority, FrontierEntry.id
+            ).limit(limit).with_for_update(skip_locked=True).all()
+            for row in rows:
+                row.status = "in_progress"
+                row.lease_owner = lease["lease_owner"]
+                row.lease_expires_at = lease["lease_expires_at"]
+            batch = [(row.kind, row.url) for row in rows]
+            db.commit()
+            return batch
+        finally:
+            db.close()
+
+    def mark_done(self, urls: List[str]):
+        """Mark URLs as processed so a resumed crawl skips them."""
+        if not urls:
+            return
+        db = WriteSessionLocal()
+        try:
+            self._query(db).filter(FrontierEntry.url.in_(urls)).update(
+                {"status": "done", "processed_at": datetime.datetime.now(), "lease_owner": None, "lease_expires_at": None},
+                synchronize_session=False,
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def mark_failed(self, urls: List[str]):
+        """Record a failed attempt; URLs are pending again until they run out of attempts."""
+        if not urls:
+            return
+        db = WriteSessionLocal()
+        try:
+            for entry in self._query(db).filter(FrontierEntry.url.in_(urls)):
+                entry.attempts = (entry.attempts or 0) + 1
+                entry.processed_at = datetime.datetime.now()
+                entry.status = "failed" if entry.attempts >= CRAWL_MAX_ATTEMPTS else "pending"
+                entry.lease_owner = None
+                entry.lease_expires_at = None
+            db.commit()
+        finally:
+            db.close()
+
+    def release(self, urls: List[str] | None = None):
+        """Hand claimed URLs (by default all of this crawl's claims) back as pending, e.g. when the crawl stops."""
+        db = WriteSessionLocal()
+        try:
+            query = self._claimed(db)
+            if urls is not None:
+                query = query.filter(FrontierEntry.url.in_(urls))
+            query.update({"status": "pending", "lease_owner": None, "lease_expires_at": None}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def pending_count(self) -> int:
+        """Return the number of URLs still waiting to be crawled, including ones other crawls have claimed."""
+        db = SessionLocal()
+        try:
+            return self._unfinished(db).count()
+        finally:
+            db.close()
+
+def _page_number(url: str) -> int | None:
+    values = parse_qs(urlparse(url).query).get("page")
+    if not values:
+        return 1
+    try:
+        return int(values[0])
+    except ValueError:
+        return None
+
+def find_next_page(soup: BeautifulSoup, page_url: str) -> str | None:
+    """Find the URL of the next pagination page, if any."""
+    tag = soup.select_one('link[rel~="next"], a[rel~="next"]')
+    if tag and tag.get("href"):
+        return urljoin(page_url, tag["href"])
+
+    current = _page_number(page_url)
+    if current is None:
+        return None
+    path = urlparse(page_url).path
+    for a in soup.find_all("a", href=True):
+        href = urljoin(page_url, a["href"])
+        if urlparse(href).path == path and _page_number(href) == current + 1:
+            return href
+    return None
+
+async def crawl(
+    frontier: CrawlFrontier,
+    fetcher: AsyncFetcher,
+    extract_links: Callable[[BeautifulSoup, str], List[str]],
+    process_listing: Callable[[str, httpx.Response], Awaitable[Dict | None]],
+    should_stop: Callable[[], bool] | None = None,
+    max_pages: int = CRAWL_MAX_PAGES,
+    max_listings: int | None = None,
+    batch_size: int = CRAWL_BATCH_SIZE,
+    on_item: Callable[[Dict], None] | None = None,
+    persist: Callable[[List[Dict]], None] | None = None,
+    parse_concurrency: int = max(PARSE_WORKERS, 1),
+) -> List[Dict]:
+    """Drain the frontier through a fetch -> parse -> write pipeline.
+
+    Fetched pages wait on a bounded queue for `parse_concurrency` parse tasks, so fetching never runs
+    more than `PIPELINE_QUEUE_SIZE` pages ahead of parsing. Parsed listings are handed to `persist` in
+    batches of up to `batch_size` before their URLs are marked done. Frontier queries run in threads, so
+    they never block the event loop.
+    """
+    resumed = await asyncio.to_thread(frontier.start)
+    listings = []
+    in_flight = set()
+    fetched: asyncio.Queue = asyncio.Queue(PIPELINE_QUEUE_SIZE)
+    parsed: asyncio.Queue = asyncio.Queue(PIPELINE_QUEUE_SIZE)
+    progress = asyncio.Event()
+
+    def stopped() -> bool:
+        return bool(should_stop and should_stop())
+
+    async def fetch_stage():
+        try:
+            while not stopped():
+                limit = batch_size
+                if max_listings is not None:
+                    limit = min(limit, max_listings - len(listings) - len(in_flight))
+                batch = await asyncio.to_thread(frontier.next_batch, limit, list(in_flight)) if limit > 0 else []
+                if not batch:
+                    if not in_flight:
+                        break
+                    # Wait for the writer: failed listings may be retried and new pages may be queued
+                    progress.clear()
+                    await progress.wait()
+                    continue
+
+                for page_url in [url for kind, url in batch if kind == INDEX]:
+                    try:
+                        response = await fetcher.fetch(page_url)
+                    except httpx.HTTPError as e:
+                        print(f"Error fetching listings page {page_url}: {e}")
+                        await asyncio.to_thread(frontier.mark_failed, [page_url])
+                        if page_url == frontier.seed and not resumed:
+                            raise
+                        continue
+                    soup = BeautifulSoup(response.text, "html.parser")
+                    added = await asyncio.to_thread(frontier.add_listings, extract_links(soup, page_url))
+                    print(f"Queued {added} new listing links from {page_url}.")
+                    next_page = find_next_page(soup, page_url)
+                    if next_page:
+                        await asyncio.to_thread(frontier.add_index_page, next_page, max_pages)
+                    await asyncio.to_thread(frontier.mark_done, [page_url])
+
+                listing_urls = [url for kind, url in batch if kind == LISTING]
+                if not listing_urls:
+                    continue
+                in_flight.update(listing_urls)
+                # Revisited listings are fetched conditionally and skipped when the page has not changed
+                validators = await asyncio.to_thread(frontier.validators, listing_urls)
+                responses = await fetcher.fetch_all(
+                    listing_urls, {url: conditional_headers(stored) for url, stored in validators.items()}
+                )
+                if PAGE_ARCHIVE:
+                    await asyncio.to_thread(archive_pages, [
+                        (url, response.content, response.encoding) for url, response in zip(listing_urls, responses)
+                        if not isinstance(response, Exception) and response.status_code != 304 and fetcher.claim_archive(response)
+                    ], frontier.scraper_type)
+                for listing_url, response in zip(listing_urls, responses):
+                    if isinstance(response, Exception):
+                        print(f"Error fetching {listing_url}: {response}")
+                        await parsed.put((listing_url, "failed", None))
+                        continue
+                    page = page_validators(response) if response.status_code != 304 else None
+                    stored = validators.get(listing_url)
+                    if page is None or (stored and stored.get("content_hash") == page["content_hash"]):
+                        await parsed.put((listing_url, "unchanged", None))
+                        continue
+                    # Blocks while the parse stage is PIPELINE_QUEUE_SIZE pages behind
+                    await fetched.put((listing_url, response, page))
+        finally:
+            for _ in range(parse_concurrency):
+                await fetched.put(None)
+
+    async def parse_stage():
+        try:
+            while (entry := await fetched.get()) is not None:
+                listing_url, response, page = entry
+                if stopped():
+                    # Left pending so a resumed crawl picks it up
+                    await parsed.put((listing_url, "stopped", None))
+                    continue
+                try:
+                    item = await process_listing(listing_url, response)
+                except Exception as e:
+                    print(f"Error processing {listing_url}: {e}")
+                    await parsed.put((listing_url, "failed", None))
+                    continue
+                if item is not None:
+                    item.update(page)
+                await parsed.put((listing_url, "done", item))
+        finally:
+            await parsed.put(None)
+
+    async def write_stage():
+        pending: List[tuple] = []
+        running = parse_concurrency
+
+        async def flush():
+            items = [item for _, status, item in pending if status == "done" and item is not None]
+            done = [url for url, status, _ in pending if status in ("done", "unchanged")]
+            failed = [url for url, status, _ in pending if status == "failed"]
+            stopped_urls = [url for url, status, _ in pending if status == "stopped"]
+            unchanged = sum(1 for _, status, _ in pending if status == "unchanged")
+            if unchanged:
+                print(f"Skipped {unchanged} unchanged listings.")
+            persisted = True
+            if items and persist:
+                try:
+                    start_time = time.perf_counter()
+                    await asyncio.to_thread(persist, items)
+                    persist_time = (time.perf_counter() - start_time) / len(items)
+                    for item in items:
+                        item["persist_time"] = persist_time
+                except Exception as e:
+                    print(f"Error persisting {len(items)} listings: {e}")
+                    await asyncio.to_thread(frontier.mark_failed, done + failed)
+                    persisted = False
+            if persisted:
+                for item in items:
+                    listings.append(item)
+                    if on_item:
+                        on_item(item)
+                await asyncio.to_thread(frontier.mark_done, done)
+                await asyncio.to_thread(frontier.mark_failed, failed)
+            if stopped_urls:
+                await asyncio.to_thread(frontier.release, stopped_urls)
+            in_flight.difference_update(url for url, _, _ in pending)
+            pending.clear()
+            progress.set()
+
+        while running:
+            try:
+                result = await asyncio.wait_for(parsed.get(), PIPELINE_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                result = False
+            if result is None:
+                running -= 1
+            elif result:
+                pending.append(result)
+            if pending and (result is False or not running or len(pending) >= batch_size):
+                await flush()
+
+    tasks = [asyncio.create_task(fetch_stage()), asyncio.create_task(write_stage())]
+    tasks += [asyncio.create_task(parse_stage()) for _ in range(parse_concurrency)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # URLs claimed but not finished, e.g. after a failure, are left for the next crawl
+        await asyncio.to_thread(frontier.release)
+
+    remaining = await asyncio.to_thread(frontier.pending_count)
+    if remaining:
+        print(f"Crawl of {frontier.seed} paused with {remaining} URLs left in the frontier.")
+    return listings
@@ -0,0 +1,226 @@
+import argparse
+import html as html_lib
+import math
+import os
+import re
+from typing import Dict, List, Tuple
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4.element import PreformattedString
+
+# Prompt size budget (override through .env)
+AI_PROMPT_TOKEN_BUDGET = int(os.getenv("AI_PROMPT_TOKEN_BUDGET", 600))
+CHARS_PER_TOKEN = 4  # Rough size of a token in HTML for GPT-style tokenizers
+PRUNED_TEXT_LENGTH = 80  # Longer texts are shortened when a fragment is over budget
+
+# Elements that never hold listing fields
+DROP_TAGS = {"script", "style", "noscript", "svg", "iframe", "template", "link", "meta", "head", "canvas", "picture"}
+VOID_TAGS = {"br", "hr", "img", "input", "wbr"}
+KEEP_ATTRIBUTES = ["id", "class"]
+
+# Signal patterns, per listing field, in text and in class/id names
+TEXT_SIGNALS = {
+    "rent": re.compile(r"\d[\d\s.,]*\s?(?:zł|pln|eur|€|\$)|\b(?:cena|czynsz|price|rent)\b", re.IGNORECASE),
+    "area": re.compile(r"\d[\d\s.,]*\s?(?:m²|m2|sq\.?\s?ft)|\b(?:powierzchnia|metraż|area)\b", re.IGNORECASE),
+    "address": re.compile(r"\b(?:ul\.|ulica|al\.|aleja|os\.|osiedle|street|address|adres|lokalizacja)", re.IGNORECASE),
+}
+NAME_SIGNALS = {
+    "title": re.compile(r"title|tytul|heading|header__name", re.IGNORECASE),
+    "rent": re.compile(r"price|rent|cena|czynsz", re.IGNORECASE),
+    "area": re.compile(r"area|surface|powierzchnia", re.IGNORECASE),
+    "address": re.compile(r"address|adres|location|lokalizacja|street", re.IGNORECASE),
+}
+WHITESPACE = re.compile(r"\s+")
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of prompt tokens of a text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def _attributes(tag: Tag) -> str:
+    parts = []
+    for name in KEEP_ATTRIBUTES:
+        value = tag.get(name)
+        if isinstance(value, list):
+            value = " ".join(value)
+        if value:
+            parts.append(f' {name}="{html_lib.escape(value, quote=True)}"')
+    return "".join(parts)
+
+def _count_signals(node: Tag, stats: Dict[int, Tuple[Dict[str, int], int]]) -> Tuple[Dict[str, int], int]:
+    """Record the field signals and minimized text size of every element that has text."""
+    counts = dict.fromkeys(NAME_SIGNALS, 0)
+    size = 0
+    for child in node.children:
+        if isinstance(child, PreformattedString):  # Comments, CDATA, doctypes
+            continue
+        if isinstance(child, NavigableString):
+            text = str(child)
+            if text.strip():
+                size += len(WHITESPACE.sub(" ", text))
+                for field, pattern in TEXT_SIGNALS.items():
+                    counts[field] += len(pattern.findall(text))
+            continue
+        if not isinstance(child, Tag) or child.name in DROP_TAGS or child.name in VOID_TAGS:
+            continue
+        child_counts, child_size = _count_signals(child, stats)
+        if not child_size:
+            continue
+        names = " ".join([child.get("id") or ""] + list(child.get("class") or []))
+        for field, pattern in NAME_SIGNALS.items():
+            if (child.name == "h1" and field == "title") or (names.strip() and pattern.search(names)):
+                child_counts[field] += 1
+        stats[id(child)] = (child_counts, child_size)
+        for field, count in child_counts.items():
+            counts[field] += count
+        size += child_size
+    return counts, size
+
+def _serialize(
+    node: Tag,
+    stats: Dict[int, Tuple[Dict[str, int], int]],
+    prune: bool = False,
+    remaining: List[int] | None = None,
+) -> str:
+    """Serialize an element compactly; when pruning, drop children without signals and shorten long texts.
+
+    With `remaining` ([characters left]), serialization stops at the first text or element that does not fit,
+    closing every open element, so a truncated fragment stays well-formed. remaining[0] is -1 once it stopped.
+    """
+    if isinstance(node, BeautifulSoup):
+        open_tag = close_tag = ""
+    else:
+        open_tag, close_tag = f"<{node.name}{_attributes(node)}>", f"</{node.name}>"
+    if remaining is not None:
+        if remaining[0] < len(open_tag) + len(close_tag):
+            remaining[0] = -1
+            return ""
+        remaining[0] -= len(open_tag) + len(close_tag)
+    parts = []
+    for child in node.children:
+        if isinstance(child, PreformattedString):
+            continue
+        if isinstance(child, NavigableString):
+            text = WHITESPACE.sub(" ", str(child))
+            if prune and len(text) > PRUNED_TEXT_LENGTH:
+                text = text[:PRUNED_TEXT_LENGTH] + "…"
+            if text.strip():
+                part = html_lib.escape(text, quote=False)
+            elif parts and not parts[-1].endswith(" "):
+                part = " "
+            else:
+                continue
+            if remaining is not None:
+                if remaining[0] < len(part):
+                    remaining[0] = -1
+                    break
+                remaining[0] -= len(part)
+            parts.append(part)
+            continue
+        if id(child) not in stats or (prune and not any(stats[id(child)][0].values())):
+            continue
+        parts.append(_serialize(child, stats, prune, remaining))
+        if remaining is not None and remaining[0] < 0:
+            break
+    return f"{open_tag}{''.join(parts).strip()}{close_tag}"
+
+def minimize_html(element: Tag) -> str:
+    """Strip scripts, styles, comments, empty elements and attributes other than id/class, and collapse whitespace."""
+    stats: Dict[int, Tuple[Dict[str, int], int]] = {}
+    _count_signals(element, stats)
+    return _serialize(element, stats)
+
+def reduce_html(soup: BeautifulSoup, token_budget: int = AI_PROMPT_TOKEN_BUDGET) -> Tuple[Tag, str]:
+    """Pick the subtree covering the most listing fields and fit its minimized HTML into the token budget.
+
+    Among subtrees covering as many fields as possible, the smallest wins. If its HTML is over budget,
+    children without signals are dropped and long texts shortened, and then it is cut after the last element that fits.
+    Returns the original element and the HTML fragment for the prompt.
+    """
+    root = soup.body or soup
+    stats: Dict[int, Tuple[Dict[str, int], int]] = {}
+    stats[id(root)] = _count_signals(root, stats)
+
+    def rank(element: Tag):
+        counts, size = stats[id(element)]
+        return -sum(1 for count in counts.values() if count), size
+
+    element = min([root] + [tag for tag in root.find_all(True) if id(tag) in stats], key=rank)
+    fragment = _serialize(element, stats)
+    if estimate_tokens(fragment) > token_budget:
+        fragment = _serialize(element, stats, prune=True)
+    if estimate_tokens(fragment) > token_budget:
+        fragment = _serialize(element, stats, prune=True, remaining=[token_budget * CHARS_PER_TOKEN])
+    return element, fragment
+
+def legacy_fragment(soup: BeautifulSoup) -> str:
+    """Return the prompt HTML the AI scraper sent before the minimizer, for comparison."""
+    for container in soup.find_all(["article", "section", "div"], limit=10):
+        text = container.get_text(separator=" ", strip=True).lower()
+        if any(keyword in text for keyword in ["rent", "area", "address", "m²", "price"]):
+            return container.prettify()[:1000]
+    return soup.prettify()[:1000]
+
+def _matches(field: str, extracted: str, expected) -> bool:
+    """Compare a field extracted with selectors to the manual scraper's value."""
+    from scrapers.ai_scraper import clean_area, clean_rent
+
+    if field == "rent":
+        return clean_rent(extracted) == expected
+    if field == "area":
+        return clean_area(extracted) == expected
+    found = WHITESPACE.sub("", extracted).lower()
+    expected = WHITESPACE.sub("", str(expected)).lower()
+    return found not in ("", "notavailable") and (found in expected or expected in found)
+
+def benchmark(paths: List[str], token_budget: int = AI_PROMPT_TOKEN_BUDGET, model: str | None = None) -> Dict[str, Dict[str, float]]:
+    """Report prompt tokens and selector accuracy, old vs. minimized prompt, on saved pages.
+
+    Selectors are inferred from each prompt fragment alone, by the heuristic or by `model` (e.g. mock), and
+    then extracted from the whole page like the AI scraper does. The manual scraper's fields are the ground truth.
+    """
+    from scrapers.ai_scraper import extract_with_selectors, request_selectors
+    from scrapers.selector_inference import FIELDS, infer_selectors, learned_selectors
+    from scrapers.wolf import parse_listing
+
+    totals = {method: {"tokens": 0, "correct": 0} for method in ["legacy", "minimized"]}
+    pages = expected = 0
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            page = file.read()
+        truth = parse_listing(page, path)
+        if truth is None:
+            continue
+        pages += 1
+        soup = BeautifulSoup(page, "html.parser")
+        fragments = {"legacy": legacy_fragment(soup), "minimized": reduce_html(soup, token_budget)[1]}
+        fields = [field for field in FIELDS if truth.get(field) not in (None, "")]
+        expected += len(fields)
+        for method, fragment in fragments.items():
+            if model:
+                selectors = request_selectors(fragment, model)
+            else:
+                learned_selectors["minimizer-benchmark"] = {field: {} for field in FIELDS}  # Every page starts cold
+                selectors = infer_selectors(BeautifulSoup(fragment, "html.parser"), "minimizer-benchmark")[0]
+            extracted = extract_with_selectors(soup, selectors)
+            totals[method]["tokens"] += estimate_tokens(fragment)
+            totals[method]["correct"] += sum(_matches(field, extracted[field], truth[field]) for field in fields)
+
+    results = {}
+    for method, total in totals.items():
+        results[method] = {
+            "tokens_per_page": total["tokens"] / pages if pages else 0,
+            "accuracy": total["correct"] / expected if expected else 0,
+        }
+        print(f"{method}: {results[method]['tokens_per_page']:.0f} tokens/page, "
+              f"{results[method]['accuracy']:.0%} of fields extracted correctly with its selectors")
+    print(f"Measured {pages} of {len(paths)} pages; the others have no manual parse to compare with.")
+    return results
+
+if __name__ == "__main__":
+    # Usage: python -m scrapers.html_minimizer saved_pages/*.html [--model mock]
+    parser = argparse.ArgumentParser(description="Compare prompt size and selector accuracy of the old and minimized prompts.")
+    parser.add_argument("pages", nargs="+", help="Saved listing pages")
+    parser.add_argument("--budget", type=int, default=AI_PROMPT_TOKEN_BUDGET, help="Prompt token budget")
+    parser.add_argument("--model", help="Ask this model (e.g. mock) for selectors instead of the heuristic")
+    args = parser.parse_args()
+    benchmark(args.pages, args.budget, args.model)
@@ -0,0 +1,314 @@
+import abc
+import argparse
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+from groq import AsyncGroq
+from openai import AsyncOpenAI
+
+# LLM client settings (override through .env)
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", 4))  # Requests in flight per provider
+LLM_RATE_LIMIT = float(os.getenv("LLM_RATE_LIMIT", 0))  # Requests per second per provider, 0 disables limiting
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 4))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", 0.5))  # Seconds, doubled on every retry
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", 0))  # Seconds before racing a second provider, 0 disables hedging
+
+# Mock provider settings, for offline runs and benchmarks; the default selectors match the wolf fixture pages
+MOCK_LLM_LATENCY = float(os.getenv("MOCK_LLM_LATENCY", 0.2))
+MOCK_LLM_FAILURE_RATE = float(os.getenv("MOCK_LLM_FAILURE_RATE", 0))
+MOCK_LLM_RESPONSE = os.getenv("MOCK_LLM_RESPONSE", (
+    "title: title\n"
+    "rent: #basic-info-price-row span:last-child\n"
+    "area: #basic-info-price-row + div span\n"
+    "address: .location-row__second_column"
+))
+
+GROQ_MODEL = "llama3-70b-8192"
+FALLBACK_OPENAI_MODEL = "gpt-4o-mini"
+RETRY_STATUSES = {408, 409, 429}
+
+class LLMError(RuntimeError):
+    """An LLM request failed; `status_code` is set for HTTP errors."""
+
+    def __init__(self, message: str, status_code: int | None = None, retry_after: float | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Async token bucket allowing `rate` requests per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class LLMProvider(abc.ABC):
+    """A chat completion backend with its own concurrency and rate limits."""
+
+    name = "provider"
+
+    def __init__(self, concurrency: int = LLM_CONCURRENCY, rate_limit: float = LLM_RATE_LIMIT):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate_limit) if rate_limit else None
+
+    @abc.abstractmethod
+    async def _complete(self, prompt: str, model: str) -> Tuple[str, Dict[str, int]]:
+        """Send one prompt to the backend and return the answer and token usage."""
+
+    async def complete(self, prompt: str, model: str) -> Tuple[str, Dict[str, int]]:
+        """Return the answer and token usage for a prompt, within the provider's limits."""
+        async with self.semaphore:
+            if self.bucket:
+                await self.bucket.acquire()
+            return await self._complete(prompt, model)
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Provider backed by an OpenAI-style async SDK client (OpenAI, Groq)."""
+
+    def __init__(self, client, **limits):
+        super().__init__(**limits)
+        self.client = client
+
+    async def _complete(self, prompt: str, model: str) -> Tuple[str, Dict[str, int]]:
+        try:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.2,
+            )
+        except Exception as e:
+            status_code = getattr(e, "status_code", None)
+            headers = getattr(getattr(e, "response", None), "headers", None) or {}
+            retry_after = headers.get("retry-after")
+            try:
+                retry_after = float(retry_after) if retry_after else None
+            except ValueError:
+                retry_after = None
+            raise LLMError(f"{self.name} request failed: {e}", status_code, retry_after) from e
+        usage = response.usage
+        return response.choices[0].message.content, {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        }
+
+class OpenAIProvider(OpenAICompatibleProvider):
+    name = "openai"
+
+    def __init__(self, **limits):
+        # Retries are handled here, across providers, instead of inside the SDK
+        super().__init__(AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0, timeout=LLM_TIMEOUT), **limits)
+
+class GroqProvider(OpenAICompatibleProvider):
+    name = "groq"
+
+    def __init__(self, **limits):
+        super().__init__(AsyncGroq(api_key=os.getenv("GROQ_API_KEY"), max_retries=0, timeout=LLM_TIMEOUT), **limits)
+
+class MockProvider(LLMProvider):
+    """Local provider with simulated latency and 429s, for offline tests and throughput benchmarks."""
+
+    name = "mock"
+
+    def __init__(
+        self,
+        latency: float = MOCK_LLM_LATENCY,
+        failure_rate: float = MOCK_LLM_FAILURE_RATE,
+        response: str = MOCK_LLM_RESPONSE,
+        **limits,
+    ):
+        super().__init__(**limits)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.response = response
+
+    async def _complete(self, prompt: str, model: str) -> Tuple[str, Dict[str, int]]:
+        await asyncio.sleep(random.uniform(0.5, 1.5) * self.latency)
+        if random.random() < self.failure_rate:
+            raise LLMError("mock rate limit", status_code=429)
+        return self.response, {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(self.response) // 4}
+
+def _create_provider(name: str) -> LLMProvider | None:
+    try:
+        return {"openai": OpenAIProvider, "groq": GroqProvider, "mock": MockProvider}[name]()
+    except Exception as e:
+        print(f"Failed to initialize {name} LLM provider: {e}")
+        return None
+
+# Per-model usage: calls, failures, retries, hedges, latency and tokens
+llm_stats: Dict[str, Dict[str, float]] = {}
+llm_stats_lock = threading.Lock()
+
+def _record(key: str, **values):
+    with llm_stats_lock:
+        stats = llm_stats.setdefault(key, dict.fromkeys([
+            "calls", "failures", "retries", "hedged", "latency_sum", "latency_max", "prompt_tokens", "completion_tokens",
+        ], 0))
+        for name, value in values.items():
+            if name == "latency_max":
+                stats[name] = max(stats[name], value)
+            else:
+                stats[name] += value
+
+def get_llm_stats() -> Dict[str, Dict[str, float]]:
+    """Return call counts, average/max latency and token usage per provider and model."""
+    with llm_stats_lock:
+        return {
+            key: {**stats, "average_latency": stats["latency_sum"] / stats["calls"] if stats["calls"] else 0}
+            for key, stats in llm_stats.items()
+        }
+
+def is_retryable(error: Exception) -> bool:
+    """Return True for rate limits, server errors, timeouts and connection failures."""
+    status_code = getattr(error, "status_code", None)
+    if status_code is not None:
+        return status_code in RETRY_STATUSES or status_code >= 500
+    cause = error.__cause__ or error
+    return isinstance(cause, (asyncio.TimeoutError, httpx.TransportError)) or type(cause).__name__ in (
+        "APIConnectionError", "APITimeoutError",
+    )
+
+class LLMClient:
+    """Routes prompts to providers with retries, exponential backoff, hedging and failover."""
+
+    def __init__(self, providers: Dict[str, LLMProvider] | None = None):
+        self.providers = providers if providers is not None else {}
+        self._lazy = providers is None
+
+    def provider(self, name: str) -> LLMProvider | None:
+        if self._lazy and name not in self.providers:
+            self.providers[name] = _create_provider(name)
+        return self.providers.get(name)
+
+    def routes(self, model: str) -> List[Tuple[LLMProvider, str]]:
+        """Return the (provider, model) to use for a model, then its hedge/failover alternative."""
+        if model == "mock":
+            candidates = [("mock", "mock")]
+        elif model == "groq":
+            candidates = [("groq", GROQ_MODEL), ("openai", FALLBACK_OPENAI_MODEL)]
+        else:
+            candidates = [("openai", model), ("groq", GROQ_MODEL)]
+        return [(self.provider(name), name_model) for name, name_model in candidates if self.provider(name)]
+
+    async def _attempt(self, provider: LLMProvider, model: str, prompt: str) -> str:
+        key = f"{provider.name}:{model}"
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            start_time = time.perf_counter()
+            try:
+                text, usage = await asyncio.wait_for(provider.complete(prompt, model), LLM_TIMEOUT)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt == LLM_MAX_RETRIES or not is_retryable(e):
+                    _record(key, failures=1)
+                    raise
+                delay = getattr(e, "retry_after", None) or LLM_BACKOFF_BASE * 2 ** attempt * random.uniform(0.8, 1.2)
+                print(f"{key} request failed ({e}), retrying in {delay:.1f}s.")
+                _record(key, retries=1)
+                await asyncio.sleep(delay)
+                continue
+            latency = time.perf_counter() - start_time
+            _record(key, calls=1, latency_sum=latency, latency_max=latency, **usage)
+            return text
+        raise LLMError(f"{key} request failed")
+
+    async def complete(self, prompt: str, model: str = "gpt-4o-mini") -> str:
+        """Complete a prompt, racing a second provider if the first is slow and failing over if it errors."""
+        routes = self.routes(model)
+        if not routes:
+            raise LLMError(f"No LLM provider is available for {model}. Check the API keys.")
+        tasks = {asyncio.ensure_future(self._attempt(*routes[0], prompt))}
+        fallback = routes[1] if len(routes) > 1 else None
+        error = None
+        try:
+            if fallback and LLM_HEDGE_AFTER:
+                done, _ = await asyncio.wait(tasks, timeout=LLM_HEDGE_AFTER)
+                if not done:
+                    print(f"{routes[0][0].name} is slow, hedging with {fallback[0].name}.")
+                    _record(f"{fallback[0].name}:{fallback[1]}", hedged=1)
+                    tasks.add(asyncio.ensure_future(self._attempt(*fallback, prompt)))
+                    fallback = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                if not tasks and fallback:
+                    print(f"{routes[0][0].name} failed ({error}), failing over to {fallback[0].name}.")
+                    tasks.add(asyncio.ensure_future(self._attempt(*fallback, prompt)))
+                    fallback = None
+        finally:
+            for task in tasks:
+                task.cancel()
+        raise error
+
+# The shared client runs on its own event loop, so its limits apply across all scrape jobs and threads
+llm_client = LLMClient()
+llm_loop: asyncio.AbstractEventLoop | None = None
+llm_loop_lock = threading.Lock()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global llm_loop
+    with llm_loop_lock:
+        if llm_loop is None:
+            llm_loop = asyncio.new_event_loop()
+            threading.Thread(target=llm_loop.run_forever, name="llm-client", daemon=True).start()
+        return llm_loop
+
+def complete_sync(prompt: str, model: str = "gpt-4o-mini") -> str:
+    """Complete a prompt on the shared client from synchronous code."""
+    return asyncio.run_coroutine_threadsafe(llm_client.complete(prompt, model), _get_loop()).result()
+
+async def complete_async(prompt: str, model: str = "gpt-4o-mini") -> str:
+    """Complete a prompt on the shared client from any event loop."""
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(llm_client.complete(prompt, model), _get_loop()))
+
+async def benchmark(requests: int, concurrency: int, latency: float, failure_rate: float):
+    """Measure throughput and latency of the client against the mock provider."""
+    client = LLMClient({"mock": MockProvider(latency=latency, failure_rate=failure_rate, concurrency=concurrency)})
+    latencies = []
+
+    async def one():
+        start_time = time.perf_counter()
+        await client.complete("benchmark prompt " * 50, "mock")
+        latencies.append(time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(requests)), return_exceptions=True)
+    elapsed = time.perf_counter() - start_time
+    latencies.sort()
+    failures = sum(isinstance(result, Exception) for result in results)
+    print(f"{requests} requests in {elapsed:.2f}s ({requests / elapsed:.1f} req/s), {failures} failed")
+    if latencies:
+        print(f"latency p50 {latencies[len(latencies) // 2]:.3f}s, p95 {latencies[int(len(latencies) * 0.95) - 1]:.3f}s")
+    print(get_llm_stats())
+
+if __name__ == "__main__":
+    # Usage: python -m scrapers.llm_client --requests 200 --concurrency 20 --latency 0.2 --failure-rate 0.1
+    parser = argparse.ArgumentParser(description="Benchmark the LLM client against the mock provider.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=LLM_CONCURRENCY)
+    parser.add_argument("--latency", type=float, default=MOCK_LLM_LATENCY)
+    parser.add_argument("--failure-rate", type=float, default=MOCK_LLM_FAILURE_RATE)
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.requests, args.concurrency, args.latency, args.failure_rate))
@@ -0,0 +1,167 @@
+import json
+import math
+from typing import Any, Dict, List, Tuple
+
+# devalue encodes these values as negative references
+UNDEFINED = -1
+HOLE = -2
+NAN = -3
+POSITIVE_INFINITY = -4
+NEGATIVE_INFINITY = -5
+NEGATIVE_ZERO = -6
+
+SPECIAL_VALUES = {
+    UNDEFINED: None,
+    HOLE: None,
+    NAN: math.nan,
+    POSITIVE_INFINITY: math.inf,
+    NEGATIVE_INFINITY: -math.inf,
+    NEGATIVE_ZERO: -0.0,
+}
+
+# Nuxt payload revivers that wrap a single referenced value
+WRAPPER_TYPES = {"Reactive", "ShallowReactive", "Ref", "ShallowRef", "Object", "NuxtError", "Island"}
+
+# Listing field -> candidate paths in the decoded listing object, tried in order
+LISTING_FIELD_PATHS = {
+    "rent": ["price.amount", "price.value", "price.totalPrice", "price", "rent"],
+    "area": ["area", "surface", "areaM2", "parameters.area", "params.area"],
+    "rooms": ["rooms", "roomsNumber", "numberOfRooms", "parameters.rooms", "params.rooms"],
+    "address": ["address", "location.address", "location.name", "locationName", "location"],
+    "latitude": ["location.latitude", "location.lat", "location.coordinates.lat", "coordinates.lat", "latitude", "lat"],
+    "longitude": [
+        "location.longitude", "location.lon", "location.lng", "location.coordinates.lon", "location.coordinates.lng",
+        "coordinates.lon", "coordinates.lng", "longitude", "lon", "lng",
+    ],
+}
+
+# Address parts joined, in this order, when the address is an object
+ADDRESS_PARTS = ["city", "district", "street"]
+
+def unflatten(values: List, index: int = 0) -> Any:
+    """Resolve the value at `index` of a devalue-flattened Nuxt payload into plain Python objects."""
+    hydrated: Dict[int, Any] = {}
+
+    def hydrate(reference: int) -> Any:
+        if reference in SPECIAL_VALUES:
+            return SPECIAL_VALUES[reference]
+        if reference in hydrated:
+            return hydrated[reference]
+        if not isinstance(reference, int) or not 0 <= reference < len(values):
+            return None  # Malformed payload
+
+        value = values[reference]
+        if isinstance(value, dict):
+            # Register containers before filling them so cyclic references resolve
+            result = hydrated[reference] = {}
+            for key, child in value.items():
+                result[key] = hydrate(child)
+            return result
+        if not isinstance(value, list):
+            hydrated[reference] = value
+            return value
+        if not value or not isinstance(value[0], str):
+            result = hydrated[reference] = []
+            result.extend(hydrate(child) for child in value)
+            return result
+
+        kind = value[0]
+        if kind in WRAPPER_TYPES:
+            result = hydrated[reference] = hydrate(value[1])
+        elif kind in ("Date", "BigInt", "RegExp"):
+            result = hydrated[reference] = value[1]
+        elif kind in ("EmptyRef", "EmptyShallowRef"):
+            result = hydrated[reference] = json.loads(value[1]) if len(value) > 1 else None
+        elif kind == "Set":
+            result = hydrated[reference] = []
+            result.extend(hydrate(child) for child in value[1:])
+        elif kind in ("Map", "null"):
+            result = hydrated[reference] = {}
+            for key, child in zip(value[1::2], value[2::2]):
+                key = hydrate(key) if kind == "Map" else key
+                result[key if isinstance(key, (str, int, float)) else json.dumps(key)] = hydrate(child)
+        else:
+            result = hydrated[reference] = None
+        return result
+
+    return hydrate(index)
+
+def find_listing_index(values: List) -> int | None:
+    """Return the payload index of the listing object, recognised by its adKeywords."""
+    return next((i for i, value in enumerate(values) if isinstance(value, dict) and value.get("adKeywords")), None)
+
+def _lookup(data: Any, path: str) -> Any:
+    for key in path.split("."):
+        if isinstance(data, dict):
+            data = data.get(key)
+        elif isinstance(data, list):
+            # Parameter lists such as [{"key": "area", "value": 45}]
+            data = next((
+                entry.get("value") for entry in data
+                if isinstance(entry, dict) and key in (entry.get("key"), entry.get("name"), entry.get("id"))
+            ), None)
+        else:
+            return None
+    return data
+
+def _number(value: Any) -> float | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else None
+    if isinstance(value, str):
+        cleaned = value.replace("\xa0", "").replace(" ", "").replace("m²", "").replace("zł", "").replace(",", ".")
+        try:
+            number = float(cleaned)
+        except ValueError:
+            return None
+        return number if math.isfinite(number) else None
+    return None
+
+def _address_part(value: Dict, part: str) -> str | None:
+    return _address(value.get(part)) or _address(_lookup(value, f"{part}.name"))
+
+def _address(value: Any) -> str | None:
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, dict):
+        return ", ".join(part for part in (_address_part(value, part) for part in ADDRESS_PARTS) if part) or None
+    return None
+
+def _field(listing: Dict, field: str) -> Any:
+    for path in LISTING_FIELD_PATHS[field]:
+        value = _number(_lookup(listing, path))
+        if value is not None:
+            return value
+    return None
+
+def _address_field(listing: Dict) -> Tuple[str | None, str | None]:
+    """Return the listing's address, or None and the partial address if the payload only names the city."""
+    partial = None
+    for path in LISTING_FIELD_PATHS["address"]:
+        value = _lookup(listing, path)
+        address = _address(value)
+        if address is None:
+            continue
+        if isinstance(value, dict) and not any(_address_part(value, part) for part in ADDRESS_PARTS[1:]):
+            partial = partial or address
+            continue
+        return address, None
+    return None, partial
+
+def listing_details(listing: Dict) -> Dict[str, str | int | float | None]:
+    """Map a decoded listing object to listing fields; fields it does not carry are None.
+
+    An address without district and street is returned as `partial_address`, so a more specific one can be used.
+    """
+    rent, area, rooms = (_field(listing, field) for field in ["rent", "area", "rooms"])
+    address, partial_address = _address_field(listing)
+    return {
+        "rent": int(rent) if rent is not None else None,
+        "area": int(area) if area is not None else None,
+        "rooms": int(rooms) if rooms is not None else None,
+        "address": address,
+        "partial_address": partial_address,
+        "latitude": _field(listing, "latitude"),
+        "longitude": _field(listing, "longitude"),
+    }
@@ -0,0 +1,116 @@
+import datetime
+import gzip
+import os
+import tempfile
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy import func
+
+from db.database import SessionLocal
+from db.models import ArchivedPage
+from scrapers.fetcher import content_hash
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional, gzip is always available
+    zstandard = None
+
+# Page archive settings (override through .env)
+PAGE_ARCHIVE = os.getenv("PAGE_ARCHIVE", "1") == "1"
+PAGE_ARCHIVE_DIR = os.getenv("PAGE_ARCHIVE_DIR", "page_archive")
+PAGE_ARCHIVE_LEVEL = int(os.getenv("PAGE_ARCHIVE_LEVEL", 6))
+
+# Compressed file suffix -> (compress, decompress)
+CODECS = {".gz": (lambda data: gzip.compress(data, PAGE_ARCHIVE_LEVEL), gzip.decompress)}
+if zstandard is not None:
+    CODECS[".zst"] = (
+        lambda data: zstandard.ZstdCompressor(level=PAGE_ARCHIVE_LEVEL).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    )
+DEFAULT_SUFFIX = ".zst" if zstandard is not None else ".gz"
+
+def _object_path(digest: str, suffix: str) -> str:
+    # Two levels of sharding keep directories small
+    return os.path.join(PAGE_ARCHIVE_DIR, digest[:2], digest[2:4], digest + suffix)
+
+def store_page(content: bytes) -> str:
+    """Write a page body to the archive, once per distinct body, and return its hash."""
+    digest = content_hash(content)
+    if any(os.path.exists(_object_path(digest, suffix)) for suffix in CODECS):
+        return digest
+    path = _object_path(digest, DEFAULT_SUFFIX)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    compress = CODECS[DEFAULT_SUFFIX][0]
+    # Write to a temporary file first so concurrent writers never leave a partial object
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), delete=False) as file:
+        file.write(compress(content))
+    os.replace(file.name, path)
+    return digest
+
+def load_page(digest: str) -> bytes | None:
+    """Read an archived page body by hash, or None if it is missing."""
+    for suffix, (_, decompress) in CODECS.items():
+        path = _object_path(digest, suffix)
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                return decompress(file.read())
+    return None
+
+def archive_pages(pages: List[Tuple[str, bytes, str | None]], scraper_type: str):
+    """Store fetched (url, content, encoding) listing pages and index them by URL and fetch time."""
+    if not PAGE_ARCHIVE or not pages:
+        return
+    db = SessionLocal()
+    try:
+        now = datetime.datetime.now()
+        for url, content, encoding in pages:
+            db.add(ArchivedPage(
+                url=url,
+                content_hash=store_page(content),
+                encoding=encoding,
+                scraper_type=scraper_type,
+                fetched_at=now,
+            ))
+        db.commit()
+    except Exception as e:
+        print(f"Failed to archive {len(pages)} pages: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def iter_archive(
+    url_prefix: str | None = None,
+    since: datetime.datetime | None = None,
+    latest_only: bool = True,
+) -> Iterator[Dict]:
+    """Yield archived pages as dicts with url, content, encoding and fetched_at, oldest first.
+
+    With `latest_only`, each URL is yielded once, with its most recent fetch.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(ArchivedPage)
+        if url_prefix:
+            query = query.filter(ArchivedPage.url.startswith(url_prefix))
+        if since:
+            query = query.filter(ArchivedPage.fetched_at >= since)
+        if latest_only:
+            latest = db.query(func.max(ArchivedPage.id)).group_by(ArchivedPage.url)
+            if url_prefix:
+                latest = latest.filter(ArchivedPage.url.startswith(url_prefix))
+            if since:
+                latest = latest.filter(ArchivedPage.fetched_at >= since)
+            query = query.filter(ArchivedPage.id.in_(latest))
+        rows = [
+            (row.url, row.content_hash, row.encoding, row.fetched_at)
+            for row in query.order_by(ArchivedPage.fetched_at, ArchivedPage.id)
+        ]
+    finally:
+        db.close()
+
+    for url, digest, encoding, fetched_at in rows:
+        content = load_page(digest)
+        if content is None:
+            print(f"Archived page for {url} is missing from {PAGE_ARCHIVE_DIR}.")
+            continue
+        yield {"url": url, "content": content, "encoding": encoding, "fetched_at": fetched_at}
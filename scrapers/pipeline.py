@@ -0,0 +1,45 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+# Pipeline settings (override through .env)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", os.cpu_count() or 1))  # 0 parses in the event loop
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 100))  # Fetched pages waiting to be parsed
+PIPELINE_FLUSH_INTERVAL = float(os.getenv("PIPELINE_FLUSH_INTERVAL", 0.5))
+
+parse_pool: ProcessPoolExecutor | None = None
+parse_pool_lock = threading.Lock()
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Return the shared parse process pool, starting it on first use."""
+    global parse_pool
+    with parse_pool_lock:
+        if parse_pool is None:
+            # Spawned workers do not inherit the server's threads, locks or DB connections
+            parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return parse_pool
+
+def shutdown_parse_pool():
+    """Stop the parse worker processes."""
+    global parse_pool
+    with parse_pool_lock:
+        if parse_pool is not None:
+            parse_pool.shutdown(wait=False, cancel_futures=True)
+            parse_pool = None
+
+async def run_parse(func: Callable[..., Any], *args) -> Any:
+    """Run a CPU-bound, picklable parse function on the process pool and await its result."""
+    if PARSE_WORKERS <= 0:
+        return func(*args)
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_parse_pool(), func, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory); start a fresh pool for the next pages
+        print("Parse worker pool broke, restarting it.")
+        shutdown_parse_pool()
+        raise
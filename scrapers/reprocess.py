@@ -0,0 +1,97 @@
+import argparse
+import datetime
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import db.models  # noqa: F401 (registers the tables for sync_schema)
+from db.database import sync_schema
+from db.repository import upsert_listings
+from scrapers.frontier import CRAWL_BATCH_SIZE
+from scrapers.page_archive import PAGE_ARCHIVE_DIR, iter_archive
+from scrapers.pipeline import PARSE_WORKERS, get_parse_pool, shutdown_parse_pool
+from scrapers.wolf import measure_parse_listing
+
+# Reprocess settings (override through .env)
+REPROCESS_AI_WORKERS = int(os.getenv("REPROCESS_AI_WORKERS", 8))  # Pages the AI scraper replays at once
+
+def reprocess_manual(pages: List[Dict]) -> List[Dict]:
+    """Re-parse archived pages with the manual scraper, on the parse worker pool."""
+    arguments = ([page["content"] for page in pages], [page["encoding"] for page in pages], [page["url"] for page in pages])
+    if PARSE_WORKERS <= 0:
+        results = map(measure_parse_listing, *arguments)
+    else:
+        results = get_parse_pool().map(measure_parse_listing, *arguments, chunksize=max(len(pages) // (PARSE_WORKERS * 4), 1))
+    return [item for item in results if item is not None]
+
+def reprocess_ai(pages: List[Dict], model: str) -> List[Dict]:
+    """Re-extract archived pages with the AI scraper on a thread pool; the model is only called on selector cache and heuristic misses."""
+    from scrapers.ai_scraper import scrape_with_ai
+
+    def extract(page: Dict) -> Dict | None:
+        html = page["content"].decode(page["encoding"] or "utf-8", errors="replace")
+        try:
+            return scrape_with_ai(page["url"], model, html=html, send=False)
+        except Exception as e:
+            print(f"Error reprocessing {page['url']}: {e}")
+            return None
+
+    # Selector lookups and model calls wait on I/O; LLM_CONCURRENCY still bounds requests to the provider
+    with ThreadPoolExecutor(max_workers=max(REPROCESS_AI_WORKERS, 1), thread_name_prefix="reprocess-ai") as executor:
+        return [item for item in executor.map(extract, pages) if item is not None]
+
+def reprocess(
+    scrapers: List[str],
+    model: str = "mock",
+    url_prefix: str | None = None,
+    since: datetime.datetime | None = None,
+    persist: bool = False,
+    output: str | None = None,
+) -> Dict[str, List[Dict]]:
+    """Replay the scrapers over the latest archived copy of every page, without fetching anything."""
+    pages = list(iter_archive(url_prefix, since))
+    print(f"Loaded {len(pages)} archived pages from {PAGE_ARCHIVE_DIR}.")
+    results = {}
+    for scraper in scrapers:
+        start_time = time.perf_counter()
+        items = reprocess_manual(pages) if scraper == "manual" else reprocess_ai(pages, model)
+        elapsed = time.perf_counter() - start_time
+        print(f"{scraper}: {len(items)} listings from {len(pages)} pages in {elapsed:.2f}s "
+              f"({len(pages) / elapsed if elapsed else 0:.1f} pages/s)")
+        if persist:
+            for start in range(0, len(items), CRAWL_BATCH_SIZE):
+                upsert_listings(items[start:start + CRAWL_BATCH_SIZE])
+        results[scraper] = items
+
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            for items in results.values():
+                for item in items:
+                    file.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+    return results
+
+if __name__ == "__main__":
+    # Usage: python -m scrapers.reprocess --scraper manual --output listings.jsonl
+    parser = argparse.ArgumentParser(description="Replay the scrapers over the page archive.")
+    parser.add_argument("--scraper", choices=["manual", "ai", "both"], default="both")
+    parser.add_argument("--model", default="mock", help="AI model for pages without cached or heuristic selectors (default: mock, stays offline)")
+    parser.add_argument("--url-prefix", help="Only replay pages whose URL starts with this prefix")
+    parser.add_argument("--since", type=datetime.datetime.fromisoformat, help="Only replay pages fetched since (ISO date)")
+    parser.add_argument("--persist", action="store_true", help="Upsert the results into the listings table")
+    parser.add_argument("--output", help="Write the results to a JSON lines file")
+    args = parser.parse_args()
+
+    sync_schema()
+    try:
+        reprocess(
+            ["manual", "ai"] if args.scraper == "both" else [args.scraper],
+            args.model,
+            args.url_prefix,
+            args.since,
+            args.persist,
+            args.output,
+        )
+    finally:
+        shutdown_parse_pool()
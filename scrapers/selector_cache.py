@@ -0,0 +1,153 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+from typing import Dict
+
+from db.database import SessionLocal, WriteSessionLocal
+from db.models import SelectorCache
+
+# Cache settings (override through .env)
+SELECTOR_CACHE_TTL = datetime.timedelta(seconds=int(os.getenv("SELECTOR_CACHE_TTL", 7 * 24 * 3600)))
+SELECTOR_CACHE_MAX_ENTRIES = int(os.getenv("SELECTOR_CACHE_MAX_ENTRIES", 500))
+FINGERPRINT_DEPTH = 4
+
+# Fields that cached selectors must still produce to be considered valid
+REQUIRED_FIELDS = ["title", "rent", "address"]
+# Fields that must hold exactly one number, e.g. not a heading like "2 pokoje 48 m²"
+NUMERIC_FIELDS = ["rent", "area"]
+NUMBER = re.compile(r"\d[\d\s]*(?:[.,]\d+)?")
+
+# Counters for cache effectiveness
+cache_hits = 0
+cache_misses = 0
+cache_invalidations = 0
+
+def page_fingerprint(element, max_depth: int = FINGERPRINT_DEPTH) -> str:
+    """Hash the tag/class skeleton of an element, ignoring text and repeated siblings."""
+    signatures = []
+    seen = set()
+
+    def walk(node, depth: int):
+        for child in node.find_all(True, recursive=False):
+            signature = f"{depth}:{child.name}.{'.'.join(sorted(child.get('class', [])))}"
+            if signature not in seen:
+                seen.add(signature)
+                signatures.append(signature)
+            if depth < max_depth:
+                walk(child, depth + 1)
+
+    walk(element, 0)
+    return hashlib.sha1("|".join(signatures).encode("utf-8")).hexdigest()
+
+def selectors_are_valid(extracted: Dict[str, str]) -> bool:
+    """Check that selectors produced every required field, and a single number for the numeric ones they found."""
+    if any(extracted.get(field) in (None, "", "Not Available") for field in REQUIRED_FIELDS):
+        return False
+    return all(
+        len(NUMBER.findall(extracted[field])) == 1
+        for field in NUMERIC_FIELDS if extracted.get(field) not in (None, "", "Not Available")
+    )
+
+def get_cached_selectors(domain: str, fingerprint: str) -> Dict[str, str] | None:
+    """Return cached selectors for a page template, or None on a miss or expired entry."""
+    global cache_hits, cache_misses
+    db = WriteSessionLocal()
+    try:
+        entry = db.query(SelectorCache).filter(
+            SelectorCache.domain == domain,
+            SelectorCache.fingerprint == fingerprint,
+        ).first()
+        now = datetime.datetime.now()
+        if entry and now - entry.created_at > SELECTOR_CACHE_TTL:
+            db.delete(entry)
+            db.commit()
+            entry = None
+        if not entry:
+            cache_misses += 1
+            return None
+        entry.hits = (entry.hits or 0) + 1
+        entry.last_used_at = now
+        db.commit()
+        cache_hits += 1
+        return json.loads(entry.selectors)
+    except Exception as e:
+        print(f"Selector cache lookup failed for {domain}: {e}")
+        db.rollback()
+        cache_misses += 1
+        return None
+    finally:
+        db.close()
+
+def store_selectors(domain: str, fingerprint: str, selectors: Dict[str, str], model: str | None = None):
+    """Store selectors for a page template and evict the least recently used entries over the limit."""
+    db = WriteSessionLocal()
+    try:
+        now = datetime.datetime.now()
+        entry = db.query(SelectorCache).filter(
+            SelectorCache.domain == domain,
+            SelectorCache.fingerprint == fingerprint,
+        ).first()
+        if entry:
+            entry.selectors = json.dumps(selectors)
+            entry.model = model
+            entry.created_at = now
+            entry.last_used_at = now
+        else:
+            db.add(SelectorCache(
+                domain=domain,
+                fingerprint=fingerprint,
+                selectors=json.dumps(selectors),
+                model=model,
+                hits=0,
+                created_at=now,
+                last_used_at=now,
+            ))
+        db.flush()
+
+        overflow = db.query(SelectorCache).count() - SELECTOR_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            stale_ids = [row.id for row in db.query(SelectorCache.id).order_by(SelectorCache.last_used_at).limit(overflow)]
+            db.query(SelectorCache).filter(SelectorCache.id.in_(stale_ids)).delete(synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        print(f"Failed to store selectors for {domain}: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def invalidate_selectors(domain: str, fingerprint: str):
+    """Drop cached selectors that stopped producing the required fields."""
+    global cache_invalidations
+    db = SessionLocal()
+    try:
+        db.query(SelectorCache).filter(
+            SelectorCache.domain == domain,
+            SelectorCache.fingerprint == fingerprint,
+        ).delete(synchronize_session=False)
+        db.commit()
+        cache_invalidations += 1
+    except Exception as e:
+        print(f"Failed to invalidate selectors for {domain}: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def get_selector_cache_stats() -> Dict[str, int | float]:
+    """Return hit/miss counters and the number of cached templates."""
+    db = SessionLocal()
+    try:
+        entries = db.query(SelectorCache).count()
+    except Exception:
+        entries = 0
+    finally:
+        db.close()
+    lookups = cache_hits + cache_misses
+    return {
+        "hits": cache_hits,
+        "misses": cache_misses,
+        "invalidations": cache_invalidations,
+        "hit_rate": cache_hits / lookups if lookups else 0,
+        "entries": entries,
+    }
@@ -0,0 +1,298 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from bs4 import BeautifulSoup, Tag
+
+from db.database import SessionLocal
+from db.models import SelectorCache
+
+# Heuristic selector settings (override through .env)
+HEURISTIC_SELECTORS = os.getenv("HEURISTIC_SELECTORS", "1") == "1"
+HEURISTIC_MIN_CONFIDENCE = float(os.getenv("HEURISTIC_MIN_CONFIDENCE", 0.7))
+
+FIELDS = ["title", "rent", "area", "address"]
+# Confidence is the lowest score among these fields; area is scored only when the page mentions one
+CONFIDENCE_FIELDS = ["title", "rent", "address"]
+
+# Score parts of a candidate element
+PATTERN_SCORE = 0.5  # Its text looks like the field
+NAME_SCORE = 0.2  # Its class/id, or its parent's, names the field
+UNIQUE_SCORE = 0.2  # It is not part of a repeated block, such as a list of similar listings
+FIRST_SCORE = 0.1  # It is the first match on the page
+LEARNED_SCORE = 0.3  # Its selector was validated on an earlier page of the domain
+ANCESTOR_DEPTH = 3
+
+FIELD_PATTERNS = {
+    "rent": re.compile(r"\d[\d\s.,]*\s?(?:zł|pln)", re.IGNORECASE),
+    "area": re.compile(r"\d[\d\s.,]*\s?(?:m²|m2)\b", re.IGNORECASE),
+    "address": re.compile(r"(?:^|\s)(?:ul\.|ulica|al\.|aleja|os\.|osiedle|pl\.|plac)\s*\w", re.IGNORECASE),
+}
+NAME_PATTERNS = {
+    "title": re.compile(r"title|tytul|heading", re.IGNORECASE),
+    "rent": re.compile(r"price|rent|cena|czynsz", re.IGNORECASE),
+    "area": re.compile(r"area|surface|powierzchnia", re.IGNORECASE),
+    "address": re.compile(r"address|adres|location|lokalizacja|street", re.IGNORECASE),
+}
+IDENTIFIER = re.compile(r"^-?[A-Za-z_][\w-]*$")
+SKIP_TAGS = {"script", "style", "noscript", "template"}
+MAX_ADDRESS_LENGTH = 120
+MAX_VALUE_LENGTH = 40  # Rent and area elements hold little more than the value itself
+# Headings and the page <title> repeat the area or address, but only ever hold the title
+TITLE_TAGS = {"title", "h1"}
+
+# Selectors validated by the AI path: domain -> field -> selector -> times validated
+learned_selectors: Dict[str, Dict[str, Dict[str, int]]] = {}
+learned_selectors_lock = threading.Lock()
+
+# Counters for how often the heuristic replaced a model call
+heuristic_hits = 0
+heuristic_misses = 0
+
+def _names(element: Tag) -> str:
+    return " ".join([element.get("id") or ""] + list(element.get("class") or []))
+
+def _has_name(element: Tag, field: str) -> bool:
+    """Return True if the element or one of its close ancestors names the field in its class or id."""
+    pattern = NAME_PATTERNS[field]
+    node = element
+    for _ in range(ANCESTOR_DEPTH):
+        if node is None or isinstance(node, BeautifulSoup):
+            return False
+        if pattern.search(_names(node)):
+            return True
+        node = node.parent
+    return False
+
+def _is_repeated(element: Tag, field: str) -> bool:
+    """Return True if the element or a close ancestor has a sibling with the same tag and classes holding the field too.
+
+    Such siblings form a list of similar blocks, like other listings, rather than rows of one listing's details.
+    Elements with an id end the search, and classless elements are not compared, since generic
+    wrappers like plain <div>s repeat on every page.
+    """
+    pattern = FIELD_PATTERNS.get(field)
+    node = element
+    for _ in range(ANCESTOR_DEPTH):
+        if node.parent is None or isinstance(node.parent, BeautifulSoup) or node.get("id"):
+            return False
+        classes = node.get("class")
+        if classes and sum(
+            1 for sibling in node.parent.find_all(node.name, recursive=False)
+            if sibling.get("class") == classes and (pattern is None or pattern.search(sibling.get_text(" ", strip=True)))
+        ) > 1:
+            return True
+        node = node.parent
+    return False
+
+def _text_matches(field: str, text: str) -> bool:
+    if not text:
+        return False
+    if field == "title":
+        return True
+    if field == "address":
+        return len(text) <= MAX_ADDRESS_LENGTH
+    return len(text) <= MAX_VALUE_LENGTH and bool(FIELD_PATTERNS[field].search(text))
+
+def _score(element: Tag, field: str, first: bool) -> float:
+    if (element.name in TITLE_TAGS) != (field == "title"):
+        return 0.0
+    text = element.get_text(strip=True)
+    if not _text_matches(field, text):
+        return 0.0
+    if field == "title":
+        score = 0.7 if element.name == "h1" else 0.6 if element.name == "title" else 0.0
+    elif field == "address":
+        score = PATTERN_SCORE if FIELD_PATTERNS["address"].search(element.get_text(" ", strip=True)) else 0.0
+    else:
+        score = PATTERN_SCORE
+    if element.name != "title" and _has_name(element, field):
+        score += NAME_SCORE
+    if score and not _is_repeated(element, field):
+        score += UNIQUE_SCORE
+    if score and first:
+        score += FIRST_SCORE
+    return min(score, 1.0)
+
+def _simple_selector(element: Tag) -> str:
+    element_id = element.get("id")
+    if element_id and IDENTIFIER.match(element_id):
+        return f"#{element_id}"
+    classes = [name for name in element.get("class") or [] if IDENTIFIER.match(name)]
+    return element.name + "".join(f".{name}" for name in classes)
+
+def _positional_selector(element: Tag) -> str:
+    """Build a child-combinator path from the nearest ancestor with an id, with :nth-of-type where needed."""
+    parts = []
+    node = element
+    while node is not None and not isinstance(node, BeautifulSoup):
+        part = _simple_selector(node)
+        if part.startswith("#"):
+            parts.append(part)
+            break
+        if node.parent is not None and len(node.parent.find_all(node.name, recursive=False)) > 1:
+            part += f":nth-of-type({len(node.find_previous_siblings(node.name)) + 1})"
+        parts.append(part)
+        node = node.parent
+    return " > ".join(reversed(parts))
+
+def selector_for(soup: BeautifulSoup, element: Tag) -> str | None:
+    """Build a CSS selector whose first match on the page is the element."""
+    selector = _simple_selector(element)
+    node = element
+    candidates = [selector]
+    for _ in range(ANCESTOR_DEPTH):
+        node = node.parent
+        if node is None or isinstance(node, BeautifulSoup):
+            break
+        selector = f"{_simple_selector(node)} > {selector}"
+        candidates.append(selector)
+    candidates.append(_positional_selector(element))
+    for selector in candidates:
+        try:
+            if soup.select_one(selector) is element:
+                return selector
+        except Exception:
+            continue
+    return None
+
+def _candidates(soup: BeautifulSoup, field: str) -> List[Tag]:
+    if field == "title":
+        return soup.find_all("h1") + soup.find_all("title", limit=1)
+    if field == "address":
+        elements = [string.parent for string in soup.find_all(string=FIELD_PATTERNS["address"])]
+        elements += soup.find_all(lambda tag: not tag.find(True) and NAME_PATTERNS["address"].search(_names(tag)))
+    else:
+        elements = [string.parent for string in soup.find_all(string=FIELD_PATTERNS[field])]
+    seen = set()
+    return [
+        element for element in elements
+        if element.name not in SKIP_TAGS and element.name not in TITLE_TAGS
+        and not (id(element) in seen or seen.add(id(element)))
+    ]
+
+def _domain_selectors(domain: str) -> Dict[str, Dict[str, int]]:
+    """Return the selectors learned for a domain, seeding them from the selector cache on first use."""
+    with learned_selectors_lock:
+        if domain in learned_selectors:
+            return learned_selectors[domain]
+    learned: Dict[str, Dict[str, int]] = {field: {} for field in FIELDS}
+    db = SessionLocal()
+    try:
+        for entry in db.query(SelectorCache).filter(SelectorCache.domain == domain):
+            for field, selector in json.loads(entry.selectors).items():
+                if field in learned and selector:
+                    learned[field][selector] = learned[field].get(selector, 0) + 1
+    except Exception as e:
+        print(f"Failed to load learned selectors for {domain}: {e}")
+    finally:
+        db.close()
+    with learned_selectors_lock:
+        return learned_selectors.setdefault(domain, learned)
+
+def learn_selectors(domain: str, selectors: Dict[str, str]):
+    """Remember selectors the AI path validated, to rank them first on later pages of the domain."""
+    learned = _domain_selectors(domain)
+    with learned_selectors_lock:
+        for field in FIELDS:
+            selector = selectors.get(field)
+            if selector:
+                learned[field][selector] = learned[field].get(selector, 0) + 1
+
+def infer_selectors(soup: BeautifulSoup, domain: str) -> Tuple[Dict[str, str], float]:
+    """Rank candidate selectors for each field without a model call.
+
+    Candidates are elements whose text looks like the field and selectors learned on the domain.
+    Returns the best selector per field and a confidence between 0 and 1.
+    """
+    learned = _domain_selectors(domain)
+    selectors: Dict[str, str] = {}
+    scores: Dict[str, float] = {}
+    for field in FIELDS:
+        best_selector, best_score = "", 0.0
+        with learned_selectors_lock:
+            known = sorted(learned[field].items(), key=lambda item: -item[1])
+        for selector, _ in known:
+            try:
+                element = soup.select_one(selector)
+            except Exception:
+                continue
+            score = _score(element, field, first=True) if element is not None else 0.0
+            if score:
+                score = min(score + LEARNED_SCORE, 1.0)
+                if score > best_score:
+                    best_selector, best_score = selector, score
+        if best_score < 1.0:
+            for position, element in enumerate(_candidates(soup, field)):
+                score = _score(element, field, first=position == 0)
+                if score > best_score:
+                    selector = selector_for(soup, element)
+                    if selector:
+                        best_selector, best_score = selector, score
+        selectors[field] = best_selector
+        if field in CONFIDENCE_FIELDS or best_selector:
+            scores[field] = best_score
+    return selectors, min(scores.values()) if scores else 0.0
+
+def record_inference(used: bool):
+    """Count a page whose selectors the heuristic supplied, or one it left to the model."""
+    global heuristic_hits, heuristic_misses
+    if used:
+        heuristic_hits += 1
+    else:
+        heuristic_misses += 1
+
+def get_selector_inference_stats() -> Dict[str, int | float]:
+    """Return how often heuristic selectors were used instead of a model call."""
+    attempts = heuristic_hits + heuristic_misses
+    return {
+        "heuristic_hits": heuristic_hits,
+        "model_fallbacks": heuristic_misses,
+        "hit_rate": heuristic_hits / attempts if attempts else 0,
+        "learned_domains": len(learned_selectors),
+    }
+
+def benchmark(
+    paths: List[str], extract: Callable[[BeautifulSoup, Dict[str, str]], Dict[str, str]] | None = None
+) -> Dict[str, float]:
+    """Report how often heuristic selectors would be used on saved pages, and how often they match the manual parser."""
+    from scrapers.ai_scraper import clean_area, clean_rent, extract_with_selectors
+    from scrapers.selector_cache import selectors_are_valid
+    from scrapers.wolf import parse_listing
+
+    extract = extract or extract_with_selectors
+    learned_selectors["benchmark"] = {field: {} for field in FIELDS}  # Start cold, without the database
+    measured = accepted = correct = 0
+    elapsed = 0.0
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            page = file.read()
+        soup = BeautifulSoup(page, "html.parser")
+        start_time = time.perf_counter()
+        selectors, confidence = infer_selectors(soup, "benchmark")
+        elapsed += time.perf_counter() - start_time
+        truth = parse_listing(page, path)
+        if truth is None:
+            print(f"{path}: no manual parse to compare with")
+            continue
+        measured += 1
+        extracted = extract(soup, selectors)
+        if confidence < HEURISTIC_MIN_CONFIDENCE or not selectors_are_valid(extracted):
+            print(f"{path}: confidence {confidence:.2f}, left to the model {selectors}")
+            continue
+        accepted += 1
+        matches = clean_rent(extracted["rent"]) == truth.get("rent") and clean_area(extracted["area"]) == truth.get("area")
+        correct += matches
+        print(f"{path}: confidence {confidence:.2f}, {'ok' if matches else 'differs'} {selectors}")
+    ms_per_page = elapsed / max(len(paths), 1) * 1000
+    print(f"{ms_per_page:.2f} ms/page selector time, heuristic used on {accepted} of {measured} pages with a manual parse, "
+          f"{correct} of those match it.")
+    return {"pages": measured, "ms_per_page": ms_per_page, "accepted": accepted, "correct": correct}
+
+if __name__ == "__main__":
+    # Usage: python -m scrapers.selector_inference saved_pages/*.html
+    benchmark(sys.argv[1:])
@@ -0,0 +1,110 @@
+import itertools
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict
+
+# Telemetry settings (override through .env)
+TELEMETRY_MODE = os.getenv("TELEMETRY_MODE", "rss")  # "off", "rss" or "tracemalloc"
+TELEMETRY_SAMPLE_EVERY = int(os.getenv("TELEMETRY_SAMPLE_EVERY", 10))  # Listings per tracemalloc sample
+
+# Per-listing phases, stored as <phase>_time
+PHASES = ["fetch", "parse", "llm", "persist"]
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+sample_counter = itertools.count()
+tracing_lock = threading.Lock()
+tracing = False
+
+def current_rss() -> int | None:
+    """Return the resident set size of this process in bytes, or None where it cannot be read cheaply."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _start_tracing() -> bool:
+    """Start tracemalloc for one sampled listing, unless another listing is being traced."""
+    global tracing
+    if next(sample_counter) % max(TELEMETRY_SAMPLE_EVERY, 1):
+        return False
+    with tracing_lock:
+        if tracing or tracemalloc.is_tracing():
+            return False
+        tracing = True
+    tracemalloc.start()
+    return True
+
+def _stop_tracing() -> int:
+    global tracing
+    try:
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        with tracing_lock:
+            tracing = False
+
+class Measurement:
+    """Phase timings and memory usage of one listing (or batch of listings).
+
+    Memory is measured according to TELEMETRY_MODE: not at all, as the growth of the process RSS,
+    or as the tracemalloc peak of one listing in TELEMETRY_SAMPLE_EVERY. Unmeasured memory is None.
+    """
+
+    def __init__(self, mode: str = TELEMETRY_MODE):
+        self.phase_times: Dict[str, float] = {}
+        self.outside_time = 0.0
+        self.mode = mode
+        self.start_rss = current_rss() if mode == "rss" else None
+        self.traced = mode == "tracemalloc" and _start_tracing()
+        self.memory_usage: float | None = None
+        self.start_time = time.perf_counter()
+        self.finished = False
+
+    def _record(self, phase: str, seconds: float):
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + seconds
+
+    def add(self, phase: str, seconds: float):
+        """Add time spent in a phase before this measurement started, such as the fetch."""
+        self._record(phase, seconds)
+        self.outside_time += seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as part of a phase."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - start_time)
+
+    def finish(self, remainder: str | None = None) -> Dict[str, float | None]:
+        """Stop measuring and return elapsed_time, memory_usage (MB) and the <phase>_time of every phase.
+
+        Time not spent in any phase is added to the `remainder` phase, if given.
+        """
+        if not self.finished:
+            self.finished = True
+            self.elapsed_time = time.perf_counter() - self.start_time + self.outside_time
+            if remainder:
+                self._record(remainder, max(self.elapsed_time - sum(self.phase_times.values()), 0.0))
+            if self.traced:
+                self.memory_usage = _stop_tracing() / 1024 / 1024
+            elif self.start_rss is not None:
+                end_rss = current_rss()
+                self.memory_usage = max(end_rss - self.start_rss, 0) / 1024 / 1024 if end_rss is not None else None
+        return {
+            "elapsed_time": self.elapsed_time,
+            "memory_usage": self.memory_usage,
+            **{f"{phase}_time": self.phase_times.get(phase) for phase in PHASES},
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.finish()
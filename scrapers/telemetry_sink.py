@@ -0,0 +1,117 @@
+import atexit
+import csv
+import datetime
+import os
+import queue
+import threading
+import time
+from typing import Dict, List
+
+try:
+    import pyarrow
+    import pyarrow.feather
+    import pyarrow.parquet
+except ImportError:  # pyarrow is optional, CSV output is always available
+    pyarrow = None
+
+# Telemetry file settings (override through .env)
+TELEMETRY_FILE = os.getenv("TELEMETRY_FILE", "scraper_telemetry.csv")
+TELEMETRY_FORMAT = os.getenv("TELEMETRY_FORMAT", "csv")  # "csv", "parquet" or "arrow"
+TELEMETRY_FLUSH_SIZE = int(os.getenv("TELEMETRY_FLUSH_SIZE", 500))
+TELEMETRY_FLUSH_INTERVAL = float(os.getenv("TELEMETRY_FLUSH_INTERVAL", 2.0))
+TELEMETRY_ROTATE_BYTES = int(os.getenv("TELEMETRY_ROTATE_BYTES", 50 * 1024 * 1024))  # 0 disables rotation
+
+# One schema for both scrapers; values a scraper does not measure are left empty.
+# Rows are recorded when a listing is parsed, so the persist phase is only in the database.
+TELEMETRY_COLUMNS = [
+    "recorded_at", "url", "scraper_type", "model", "elapsed_time", "selector_time", "memory_usage",
+    "fetch_time", "parse_time", "llm_time",
+]
+TEXT_COLUMNS = {"recorded_at", "url", "scraper_type", "model"}
+
+row_queue: "queue.Queue[Dict]" = queue.Queue()
+sink_thread: threading.Thread | None = None
+sink_lock = threading.Lock()
+part_counter = 0
+
+def _ensure_sink():
+    global sink_thread
+    with sink_lock:
+        if sink_thread is None or not sink_thread.is_alive():
+            sink_thread = threading.Thread(target=_sink_loop, name="telemetry-sink", daemon=True)
+            sink_thread.start()
+
+def record_telemetry(item: Dict):
+    """Queue the telemetry of one scraped listing; it is written to disk in the background."""
+    _ensure_sink()
+    row_queue.put({
+        **{column: item.get(column) for column in TELEMETRY_COLUMNS},
+        "recorded_at": datetime.datetime.now().isoformat(timespec="milliseconds"),
+    })
+
+def flush_telemetry():
+    """Block until every queued telemetry row has been written."""
+    if sink_thread is not None:
+        row_queue.join()
+
+def _rotate(path: str):
+    if TELEMETRY_ROTATE_BYTES and os.path.exists(path) and os.path.getsize(path) >= TELEMETRY_ROTATE_BYTES:
+        stem, extension = os.path.splitext(path)
+        os.replace(path, f"{stem}.{datetime.datetime.now():%Y%m%d-%H%M%S-%f}{extension}")
+
+def _write_csv(rows: List[Dict]):
+    _rotate(TELEMETRY_FILE)
+    with open(TELEMETRY_FILE, mode="a", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=TELEMETRY_COLUMNS)
+        if file.tell() == 0:
+            writer.writeheader()
+        writer.writerows(rows)
+
+def _write_columnar(rows: List[Dict]):
+    """Write a batch as its own Parquet or Arrow IPC part file, in a directory named after TELEMETRY_FILE."""
+    global part_counter
+    directory = os.path.splitext(TELEMETRY_FILE)[0]
+    os.makedirs(directory, exist_ok=True)
+    # A fixed schema keeps the parts readable as one dataset, even when a batch lacks a value
+    schema = pyarrow.schema([
+        (column, pyarrow.string() if column in TEXT_COLUMNS else pyarrow.float64()) for column in TELEMETRY_COLUMNS
+    ])
+    table = pyarrow.Table.from_pylist(rows, schema=schema)
+    part_counter += 1
+    name = f"part-{datetime.datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}-{part_counter:06d}"
+    if TELEMETRY_FORMAT == "parquet":
+        pyarrow.parquet.write_table(table, os.path.join(directory, f"{name}.parquet"))
+    else:
+        pyarrow.feather.write_feather(table, os.path.join(directory, f"{name}.arrow"))
+
+def _write_rows(rows: List[Dict]):
+    if TELEMETRY_FORMAT in ("parquet", "arrow") and pyarrow is not None:
+        _write_columnar(rows)
+    else:
+        _write_csv(rows)
+
+def _sink_loop():
+    while True:
+        rows = [row_queue.get()]
+        deadline = time.monotonic() + TELEMETRY_FLUSH_INTERVAL
+        while len(rows) < TELEMETRY_FLUSH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                rows.append(row_queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        try:
+            _write_rows(rows)
+        except Exception as e:
+            print(f"Failed to write {len(rows)} telemetry rows: {e}")
+        finally:
+            for _ in rows:
+                row_queue.task_done()
+
+if TELEMETRY_FORMAT in ("parquet", "arrow") and pyarrow is None:
+    print(f"pyarrow is not installed, writing {TELEMETRY_FORMAT} telemetry as CSV to {TELEMETRY_FILE}.")
+
+# Write whatever is still buffered when the process exits
+atexit.register(flush_telemetry)
@@ -1,144 +1,157 @@
-import requests
+import asyncio
+import httpx
 from bs4 import BeautifulSoup
 import json
-from typing import List, Dict
-import time
-import tracemalloc
-import csv
-
-from backend.listing_service import send_to_api
+from typing import Callable, List, Dict
+from urllib.parse import urljoin
+
+from backend.listing_service import send_batch_to_api
+from scrapers.fetcher import AsyncFetcher
+from scrapers.frontier import CRAWL_MAX_PAGES, CrawlFrontier, crawl
+from scrapers.nuxt_data import find_listing_index, listing_details, unflatten
+from scrapers.pipeline import run_parse
+from scrapers.telemetry import Measurement
+from scrapers.telemetry_sink import record_telemetry
+from scrapers.wolf_parser import WOLF_PARSER, extract_fields, extract_nuxt_data, extract_title
 
 # Global counter for processed listings
 manual_processed_count = 0
 
-# Default CSV file path
-DEFAULT_CSV_FILE = "manual_telemetry.csv"
-csv_headers = ["url", "elapsed_time", "memory_usage", "scraper_type"]
+# Listing fields read from the page DOM when the Nuxt payload lacks them
+DOM_FIELDS = ["title", "rent", "area", "address"]
+
+def extract_listing_links(soup: BeautifulSoup, listings_page: str) -> List[str]:
+    """Extract absolute listing URLs from a listings page."""
+    links = [a["href"] for a in soup.select(".listing__teaserWrapper a.teaserLinkSeo") if a.get("href")]
+    return [urljoin(listings_page, link) for link in links]
+
+def parse_listing(html: str, full_url: str, parser: str = WOLF_PARSER) -> Dict[str, str | int | float | None] | None:
+    """Parse a single listing page into its fields, or return None if it has no property data.
+
+    Fields come from the decoded #__NUXT_DATA__ payload; the page DOM is only parsed for fields it lacks,
+    including an address without district and street.
+    """
+    fields = None
+    nuxt_data_text = extract_nuxt_data(html)
+    if nuxt_data_text is None:
+        fields = extract_fields(html, parser)
+        nuxt_data_text = fields["nuxt_data"]
+
+    # Parse JSON data
+    if nuxt_data_text is None:
+        print(f"Error: Could not find JSON data on {full_url}")
+        return None
+    nuxt_data = json.loads(nuxt_data_text)
 
-def save_to_csv(data: Dict, csv_file: str = DEFAULT_CSV_FILE):
-    """Save telemetry data to a CSV file."""
-    try:
-        with open(csv_file, mode='a', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=csv_headers)
-            if file.tell() == 0:  # Write headers only if file is new
-                writer.writeheader()
-            writer.writerow(data)
-        print(f"Successfully wrote telemetry to {csv_file}: {data}")
-    except Exception as e:
-        print(f"Error writing to {csv_file}: {e}")
-
-def scrape_wolf(listings_page: str) -> List[Dict[str, str | int | float | None]]:
+    # Extract property details from JSON
+    property_index = find_listing_index(nuxt_data)
+    if property_index is None:
+        print(f"Error: Property data not found in JSON on {full_url}")
+        return None
+    details = listing_details(unflatten(nuxt_data, property_index))
+
+    item = {
+        "title": extract_title(html),
+        "rent": details["rent"],
+        "area": details["area"],
+        "address": details["address"],
+        "url": full_url,
+        "rooms": details["rooms"],
+        "latitude": details["latitude"],
+        "longitude": details["longitude"],
+    }
+
+    # Fall back to the DOM for fields the payload does not carry
+    if any(item[key] is None for key in DOM_FIELDS):
+        fields = fields or extract_fields(html, parser)
+        dom_values = {"title": fields["title"], "rent": clean_rent(fields["rent"] or "Not Available"), "address": fields["address"] or None}
+        if fields["area"] and "m²" in fields["area"]:
+            dom_values["area"] = clean_area(fields["area"].replace("\xa0", "").replace(" ", ""))
+        for key in DOM_FIELDS:
+            if item[key] is None:
+                item[key] = dom_values.get(key)
+    # A payload address naming only the city is kept when the DOM has no address either
+    if item["address"] is None:
+        item["address"] = details["partial_address"]
+    return item
+
+def measure_parse_listing(
+    content: bytes, encoding: str | None, full_url: str, fetch_time: float = 0.0
+) -> Dict[str, str | int | float | None] | None:
+    """Decode and parse a listing page, adding its telemetry; runs in a parse worker."""
+    with Measurement() as measurement:
+        measurement.add("fetch", fetch_time)
+        with measurement.phase("parse"):
+            item = parse_listing(content.decode(encoding or "utf-8", errors="replace"), full_url)
+    if item is None:
+        return None
+
+    item.update(measurement.finish())
+    item["scraper_type"] = "manual"
+    return item
+
+async def scrape_wolf_async(
+    listings_page: str,
+    fetcher: AsyncFetcher | None = None,
+    should_stop: Callable[[], bool] | None = None,
+    max_pages: int = CRAWL_MAX_PAGES,
+    on_item: Callable[[Dict], None] | None = None,
+    persist: Callable[[List[Dict]], None] = send_batch_to_api,
+    revisit: bool = False,
+) -> List[Dict[str, str | int | float | None]]:
+    """Crawl the listings page and its pagination, scraping every listing not yet stored.
+
+    With `revisit`, stored listings are fetched again (conditionally) and re-scraped if they changed.
+    """
+    if fetcher is None:
+        async with AsyncFetcher() as fetcher:
+            return await scrape_wolf_async(listings_page, fetcher, should_stop, max_pages, on_item, persist, revisit)
+
+    async def process_listing(full_url: str, listing_response: httpx.Response) -> Dict[str, str | int | float | None] | None:
+        global manual_processed_count
+        fetch_time = listing_response.elapsed.total_seconds()
+        item = await run_parse(
+            measure_parse_listing, listing_response.content, listing_response.encoding, full_url, fetch_time
+        )
+        if item is None:
+            return None
+
+        record_telemetry(item)
+
+        # Increment processed count
+        manual_processed_count += 1
+        return item
+
+    frontier = CrawlFrontier(listings_page, "manual", revisit_known=revisit)
+    return await crawl(
+        frontier,
+        fetcher,
+        extract_listing_links,
+        process_listing,
+        should_stop=should_stop,
+        max_pages=max_pages,
+        on_item=on_item,
+        persist=persist,
+    )
+
+def scrape_wolf(
+    listings_page: str,
+    should_stop: Callable[[], bool] | None = None,
+    max_pages: int = CRAWL_MAX_PAGES,
+    on_item: Callable[[Dict], None] | None = None,
+    persist: Callable[[List[Dict]], None] = send_batch_to_api,
+    revisit: bool = False,
+) -> List[Dict[str, str | int | float | None]]:
     """Scrape property listings from a specific website using the provided listings page URL."""
-    global manual_processed_count
-    try:
-        # Fetch the main listings page
-        response = requests.get(listings_page, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        # Extract listing links
-        links = [a["href"] for a in soup.select(".listing__teaserWrapper a.teaserLinkSeo") if a.get("href")]
-        listings = []
-
-        for link in links:
-            full_url = link if link.startswith("http") else f"https://{link.lstrip('/')}"
-            try:
-                # Start timing and memory tracking
-                start_time = time.time()
-                tracemalloc.start()
-
-                # Fetch individual listing page
-                listing_response = requests.get(full_url, timeout=10)
-                listing_response.raise_for_status()
-                listing_soup = BeautifulSoup(listing_response.text, "html.parser")
-
-                # Parse JSON data
-                nuxt_data_script = listing_soup.select_one("#__NUXT_DATA__")
-                if not nuxt_data_script:
-                    print(f"Error: Could not find JSON data on {full_url}")
-                    continue
-                nuxt_data = json.loads(nuxt_data_script.text)
-
-                # Extract property details from JSON
-                property_dict = next((x for x in nuxt_data if isinstance(x, dict) and x.get("adKeywords")), None)
-                if not property_dict:
-                    print(f"Error: Property data not found in JSON on {full_url}")
-                    continue
-
-                # Extract details
-                title_tag = listing_soup.select_one("title")
-                title = title_tag.text.strip() if title_tag else None
-
-                # Rent extraction
-                rent_text = listing_soup.find("span", string=lambda text: "zł" in text if text else False)
-                rent = int(float("".join(filter(str.isdigit, rent_text.text)))) if rent_text else None
-
-                # Address extraction
-                address_tag = listing_soup.select_one(".location-row__second_column")
-                address = address_tag.text.strip() if address_tag else None
-
-                # Area extraction
-                area = None
-                area_tag = listing_soup.select_one("#basic-info-price-row + div span")
-                if area_tag and "m²" in area_tag.text:
-                    area = int(float("".join(filter(str.isdigit, area_tag.text))))
-
-                # Clean extracted data
-                rent = clean_rent(str(rent) if rent is not None else "Not Available")
-                area = clean_area(str(area) if area is not None else "Not Available")
-
-                # Stop timing and memory tracking
-                elapsed_time = time.time() - start_time
-                current, peak = tracemalloc.get_traced_memory()
-                tracemalloc.stop()
-
-                # Create listing item
-                item = {
-                    "title": title,
-                    "rent": rent,
-                    "area": area,
-                    "address": address,
-                    "url": full_url,
-                    "elapsed_time": elapsed_time,
-                    "memory_usage": peak / 1024 / 1024,
-                    "scraper_type": "manual",
-                }
-
-                listings.append(item)
-                send_to_api(item)
-
-                # Save to CSV
-                csv_data = {
-                    "url": full_url,
-                    "elapsed_time": elapsed_time,
-                    "memory_usage": peak / 1024 / 1024,
-                    "scraper_type": "manual"
-                }
-                save_to_csv(csv_data)
-
-                # Increment processed count
-                manual_processed_count += 1
-
-            except requests.RequestException as e:
-                print(f"Error fetching {full_url}: {e}")
-                tracemalloc.stop()
-                continue
-            except Exception as e:
-                print(f"Error parsing {full_url}: {e}")
-                tracemalloc.stop()
-                continue
-
-        return listings
-
-    except requests.RequestException as e:
-        print(f"Error fetching listings page {listings_page}: {e}")
-        raise
+    return asyncio.run(scrape_wolf_async(
+        listings_page, should_stop=should_stop, max_pages=max_pages, on_item=on_item, persist=persist, revisit=revisit
+    ))
 
 def clean_rent(rent_value: str) -> int | None:
     """Clean and convert rent value to an integer."""
     if not rent_value or rent_value == "Not Available":
         return None
-    numbers = "".join(c for c in rent_value if c.isdigit())
+    numbers = "".join(c for c in rent_value if c.isdecimal())
     return int(numbers) if numbers else None
 
 def clean_area(area_value: str) -> int | None:
@@ -0,0 +1,122 @@
+import html as html_lib
+import os
+import re
+import sys
+import time
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # lxml is optional, the soup backend is always available
+    lxml = None
+
+# Listing page parser backend (override through .env): "fast" (lxml) or "soup" (BeautifulSoup html.parser)
+WOLF_PARSER = os.getenv("WOLF_PARSER", "fast")
+
+# Raw text of the listing fields, before cleaning
+FIELDS = ["nuxt_data", "title", "rent", "address", "area"]
+
+NUXT_DATA_PATTERN = re.compile(r"<script\b[^>]*\bid=[\"']?__NUXT_DATA__\b[^>]*>(.*?)</script>", re.IGNORECASE | re.DOTALL)
+TITLE_PATTERN = re.compile(r"<title\b[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+def extract_nuxt_data(html: str) -> str | None:
+    """Return the raw #__NUXT_DATA__ JSON of a page without parsing its HTML."""
+    match = NUXT_DATA_PATTERN.search(html)
+    return match.group(1) if match else None
+
+def extract_title(html: str) -> str | None:
+    """Return the text of a page's <title> without parsing its HTML."""
+    match = TITLE_PATTERN.search(html)
+    return html_lib.unescape(match.group(1)).strip() if match else None
+
+def extract_fields_soup(html: str) -> Dict[str, str | None]:
+    """Extract the raw listing fields by building a full BeautifulSoup tree."""
+    soup = BeautifulSoup(html, "html.parser")
+    nuxt_data_script = soup.select_one("#__NUXT_DATA__")
+    title_tag = soup.select_one("title")
+    rent_tag = soup.find("span", string=lambda text: "zł" in text if text else False)
+    address_tag = soup.select_one(".location-row__second_column")
+    area_tag = soup.select_one("#basic-info-price-row + div span")
+    return {
+        "nuxt_data": nuxt_data_script.text if nuxt_data_script else None,
+        "title": title_tag.text.strip() if title_tag else None,
+        "rent": rent_tag.text if rent_tag else None,
+        "address": address_tag.text.strip() if address_tag else None,
+        "area": area_tag.text if area_tag else None,
+    }
+
+def _single_string(element) -> str | None:
+    """Return the text of an element with a single string child, like BeautifulSoup's `Tag.string`."""
+    children = list(element)
+    if not children:
+        return element.text
+    if len(children) == 1 and not element.text and not children[0].tail:
+        child = children[0]
+        if not isinstance(child.tag, str):  # Comments and processing instructions
+            return child.text
+        return _single_string(child)
+    return None
+
+def _first(element, xpath: str):
+    matches = element.xpath(xpath)
+    return matches[0] if matches else None
+
+def extract_fields_fast(html: str) -> Dict[str, str | None]:
+    """Extract the raw listing fields with lxml, querying only the nodes they live in."""
+    root = lxml.html.document_fromstring(html)
+    nuxt_data_script = _first(root, '//*[@id="__NUXT_DATA__"]')
+    title_tag = _first(root, "//title")
+    rent_tag = next((span for span in root.iter("span") if "zł" in (_single_string(span) or "")), None)
+    address_tag = _first(root, '//*[contains(concat(" ", normalize-space(@class), " "), " location-row__second_column ")]')
+    area_tag = _first(root, '//*[@id="basic-info-price-row"]/following-sibling::*[1][self::div]//span')
+    return {
+        "nuxt_data": nuxt_data_script.text_content() if nuxt_data_script is not None else None,
+        "title": title_tag.text_content().strip() if title_tag is not None else None,
+        "rent": rent_tag.text_content() if rent_tag is not None else None,
+        "address": address_tag.text_content().strip() if address_tag is not None else None,
+        "area": area_tag.text_content() if area_tag is not None else None,
+    }
+
+PARSERS: Dict[str, Callable[[str], Dict[str, str | None]]] = {"soup": extract_fields_soup}
+if lxml is not None:
+    PARSERS["fast"] = extract_fields_fast
+
+def extract_fields(html: str, parser: str = WOLF_PARSER) -> Dict[str, str | None]:
+    """Extract the raw listing fields with the chosen backend, falling back to BeautifulSoup."""
+    extract = PARSERS.get(parser, extract_fields_soup)
+    if extract is extract_fields_soup:
+        return extract(html)
+    try:
+        return extract(html)
+    except (etree.ParserError, ValueError) as e:
+        print(f"Fast parser failed, falling back to BeautifulSoup: {e}")
+        return extract_fields_soup(html)
+
+def check_parity(paths: List[str]) -> bool:
+    """Extract the raw fields of saved listing pages with every backend and report fields that differ."""
+    timings = dict.fromkeys(PARSERS, 0.0)
+    mismatches = 0
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            html = file.read()
+        fields = {}
+        for parser, extract in PARSERS.items():
+            start_time = time.perf_counter()
+            fields[parser] = extract(html)
+            timings[parser] += time.perf_counter() - start_time
+        differing = [field for field in FIELDS if len({repr(values[field]) for values in fields.values()}) > 1]
+        if differing:
+            mismatches += 1
+            for field in differing:
+                print(f"Mismatch on {path} in {field}: " + ", ".join(f"{parser}={values[field]!r}" for parser, values in fields.items()))
+    for parser, elapsed in timings.items():
+        print(f"{parser}: {elapsed:.3f}s for {len(paths)} pages")
+    print(f"{mismatches} of {len(paths)} pages differ between backends.")
+    return mismatches == 0
+
+if __name__ == "__main__":
+    # Usage: python -m scrapers.wolf_parser saved_pages/*.html
+    sys.exit(0 if check_parity(sys.argv[1:]) else 1)
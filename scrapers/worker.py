@@ -0,0 +1,195 @@
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import uuid
+from typing import Callable, Dict, List
+
+import httpx
+from bs4 import BeautifulSoup
+
+from db.crawl_jobs import (
+    INDEX, LISTINGS, active_jobs, complete_job, count_jobs, enqueue_crawl, enqueue_jobs, fail_job, heartbeat, lease_job, release_job,
+)
+from db.database import SessionLocal, sync_schema
+from db.models import Listing
+from db.repository import upsert_listings
+from scrapers import ai_scraper, wolf
+from scrapers.fetcher import AsyncFetcher, page_validators
+from scrapers.frontier import CRAWL_MAX_PAGES, find_next_page
+from scrapers.page_archive import PAGE_ARCHIVE, archive_pages
+from scrapers.pipeline import run_parse, shutdown_parse_pool
+from scrapers.telemetry_sink import flush_telemetry, record_telemetry
+
+# Worker settings (override through .env)
+WORKER_BATCH_SIZE = int(os.getenv("WORKER_BATCH_SIZE", 20))  # Listing URLs per job
+WORKER_LEASE_SECONDS = float(os.getenv("WORKER_LEASE_SECONDS", 120))
+WORKER_HEARTBEAT_INTERVAL = float(os.getenv("WORKER_HEARTBEAT_INTERVAL", 20))
+WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", 2))
+
+def known_listings(urls: List[str]) -> set:
+    """Return the URLs both scrapers have already stored."""
+    db = SessionLocal()
+    try:
+        rows = db.query(Listing.url).filter(
+            Listing.url.in_(urls), Listing.ai_elapsed_time.isnot(None), Listing.manual_elapsed_time.isnot(None)
+        )
+        return {row.url for row in rows}
+    finally:
+        db.close()
+
+async def process_index_job(job: Dict, fetcher: AsyncFetcher) -> int:
+    """Queue the listing pages linked from an index page in batches, and the next index page."""
+    page_url = job["urls"][0]
+    response = await fetcher.fetch(page_url)
+    soup = BeautifulSoup(response.text, "html.parser")
+    links = list(dict.fromkeys(
+        wolf.extract_listing_links(soup, page_url) + ai_scraper.extract_listing_links(soup, page_url)
+    ))
+    if not job["revisit"]:
+        known = known_listings(links)
+        links = [link for link in links if link not in known]
+    enqueue_jobs(job, LISTINGS, [links[start:start + WORKER_BATCH_SIZE] for start in range(0, len(links), WORKER_BATCH_SIZE)])
+    print(f"Queued {len(links)} listing links from {page_url}.")
+
+    next_page = find_next_page(soup, page_url)
+    if next_page and count_jobs(job["crawl_id"], INDEX) < CRAWL_MAX_PAGES:
+        enqueue_jobs(job, INDEX, [[next_page]])
+    return 0
+
+async def scrape_listing(url: str, response: httpx.Response, model: str) -> List[Dict]:
+    """Run both extractors on one fetched listing page."""
+    fetch_time = response.elapsed.total_seconds()
+    manual, ai = await asyncio.gather(
+        run_parse(wolf.measure_parse_listing, response.content, response.encoding, url, fetch_time),
+        asyncio.to_thread(ai_scraper.scrape_with_ai, url, model=model, html=response.text, fetch_time=fetch_time, send=False),
+        return_exceptions=True,
+    )
+    if isinstance(manual, dict):
+        record_telemetry(manual)
+    items = [item for item in (manual, ai) if isinstance(item, dict)]
+    for error in (manual, ai):
+        if isinstance(error, Exception):
+            print(f"Error processing {url}: {error}")
+    page = page_validators(response)
+    for item in items:
+        item.update(page)
+    return items
+
+async def process_listings_job(job: Dict, fetcher: AsyncFetcher) -> int:
+    """Fetch a batch of listing pages once, scrape them with both scrapers and persist them in one batch.
+
+    Pages that fail to download are queued again as a smaller job with the remaining attempts.
+    """
+    urls = job["urls"]
+    responses = await fetcher.fetch_all(urls)
+    fetched = [(url, response) for url, response in zip(urls, responses) if not isinstance(response, Exception)]
+    failed = [url for url, response in zip(urls, responses) if isinstance(response, Exception)]
+    if not fetched:
+        raise RuntimeError(f"Could not fetch any of {len(urls)} listing pages: {responses[0]}")
+    if PAGE_ARCHIVE:
+        await asyncio.to_thread(archive_pages, [(url, response.content, response.encoding) for url, response in fetched], "worker")
+
+    results = await asyncio.gather(*(scrape_listing(url, response, job["model"]) for url, response in fetched))
+    items = [item for listing_items in results for item in listing_items]
+    if items:
+        await asyncio.to_thread(upsert_listings, items)
+    if failed:
+        print(f"Requeueing {len(failed)} listing pages that failed to download.")
+        enqueue_jobs(job, LISTINGS, [failed], attempts=job["attempts"])
+    return len(items)
+
+async def run_job(job: Dict, fetcher: AsyncFetcher, worker_id: str) -> bool:
+    """Process a leased job while heartbeating its lease; returns False if it failed or the lease was lost."""
+    lease_lost = asyncio.Event()
+
+    async def keep_lease():
+        while True:
+            await asyncio.sleep(WORKER_HEARTBEAT_INTERVAL)
+            if not await asyncio.to_thread(heartbeat, job["id"], worker_id, WORKER_LEASE_SECONDS):
+                lease_lost.set()
+                return
+
+    heartbeat_task = asyncio.create_task(keep_lease())
+    try:
+        process = process_index_job if job["kind"] == INDEX else process_listings_job
+        scraped = await process(job, fetcher)
+    except Exception as e:
+        print(f"Job {job['id']} ({job['kind']}) failed on attempt {job['attempts']}: {e}")
+        fail_job(job, worker_id, str(e))
+        return False
+    finally:
+        heartbeat_task.cancel()
+    if lease_lost.is_set() or not complete_job(job["id"], worker_id, scraped):
+        print(f"Lost the lease on job {job['id']}; another worker took it over.")
+        return False
+    return True
+
+async def run_worker(
+    worker_id: str | None = None,
+    once: bool = False,
+    max_jobs: int | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> int:
+    """Lease and process crawl jobs until stopped; with `once`, stop when the queue is drained. Returns the jobs done."""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    print(f"Worker {worker_id} started.")
+    processed = 0
+    async with AsyncFetcher() as fetcher:
+        while not (should_stop and should_stop()) and (max_jobs is None or processed < max_jobs):
+            job = lease_job(worker_id, WORKER_LEASE_SECONDS)
+            if job is None:
+                # Other workers may still queue jobs from the pages they are processing
+                if once and not active_jobs():
+                    break
+                await asyncio.sleep(WORKER_POLL_INTERVAL)
+                continue
+            try:
+                await run_job(job, fetcher, worker_id)
+            except asyncio.CancelledError:
+                release_job(job, worker_id)
+                raise
+            processed += 1
+    print(f"Worker {worker_id} stopped after {processed} jobs.")
+    return processed
+
+if __name__ == "__main__":
+    # Usage: python -m scrapers.worker [--enqueue URL] [--once]; start one per core or node
+    parser = argparse.ArgumentParser(description="Lease and run distributed crawl jobs from the database.")
+    parser.add_argument("--enqueue", metavar="URL", help="Queue a crawl of this listings page first")
+    parser.add_argument("--model", default="gpt-4o-mini", help="AI model for the queued crawl")
+    parser.add_argument("--revisit", action="store_true", help="Scrape listings both scrapers already stored")
+    parser.add_argument("--once", action="store_true", help="Exit once no job is queued or running")
+    parser.add_argument("--max-jobs", type=int, help="Exit after this many jobs")
+    parser.add_argument("--worker-id", help="Name of this worker in job leases")
+    args = parser.parse_args()
+
+    sync_schema()
+    if args.enqueue:
+        print(f"Queued crawl {enqueue_crawl(args.enqueue, args.model, args.revisit)} of {args.enqueue}.")
+
+    async def main():
+        # The first signal lets the current job finish, a second one hands it back to the queue
+        stopping = False
+        task = asyncio.current_task()
+
+        def stop():
+            nonlocal stopping
+            if stopping:
+                task.cancel()
+            stopping = True
+            print("Stopping after the current job...")
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop)
+        await run_worker(args.worker_id, args.once, args.max_jobs, lambda: stopping)
+
+    try:
+        asyncio.run(main())
+    except asyncio.CancelledError:
+        pass
+    finally:
+        shutdown_parse_pool()
+        flush_telemetry()
@@ -0,0 +1,20 @@
+import os
+import tempfile
+
+import pytest
+
+# Tests never touch the working directory's database, page archive or telemetry file
+TEST_DIR = tempfile.mkdtemp(prefix="scraper-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}")
+os.environ.setdefault("PAGE_ARCHIVE_DIR", os.path.join(TEST_DIR, "page_archive"))
+os.environ.setdefault("TELEMETRY_FILE", os.path.join(TEST_DIR, "scraper_telemetry.csv"))
+
+@pytest.fixture
+def database():
+    """Empty tables in the test database."""
+    import db.models  # noqa: F401 (registers the tables)
+    from db.database import Base, engine, sync_schema
+
+    Base.metadata.drop_all(bind=engine)
+    sync_schema()
+    yield engine
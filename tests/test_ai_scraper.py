@@ -0,0 +1,43 @@
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from scrapers import ai_scraper
+from scrapers.ai_scraper import clean_area, clean_rent, extract_with_selectors, parse_selectors_from_ai, scrape_with_ai
+from scrapers.llm_client import MOCK_LLM_RESPONSE
+from scrapers.wolf import parse_listing
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "wolf")
+PAGES = ["listing_full.html", "listing_entities.html", "listing_partial_payload.html"]
+
+def squeeze(text: str) -> str:
+    # Selector text joins the element's strings without the whitespace between them
+    return "".join(text.split())
+
+def read(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as file:
+        return file.read()
+
+@pytest.mark.parametrize("text, rent", [("2 900 zł", 2900), ("4\xa0200 zł / mies.", 4200), ("Cena", None), ("", None), ("Not Available", None)])
+def test_clean_rent(text, rent):
+    assert clean_rent(text) == rent
+
+@pytest.mark.parametrize("name", PAGES)
+def test_mock_selectors_match_the_fixture_pages(name):
+    html = read(name)
+    truth = parse_listing(html, name)
+    extracted = extract_with_selectors(BeautifulSoup(html, "html.parser"), parse_selectors_from_ai(MOCK_LLM_RESPONSE))
+
+    assert clean_rent(extracted["rent"]) == truth["rent"]
+    assert clean_area(extracted["area"]) == truth["area"]
+    assert squeeze(extracted["address"]) == squeeze(truth["address"])
+
+@pytest.mark.parametrize("name", PAGES)
+def test_scrape_with_mock_model(name, database, monkeypatch):
+    monkeypatch.setattr(ai_scraper, "HEURISTIC_SELECTORS", False)
+    html = read(name)
+    truth = parse_listing(html, name)
+
+    item = scrape_with_ai(f"https://example.com/{name}", "mock", html=html, send=False)
+    assert (item["rent"], item["area"], squeeze(item["address"])) == (truth["rent"], truth["area"], squeeze(truth["address"]))
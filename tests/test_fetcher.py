@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from scrapers.fetcher import AsyncFetcher, SharedFetcher
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/slow/<n> answers after 0.1s, /flaky/<n> fails twice with 503, /missing is a 404."""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] += 1
+            hits = server.hits[self.path]
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            if self.path.startswith("/slow/"):
+                time.sleep(0.1)
+            status = 200
+            if self.path == "/missing":
+                status = 404
+            elif self.path.startswith("/flaky/") and hits <= 2:
+                status = 503
+            body = self.path.encode()
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.hits = Counter()
+    server.active = server.max_active = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+async def fetch_all(fetcher: AsyncFetcher, urls):
+    async with fetcher:
+        return await fetcher.fetch_all(urls)
+
+def test_per_host_concurrency_is_bounded(server):
+    urls = [f"{server.url}/slow/{i}" for i in range(8)]
+    start = time.perf_counter()
+    responses = asyncio.run(fetch_all(AsyncFetcher(per_host_concurrency=2, rate_limit=0), urls))
+
+    assert [response.text for response in responses] == [f"/slow/{i}" for i in range(8)]
+    assert server.max_active == 2
+    # Four rounds of two concurrent requests
+    assert time.perf_counter() - start >= 0.4
+
+def test_transient_errors_are_retried_with_backoff(server):
+    start = time.perf_counter()
+    responses = asyncio.run(fetch_all(AsyncFetcher(rate_limit=0, retries=2, retry_backoff=0.05), [f"{server.url}/flaky/1"]))
+
+    assert responses[0].status_code == 200
+    assert server.hits["/flaky/1"] == 3
+    # 0.05s, then 0.1s
+    assert time.perf_counter() - start >= 0.15
+
+def test_retries_give_up_and_client_errors_are_not_retried(server):
+    fetcher = AsyncFetcher(rate_limit=0, retries=1, retry_backoff=0.01)
+    flaky, missing = asyncio.run(fetch_all(fetcher, [f"{server.url}/flaky/2", f"{server.url}/missing"]))
+
+    assert isinstance(flaky, httpx.HTTPStatusError) and flaky.response.status_code == 503
+    assert isinstance(missing, httpx.HTTPStatusError) and missing.response.status_code == 404
+    assert (server.hits["/flaky/2"], server.hits["/missing"]) == (2, 1)
+
+def test_shared_fetcher_downloads_each_url_once(server):
+    async def main():
+        async with SharedFetcher(consumers=2, rate_limit=0) as fetcher:
+            first, second = await asyncio.gather(fetcher.fetch(f"{server.url}/slow/1"), fetcher.fetch(f"{server.url}/slow/1"))
+            return fetcher, first, second
+
+    fetcher, first, second = asyncio.run(main())
+    assert first is second
+    assert server.hits["/slow/1"] == 1
+    assert fetcher.shared_hits == 1
+    assert [fetcher.claim_archive(first), fetcher.claim_archive(second)] == [True, False]
@@ -0,0 +1,70 @@
+import asyncio
+import datetime
+from collections import Counter
+
+import httpx
+
+from db.database import SessionLocal
+from db.models import FrontierEntry
+from scrapers.fetcher import AsyncFetcher
+from scrapers.frontier import CrawlFrontier, crawl
+
+SEED = "https://example.com/mieszkania"
+LISTINGS = [f"https://example.com/oferta/{i}" for i in range(20)]
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if str(request.url) == SEED:
+        links = "".join(f'<a class="offer" href="{url}">{url}</a>' for url in LISTINGS)
+        return httpx.Response(200, text=f"<html><body>{links}</body></html>")
+    return httpx.Response(200, text=f"<html><body>{request.url}</body></html>")
+
+def extract_links(soup, page_url):
+    return [a["href"] for a in soup.select("a.offer")]
+
+def test_concurrent_crawls_of_one_seed_process_each_url_once(database, monkeypatch):
+    monkeypatch.setattr("scrapers.frontier.PAGE_ARCHIVE", False)
+    processed = Counter()
+
+    async def process_listing(url, response):
+        processed[url] += 1
+        await asyncio.sleep(0.01)
+        return {"url": url}
+
+    async def run_crawl():
+        fetcher = AsyncFetcher(rate_limit=0)
+        fetcher.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            frontier = CrawlFrontier(SEED, "manual")
+            return await crawl(frontier, fetcher, extract_links, process_listing, batch_size=5, parse_concurrency=2)
+        finally:
+            await fetcher.client.aclose()
+
+    async def main():
+        return await asyncio.gather(run_crawl(), run_crawl())
+
+    first, second = asyncio.run(main())
+    assert sorted(processed) == sorted(LISTINGS)
+    assert set(processed.values()) == {1}
+    assert len(first) + len(second) == len(LISTINGS)
+
+def test_expired_claims_are_taken_over_and_released_claims_return(database):
+    crashed = CrawlFrontier(SEED, "manual", lease_seconds=60)
+    crashed.start()
+    crashed.add_listings(LISTINGS[:4])
+    assert [url for _, url in crashed.next_batch(3)] == [SEED] + LISTINGS[:2]
+
+    other = CrawlFrontier(SEED, "manual")
+    assert other.start()
+    assert [url for _, url in other.next_batch(10)] == LISTINGS[2:4]
+
+    # The first crawl died; its lease runs out
+    with SessionLocal() as session:
+        session.query(FrontierEntry).filter(FrontierEntry.lease_owner == crashed.owner).update(
+            {"lease_expires_at": datetime.datetime.now() - datetime.timedelta(seconds=1)}
+        )
+        session.commit()
+    assert [url for _, url in other.next_batch(10)] == [SEED] + LISTINGS[:2]
+
+    other.release([SEED])
+    assert other.pending_count() == 5
+    assert [url for _, url in CrawlFrontier(SEED, "manual").next_batch(10)] == [SEED]
@@ -0,0 +1,35 @@
+import glob
+import os
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from scrapers.html_minimizer import CHARS_PER_TOKEN, benchmark, reduce_html
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "fixtures", "wolf", "*.html")))
+
+def read(path: str) -> str:
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+def test_over_budget_fragment_is_cut_on_an_element_boundary():
+    for path in FIXTURES:
+        for budget in [10, 25, 40, 80]:
+            _, fragment = reduce_html(BeautifulSoup(read(path), "html.parser"), budget)
+            assert len(fragment) <= budget * CHARS_PER_TOKEN
+            if fragment:
+                # Raises on unclosed elements or a cut entity
+                etree.fromstring(fragment)
+
+def test_fragment_within_budget_is_not_cut():
+    html = read(os.path.join(os.path.dirname(__file__), "fixtures", "wolf", "listing_full.html"))
+    _, fragment = reduce_html(BeautifulSoup(html, "html.parser"), 10_000)
+    assert "2 900 zł" in fragment and "48 m²" in fragment and "ul. Przykładowa" in fragment
+
+def test_benchmark_averages_over_measured_pages():
+    results = benchmark(FIXTURES)
+    for method in ["legacy", "minimized"]:
+        assert 0 < results[method]["tokens_per_page"]
+        assert 0 <= results[method]["accuracy"] <= 1
+    # Pages without a manual parse are not counted, so a smaller budget can only lower tokens per page
+    assert benchmark(FIXTURES, token_budget=40)["minimized"]["tokens_per_page"] <= 40
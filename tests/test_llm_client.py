@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import Dict, List, Tuple
+
+import pytest
+
+from scrapers import llm_client
+from scrapers.llm_client import LLMClient, LLMError, LLMProvider, MockProvider, TokenBucket
+
+class ScriptedProvider(LLMProvider):
+    """Provider answering with the given outcomes in order; exceptions are raised."""
+
+    def __init__(self, name: str, outcomes: List, latency: float = 0, **limits):
+        super().__init__(**limits)
+        self.name = name
+        self.outcomes = outcomes
+        self.latency = latency
+        self.calls = 0
+
+    async def _complete(self, prompt: str, model: str) -> Tuple[str, Dict[str, int]]:
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else f"{self.name} answer"
+        await asyncio.sleep(self.latency)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome, {"prompt_tokens": 1, "completion_tokens": 1}
+
+@pytest.fixture(autouse=True)
+def fast_client(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_BACKOFF_BASE", 0.01)
+    monkeypatch.setattr(llm_client, "LLM_HEDGE_AFTER", 0)
+    monkeypatch.setattr(llm_client, "llm_stats", {})
+
+def complete(client: LLMClient, model: str = "gpt-4o-mini") -> str:
+    return asyncio.run(client.complete("prompt", model))
+
+def test_transient_errors_are_retried():
+    openai = ScriptedProvider("openai", [LLMError("rate limited", status_code=429), LLMError("down", status_code=503)])
+    client = LLMClient({"openai": openai})
+
+    assert complete(client) == "openai answer"
+    assert openai.calls == 3
+    assert llm_client.get_llm_stats()["openai:gpt-4o-mini"]["retries"] == 2
+
+def test_retry_after_is_honoured():
+    openai = ScriptedProvider("openai", [LLMError("rate limited", status_code=429, retry_after=0.2)])
+    start = time.perf_counter()
+
+    assert complete(LLMClient({"openai": openai})) == "openai answer"
+    assert time.perf_counter() - start >= 0.2
+
+def test_failover_after_a_non_retryable_error():
+    openai = ScriptedProvider("openai", [LLMError("bad request", status_code=400)])
+    groq = ScriptedProvider("groq", [])
+
+    assert complete(LLMClient({"openai": openai, "groq": groq})) == "groq answer"
+    assert (openai.calls, groq.calls) == (1, 1)
+    assert llm_client.get_llm_stats()["openai:gpt-4o-mini"]["failures"] == 1
+
+def test_failover_after_retries_run_out(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_MAX_RETRIES", 1)
+    groq = ScriptedProvider("groq", [LLMError("down", status_code=503)] * 2)
+    openai = ScriptedProvider("openai", [])
+
+    assert complete(LLMClient({"openai": openai, "groq": groq}), "groq") == "openai answer"
+    assert groq.calls == 2
+
+def test_error_is_raised_when_every_provider_fails(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_MAX_RETRIES", 0)
+    client = LLMClient({"mock": MockProvider(latency=0, failure_rate=1)})
+
+    with pytest.raises(LLMError) as error:
+        complete(client, "mock")
+    assert error.value.status_code == 429
+
+def test_slow_provider_is_hedged(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_HEDGE_AFTER", 0.05)
+    openai = ScriptedProvider("openai", [], latency=1)
+    groq = ScriptedProvider("groq", [])
+    start = time.perf_counter()
+
+    assert complete(LLMClient({"openai": openai, "groq": groq})) == "groq answer"
+    assert time.perf_counter() - start < 0.5
+    assert llm_client.get_llm_stats()[f"groq:{llm_client.GROQ_MODEL}"]["hedged"] == 1
+
+def test_token_bucket_throttles_after_the_burst():
+    async def acquire(bucket: TokenBucket, count: int) -> float:
+        start = time.perf_counter()
+        for _ in range(count):
+            await bucket.acquire()
+        return time.perf_counter() - start
+
+    # The burst of 2 is immediate, the next 3 tokens take 0.05s each
+    assert asyncio.run(acquire(TokenBucket(rate=20, capacity=2), 2)) < 0.02
+    assert asyncio.run(acquire(TokenBucket(rate=20, capacity=2), 5)) >= 0.14
+
+def test_provider_rate_limit_applies_across_concurrent_requests():
+    client = LLMClient({"mock": MockProvider(latency=0, concurrency=10, rate_limit=20)})
+
+    async def main(requests: int) -> float:
+        start = time.perf_counter()
+        await asyncio.gather(*(client.complete("prompt", "mock") for _ in range(requests)))
+        return time.perf_counter() - start
+
+    # The burst is one second's worth (20 requests); the 5 beyond it wait 0.05s each
+    assert asyncio.run(main(25)) >= 0.24
@@ -0,0 +1,43 @@
+from db.database import SessionLocal, sync_schema
+from db.models import Listing, StatsTotal
+from db.repository import upsert_listing_rows
+from db.stats import overall_stats
+
+LISTING = {"title": "Mieszkanie", "rent": 3200, "area": 48, "address": "Kraków", "url": "https://example.com/oferta/1"}
+
+def stored(url: str) -> Listing:
+    with SessionLocal() as session:
+        return session.query(Listing).filter(Listing.url == url).one()
+
+def test_rows_for_the_same_url_keep_both_scrapers_telemetry(database):
+    ai_row = {**LISTING, "ai_elapsed_time": 1.5, "ai_memory_usage": 12.0, "ai_model": "mock"}
+    manual_row = {**LISTING, "manual_elapsed_time": 0.2, "manual_memory_usage": 3.0}
+
+    assert upsert_listing_rows([ai_row, manual_row]) == {LISTING["url"]: "created"}
+
+    listing = stored(LISTING["url"])
+    assert (listing.ai_elapsed_time, listing.ai_model) == (1.5, "mock")
+    assert listing.manual_elapsed_time == 0.2
+
+def test_later_rows_update_without_erasing_stored_telemetry(database):
+    upsert_listing_rows([{**LISTING, "ai_elapsed_time": 1.5, "ai_model": "mock"}])
+
+    assert upsert_listing_rows([{**LISTING, "rent": 3300, "manual_elapsed_time": 0.2}]) == {LISTING["url"]: "updated"}
+
+    listing = stored(LISTING["url"])
+    assert (listing.rent, listing.ai_model, listing.manual_elapsed_time) == (3300, "mock", 0.2)
+
+def test_writers_count_listings_stored_before_the_totals_existed(database):
+    # A database from before the stats tables: listings, but no totals
+    with SessionLocal() as session:
+        session.add(Listing(**{**LISTING, "url": "https://example.com/oferta/0", "manual_elapsed_time": 0.4}))
+        session.query(StatsTotal).delete()
+        session.commit()
+
+    # Workers and reprocess only call sync_schema before writing
+    sync_schema()
+    upsert_listing_rows([{**LISTING, "manual_elapsed_time": 0.2}])
+
+    with SessionLocal() as session:
+        stats = overall_stats(session)
+    assert (stats["total_listings_processed"], stats["manual_total_processed"]) == (2, 2)
@@ -0,0 +1,82 @@
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from backend import response_cache
+from backend.response_cache import MemoryBackend, RedisBackend, cached_response, invalidate_responses, set_backend
+from db.database import LISTINGS_VERSION, RUNS_VERSION, notify_write, write_listeners
+
+class FakeRedis:
+    """Stand-in for redis.Redis with the get/set calls the backend uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        entry = self.data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key, value, ex=None):
+        self.data[key] = (time.monotonic() + ex if ex else float("inf"), value)
+
+builds = {"listings": 0, "stats": 0}
+app = FastAPI()
+
+@app.get("/listings")
+def listings(request: Request):
+    def build():
+        builds["listings"] += 1
+        return b'{"listings": []}', {}
+    return cached_response(request, build)
+
+@app.get("/stats")
+def stats(request: Request):
+    def build():
+        builds["stats"] += 1
+        return b'{"runs": []}', {}
+    return cached_response(request, build, versions=(LISTINGS_VERSION, RUNS_VERSION))
+
+client = TestClient(app)
+
+def setup_function():
+    builds.update(listings=0, stats=0)
+    if invalidate_responses not in write_listeners:
+        write_listeners.append(invalidate_responses)
+
+def teardown_function():
+    response_cache.backend = None
+
+def test_redis_backend_serves_cached_bodies_and_304(database):
+    set_backend(RedisBackend(client=FakeRedis()))
+    first = client.get("/stats")
+    second = client.get("/stats", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.json() == {"runs": []}
+    assert second.status_code == 304
+    assert builds["stats"] == 1
+
+def test_run_history_writes_keep_cached_listings(database):
+    set_backend(MemoryBackend())
+    client.get("/listings")
+    client.get("/stats")
+
+    notify_write(RUNS_VERSION)
+    client.get("/listings")
+    client.get("/stats")
+    assert builds == {"listings": 1, "stats": 2}
+
+    notify_write(LISTINGS_VERSION)
+    client.get("/listings")
+    assert builds["listings"] == 2
+
+def test_unchanged_body_keeps_its_etag_after_writes(database):
+    set_backend(RedisBackend(client=FakeRedis()))
+    etag = client.get("/stats").headers["ETag"]
+    notify_write(RUNS_VERSION)
+
+    response = client.get("/stats", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert builds["stats"] == 2
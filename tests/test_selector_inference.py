@@ -0,0 +1,37 @@
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from scrapers.ai_scraper import clean_area, clean_rent, infer_page_selectors
+from scrapers.selector_inference import FIELDS, learned_selectors
+from scrapers.wolf import parse_listing
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "wolf")
+
+def read(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as file:
+        return file.read()
+
+def infer(name: str):
+    # Every page starts cold, without selectors learned from the database
+    learned_selectors["test"] = {field: {} for field in FIELDS}
+    return infer_page_selectors(BeautifulSoup(read(name), "html.parser"), "test")
+
+@pytest.mark.parametrize("name", ["listing_full.html", "listing_entities.html", "listing_partial_payload.html"])
+def test_heuristic_values_match_the_manual_parse(name):
+    selectors, extracted = infer(name)
+    assert selectors is not None, "heuristic selectors were not confident enough"
+    truth = parse_listing(read(name), name)
+    assert clean_rent(extracted["rent"]) == truth["rent"]
+    assert clean_area(extracted["area"]) == truth["area"]
+    assert extracted["title"] in truth["title"]
+
+def test_heuristic_values_on_a_page_without_payload():
+    selectors, extracted = infer("listing_dom_only.html")
+    assert clean_rent(extracted["rent"]) == 3600
+    assert clean_area(extracted["area"]) == 62
+    assert extracted["address"] == "Kraków, Podgórze, ul. Testowa"
+
+def test_heuristic_leaves_pages_without_fields_to_the_model():
+    assert infer("listing_missing_fields.html") == (None, None)
@@ -0,0 +1,56 @@
+import glob
+import os
+
+import pytest
+
+from scrapers import wolf_parser
+from scrapers.wolf import parse_listing
+
+pytest.importorskip("lxml")
+
+# Anonymised wolf listing pages, including ones without a Nuxt payload where only the DOM fields exist
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "fixtures", "wolf", "*.html")))
+
+def read(path: str) -> str:
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_fast_and_soup_extract_the_same_fields(path):
+    html = read(path)
+    fast = wolf_parser.extract_fields_fast(html)
+    soup = wolf_parser.extract_fields_soup(html)
+    for field in wolf_parser.FIELDS:
+        assert fast[field] == soup[field], f"{field} differs"
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_parse_listing_is_the_same_with_both_backends(path):
+    html = read(path)
+    assert parse_listing(html, path, "fast") == parse_listing(html, path, "soup")
+
+def test_dom_fields_without_nuxt_payload():
+    fields = wolf_parser.extract_fields_fast(read(os.path.join(os.path.dirname(__file__), "fixtures", "wolf", "listing_dom_only.html")))
+    assert fields == {
+        "nuxt_data": None,
+        "title": "Mieszkanie 3 pokoje 62 m² Kraków Podgórze | Wolf Nieruchomości",
+        "rent": "3\xa0600\xa0zł",
+        "address": "Kraków, Podgórze, ul. Testowa",
+        "area": "62,4\xa0m²",
+    }
+
+def test_check_parity_on_fixtures():
+    assert wolf_parser.check_parity(FIXTURES)
+
+@pytest.mark.parametrize("name, address", [
+    # The payload only names the city, the DOM has the district and street
+    ("listing_full.html", "Kraków, Krowodrza, ul. Przykładowa"),
+    ("listing_partial_payload.html", "Kraków, Nowa Huta, os. Przykładowe"),
+])
+def test_parse_listing_keeps_the_most_specific_address(name, address):
+    path = os.path.join(os.path.dirname(__file__), "fixtures", "wolf", name)
+    assert parse_listing(read(path), path)["address"] == address
+
+def test_city_only_payload_address_without_dom_address():
+    html = read(os.path.join(os.path.dirname(__file__), "fixtures", "wolf", "listing_full.html"))
+    html = html.replace("Kraków, Krowodrza, ul. Przykładowa", "")
+    assert parse_listing(html, "listing_full.html")["address"] == "Kraków"